@@ -0,0 +1,27 @@
+"""Add an index on item.updated_at for the local categorizer refresh
+
+Revision ID: 461f89f67b05
+Revises: c81f4b6e2d93
+Create Date: 2026-10-17 18:22:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "461f89f67b05"
+down_revision: Union[str, Sequence[str], None] = "c81f4b6e2d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_item_updated_at"), "item", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_item_updated_at"), table_name="item")
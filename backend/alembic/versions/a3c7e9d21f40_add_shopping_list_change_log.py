@@ -0,0 +1,50 @@
+"""Add shopping list revision and change log
+
+Revision ID: a3c7e9d21f40
+Revises: 4945d2a0eb2d
+Create Date: 2026-10-17 09:12:41.118203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3c7e9d21f40"
+down_revision: Union[str, Sequence[str], None] = "4945d2a0eb2d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "shopping_list",
+        sa.Column("revision", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "shopping_list_change",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("shopping_list_id", sa.Integer(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.String(length=20), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["shopping_list_id"], ["shopping_list.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "shopping_list_id", "revision", name="uq_shopping_list_change_revision"
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("shopping_list_change")
+    op.drop_column("shopping_list", "revision")
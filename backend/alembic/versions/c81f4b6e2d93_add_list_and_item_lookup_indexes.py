@@ -0,0 +1,56 @@
+"""Add indexes for shopping list and item lookups
+
+Revision ID: c81f4b6e2d93
+Revises: a3c7e9d21f40
+Create Date: 2026-10-17 14:03:27.504611
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c81f4b6e2d93"
+down_revision: Union[str, Sequence[str], None] = "a3c7e9d21f40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_item_shopping_list_id_is_completed",
+        "item",
+        ["shopping_list_id", "is_completed"],
+        unique=False,
+    )
+    op.create_index(op.f("ix_item_category_id"), "item", ["category_id"], unique=False)
+    op.create_index(op.f("ix_item_owner_id"), "item", ["owner_id"], unique=False)
+    op.create_index(
+        op.f("ix_item_last_modified_by_id"),
+        "item",
+        ["last_modified_by_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_shopping_list_owner_id"), "shopping_list", ["owner_id"], unique=False
+    )
+    op.create_index(
+        "ix_user_shopping_list_shopping_list_id",
+        "user_shopping_list",
+        ["shopping_list_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_user_shopping_list_shopping_list_id", table_name="user_shopping_list"
+    )
+    op.drop_index(op.f("ix_shopping_list_owner_id"), table_name="shopping_list")
+    op.drop_index(op.f("ix_item_last_modified_by_id"), table_name="item")
+    op.drop_index(op.f("ix_item_owner_id"), table_name="item")
+    op.drop_index(op.f("ix_item_category_id"), table_name="item")
+    op.drop_index("ix_item_shopping_list_id_is_completed", table_name="item")
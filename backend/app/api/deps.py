@@ -2,13 +2,12 @@ from typing import AsyncGenerator, Optional
 
 from fastapi import Depends, Header, HTTPException
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.db.session import AsyncSessionLocal, get_session
 from app.models.shopping_list import ShoppingList
 from app.models.user import User
+from app.services.list_access import list_membership_cache
 from app.services.websocket_service import websocket_service
 
 
@@ -49,25 +48,13 @@ async def get_shopping_list(
     Helper function to retrieve a ShoppingList by ID,
     ensuring current_user is owner or shared member.
     """
-    result = await session.execute(
-        select(ShoppingList)
-        .where(ShoppingList.id == list_id)
-        .options(
-            selectinload(ShoppingList.shared_with),
-            selectinload(ShoppingList.items),
-            selectinload(ShoppingList.owner),
-        )
+    # Check if user is owner or shared member without loading the list
+    await list_membership_cache.authorize(
+        list_id, current_user.id, session, detail="Access denied"
     )
-    shopping_list = result.scalars().first()
 
+    shopping_list = await session.get(ShoppingList, list_id)
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Shopping list not found")
 
-    # Check if user is owner or shared member
-    if (
-        shopping_list.owner_id != current_user.id
-        and current_user not in shopping_list.shared_with
-    ):
-        raise HTTPException(status_code=403, detail="Access denied")
-
     return shopping_list
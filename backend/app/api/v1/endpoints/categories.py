@@ -1,101 +1,126 @@
-from typing import Any, List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app import crud, models, schemas
-from app.api import deps
+from app import crud
+from app.api.deps import get_session
+from app.core.dependencies import get_current_superuser
+from app.crud.base import MAX_PAGE_SIZE
+from app.models import User
+from app.schemas.category import Category, CategoryCreate, CategoryUpdate
+from app.services import change_log
+from app.services.category_cache import category_cache
 
 router = APIRouter()
 
+CATEGORY_NOT_FOUND = "The category with this ID does not exist in the system"
+CATEGORY_EXISTS = "The category with this name already exists in the system."
 
-@router.get("/", response_model=List[schemas.Category])
-def read_categories(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
-) -> Any:
+
+@router.get("/", response_model=List[Category])
+async def read_categories(
+    session: AsyncSession = Depends(get_session),
+    after: Optional[int] = Query(
+        None, description="Id of the last category of the previous page"
+    ),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+):
     """
-    Retrieve categories.
+    Retrieve categories ordered by id, one keyset page at a time.
     """
-    categories = crud.category.get_multi(db, skip=skip, limit=limit)
-    return categories
+    return await crud.category.get_page(session, after=after, limit=limit)
 
 
-@router.post("/", response_model=schemas.Category)
-def create_category(
+@router.post("/", response_model=Category)
+async def create_category(
     *,
-    db: Session = Depends(deps.get_db),
-    category_in: schemas.CategoryCreate,
-    current_user: models.User = Depends(deps.get_current_active_superuser),
-) -> Any:
+    session: AsyncSession = Depends(get_session),
+    category_in: CategoryCreate,
+    current_user: User = Depends(get_current_superuser),
+):
     """
     Create new category.
     """
-    category = crud.category.get_by_name(db, name=category_in.name)
-    if category:
-        raise HTTPException(
-            status_code=400,
-            detail="The category with this name already exists in the system.",
-        )
-    category = crud.category.create(db, obj_in=category_in)
-    return category
+    if await crud.category.get_by_name(session, name=category_in.name):
+        raise HTTPException(status_code=400, detail=CATEGORY_EXISTS)
+    category = await crud.category.create(session, obj_in=category_in)
+    # Serialize before committing, which expires the loaded attributes
+    response = Category.model_validate(category)
+    await session.commit()
+    await category_cache.apply_change(remember={response.name: response.id})
+    return response
 
 
-@router.put("/{id}", response_model=schemas.Category)
-def update_category(
+@router.put("/{id}", response_model=Category)
+async def update_category(
     *,
-    db: Session = Depends(deps.get_db),
+    session: AsyncSession = Depends(get_session),
     id: int,
-    category_in: schemas.CategoryUpdate,
-    current_user: models.User = Depends(deps.get_current_active_superuser),
-) -> Any:
+    category_in: CategoryUpdate,
+    current_user: User = Depends(get_current_superuser),
+):
     """
     Update a category.
     """
-    category = crud.category.get(db, id=id)
+    category = await crud.category.get(session, id=id)
     if not category:
-        raise HTTPException(
-            status_code=404,
-            detail="The category with this ID does not exist in the system",
+        raise HTTPException(status_code=404, detail=CATEGORY_NOT_FOUND)
+    previous_name = category.name
+    try:
+        category = await crud.category.update(
+            session, db_obj=category, obj_in=category_in
         )
-    category = crud.category.update(db, db_obj=category, obj_in=category_in)
-    return category
+        response = Category.model_validate(category)
+        if response.name != previous_name:
+            # Item responses contain the name, so their lists get a new revision
+            await change_log.record_category_renamed(session, response.id)
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail=CATEGORY_EXISTS)
+    await category_cache.apply_change(
+        forget=[previous_name], remember={response.name: response.id}
+    )
+    return response
 
 
-@router.get("/{id}", response_model=schemas.Category)
-def read_category(
+@router.get("/{id}", response_model=Category)
+async def read_category(
     *,
-    db: Session = Depends(deps.get_db),
+    session: AsyncSession = Depends(get_session),
     id: int,
-) -> Any:
+):
     """
     Get category by ID.
     """
-    category = crud.category.get(db, id=id)
+    category = await crud.category.get(session, id=id)
     if not category:
-        raise HTTPException(
-            status_code=404,
-            detail="The category with this ID does not exist in the system",
-        )
+        raise HTTPException(status_code=404, detail=CATEGORY_NOT_FOUND)
     return category
 
 
-@router.delete("/{id}", response_model=schemas.Category)
-def delete_category(
+@router.delete("/{id}", response_model=Category)
+async def delete_category(
     *,
-    db: Session = Depends(deps.get_db),
+    session: AsyncSession = Depends(get_session),
     id: int,
-    current_user: models.User = Depends(deps.get_current_active_superuser),
-) -> Any:
+    current_user: User = Depends(get_current_superuser),
+):
     """
-    Delete a category.
+    Delete a category that no item uses.
     """
-    category = crud.category.get(db, id=id)
-    if not category:
+    try:
+        category = await crud.category.remove(session, id=id)
+        if not category:
+            raise HTTPException(status_code=404, detail=CATEGORY_NOT_FOUND)
+        response = Category.model_validate(category)
+        await session.commit()
+        await category_cache.apply_change(forget=[response.name])
+    except IntegrityError:
+        await session.rollback()
         raise HTTPException(
-            status_code=404,
-            detail="The category with this ID does not exist in the system",
+            status_code=409, detail="The category is still used by items"
         )
-    category = crud.category.remove(db, id=id)
-    return category
+    return response
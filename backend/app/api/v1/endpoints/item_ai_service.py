@@ -5,13 +5,13 @@ Handles categorization, standardization, and icon suggestions.
 
 import asyncio
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.category import Category
+from app.services.ai_enrichment import missing_enrichment_fields
 from app.services.ai_service import ai_service
+from app.services.category_cache import CategoryRef, category_cache
 
 from ..helpers import shopping_list_helpers as helpers
 
@@ -21,14 +21,43 @@ logger = logging.getLogger(__name__)
 class ItemAIProcessor:
     """Service for AI-powered item processing."""
 
+    @staticmethod
+    async def resolve_enrichment(
+        enrichment: Dict, session: AsyncSession
+    ) -> Tuple[Optional[CategoryRef], Optional[str], Dict, Optional[str]]:
+        """
+        Turn an enrichment dictionary into the values stored on an item.
+
+        Returns:
+            Tuple of (category, standardized_name, translations, icon_name)
+        """
+        category = None
+        icon_name = None
+
+        category_name = enrichment.get("category_name")
+        if category_name:
+            category = await helpers.get_or_create_category(category_name, session)
+
+        # The icon was suggested for the category, so only use it alongside one
+        if category:
+            icon_name = enrichment.get("icon_name") or "shopping_cart"
+
+        return (
+            category,
+            enrichment.get("standardized_name"),
+            enrichment.get("translations") or {},
+            icon_name,
+        )
+
     @staticmethod
     async def process_item_with_ai(
         item_name: str,
         item_category_name: Optional[str],
         session: AsyncSession,
-    ) -> Tuple[Optional[Category], Optional[str], Dict, Optional[str]]:
+    ) -> Tuple[Optional[CategoryRef], Optional[str], Dict, Optional[str]]:
         """
         Process an item using AI to suggest category, standardize name, and suggest icon.
+        All three are requested together, so a cache miss costs one AI round-trip.
 
         Returns:
             Tuple of (category, standardized_name, translations, icon_name)
@@ -39,76 +68,24 @@ class ItemAIProcessor:
         icon_name = None
 
         try:
-            # Get existing categories for AI context
-            categories_result = await session.execute(select(Category))
-            existing_categories = categories_result.scalars().all()
-            category_names = [cat.name for cat in existing_categories]
-
-            # Run AI calls in parallel with timeout
-            category_task = asyncio.create_task(
-                ai_service.suggest_category_async(item_name, category_names)
-            )
-            translation_task = asyncio.create_task(
-                ai_service.standardize_and_translate_item_name(item_name)
-            )
+            # Existing categories for AI context, from the in-memory snapshot
+            category_names = category_cache.names()
 
-            # Wait for both with timeout (max 15 seconds total)
+            # Category, icon and standardization come from a single AI request
             try:
-                category_name, standardization_result = await asyncio.wait_for(
-                    asyncio.gather(
-                        category_task, translation_task, return_exceptions=True
-                    ),
+                enrichment = await asyncio.wait_for(
+                    ai_service.enrich_item(item_name, category_names),
                     timeout=15.0,
                 )
-
-                # Handle category result
-                if isinstance(category_name, Exception):
-                    logger.error(f"Category suggestion failed: {category_name}")
-                    category_name = None
-                elif category_name:
-                    category = await helpers.get_or_create_category(
-                        category_name, session
-                    )
-
-                # Handle translation result
-                if isinstance(standardization_result, Exception):
-                    logger.error(f"Translation failed: {standardization_result}")
-                    standardization_result = {}
-
-                standardized_name = (
-                    standardization_result.get("standardized_name")
-                    if standardization_result
-                    else None
-                )
-                translations = (
-                    standardization_result.get("translations", {})
-                    if standardization_result
-                    else {}
-                )
-
-                # Get icon suggestion only if we have a category
-                if category:
-                    try:
-                        icon_name = await asyncio.wait_for(
-                            ai_service.suggest_icon(item_name, category.name),
-                            timeout=10.0,
-                        )
-                    except asyncio.TimeoutError:
-                        logger.warning(
-                            f"Icon suggestion timed out for item '{item_name}'"
-                        )
-                        icon_name = "shopping_cart"  # Default fallback
-                    except Exception as e:
-                        logger.error(f"Icon suggestion failed: {e}")
-                        icon_name = "shopping_cart"  # Default fallback
-
             except asyncio.TimeoutError:
                 logger.warning(
                     f"AI processing timed out for item '{item_name}' - using fallbacks"
                 )
-                category_name = None
-                standardized_name = None
-                translations = {}
+                enrichment = {}
+
+            category, standardized_name, translations, icon_name = (
+                await ItemAIProcessor.resolve_enrichment(enrichment, session)
+            )
 
         except Exception as e:
             # Log the error but continue with item creation
@@ -121,3 +98,136 @@ class ItemAIProcessor:
                 )
 
         return category, standardized_name, translations, icon_name
+
+    @staticmethod
+    async def process_item_without_ai(
+        item_name: str,
+        item_category_name: Optional[str],
+        session: AsyncSession,
+    ) -> Tuple[Optional[CategoryRef], Optional[str], Dict, Optional[str], bool]:
+        """
+        Process an item using only cached and locally known enrichment, so the
+        item can be stored right away and enriched in the background.
+
+        Returns:
+            Tuple of (category, standardized_name, translations, icon_name,
+            needs_enrichment)
+        """
+        try:
+            category_names = category_cache.names()
+            enrichment = await ai_service.get_known_enrichment(
+                item_name, category_names
+            )
+        except Exception as e:
+            logger.error(f"Error looking up known enrichment for '{item_name}': {e}")
+            enrichment = {}
+
+        category, standardized_name, translations, icon_name = (
+            await ItemAIProcessor.resolve_enrichment(enrichment, session)
+        )
+        if not category and item_category_name:
+            category = await helpers.get_or_create_category(item_category_name, session)
+
+        needs_enrichment = bool(missing_enrichment_fields(enrichment))
+        return category, standardized_name, translations, icon_name, needs_enrichment
+
+    @staticmethod
+    async def process_items_with_ai(
+        item_names: List[str],
+        item_category_names: List[Optional[str]],
+        session: AsyncSession,
+    ) -> List[Tuple[Optional[CategoryRef], Optional[str], Dict, Optional[str]]]:
+        """
+        Process several items using AI, batching all cache misses into as few
+        AI requests as possible instead of one round-trip per item.
+
+        Returns:
+            List of (category, standardized_name, translations, icon_name) tuples,
+            in the same order as item_names
+        """
+        try:
+            category_names = category_cache.names()
+
+            try:
+                enrichments = await asyncio.wait_for(
+                    ai_service.enrich_items(item_names, category_names),
+                    timeout=30.0,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"AI processing timed out for {len(item_names)} items - using fallbacks"
+                )
+                enrichments = [{} for _ in item_names]
+        except Exception as e:
+            logger.error(f"Error during batch AI processing: {e}")
+            enrichments = [{} for _ in item_names]
+
+        return await ItemAIProcessor._resolve_enrichments(
+            enrichments, item_category_names, session
+        )
+
+    @staticmethod
+    async def process_items_without_ai(
+        item_names: List[str],
+        item_category_names: List[Optional[str]],
+        session: AsyncSession,
+    ) -> List[Tuple[Optional[CategoryRef], Optional[str], Dict, Optional[str], bool]]:
+        """
+        Process several items using only cached and locally known enrichment,
+        see process_item_without_ai.
+
+        Returns:
+            List of (category, standardized_name, translations, icon_name,
+            needs_enrichment) tuples, in the same order as item_names
+        """
+        try:
+            category_names = category_cache.names()
+            enrichments = await ai_service.get_known_enrichments(
+                item_names, category_names
+            )
+        except Exception as e:
+            logger.error(f"Error looking up known enrichment for a batch: {e}")
+            enrichments = [{} for _ in item_names]
+
+        results = await ItemAIProcessor._resolve_enrichments(
+            enrichments, item_category_names, session
+        )
+        return [
+            (*result, bool(missing_enrichment_fields(enrichment)))
+            for result, enrichment in zip(results, enrichments)
+        ]
+
+    @staticmethod
+    async def _resolve_enrichments(
+        enrichments: List[Dict],
+        item_category_names: List[Optional[str]],
+        session: AsyncSession,
+    ) -> List[Tuple[Optional[CategoryRef], Optional[str], Dict, Optional[str]]]:
+        """Resolve the enrichment of several items, see resolve_enrichment."""
+        results = []
+        # Categories are resolved once per name, not once per item
+        categories: Dict[str, Optional[CategoryRef]] = {}
+        for enrichment, item_category_name in zip(enrichments, item_category_names):
+            category_name = enrichment.get("category_name") or item_category_name
+            category = None
+            if category_name:
+                if category_name not in categories:
+                    categories[category_name] = await helpers.get_or_create_category(
+                        category_name, session
+                    )
+                category = categories[category_name]
+
+            icon_name = None
+            if category and enrichment.get("category_name"):
+                icon_name = enrichment.get("icon_name") or "shopping_cart"
+
+            results.append(
+                (
+                    category,
+                    enrichment.get("standardized_name"),
+                    enrichment.get("translations") or {},
+                    icon_name,
+                )
+            )
+
+        return results
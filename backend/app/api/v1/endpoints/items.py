@@ -1,16 +1,25 @@
 import logging
-from typing import List, Optional
+from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.api.deps import get_session, set_session_context
+from app.api.v1.helpers.shopping_list_helpers import (
+    etag_matches,
+    get_or_create_category,
+    get_shopping_list_etag,
+)
 from app.core.dependencies import get_current_user
-from app.models import Category, Item, ShoppingList, User
+from app.models import Item, ShoppingList, User
 from app.schemas.item import ItemCreate, ItemCreateStandalone, ItemRead, ItemUpdate
+from app.schemas.serializers import FastJSONResponse, item_to_dict, items_to_dicts
+from app.services import change_log
 from app.services.ai_service import ai_service
+from app.services.category_cache import category_cache
+from app.services.list_access import list_membership_cache
 from app.services.websocket_service import websocket_service
 
 router = APIRouter()
@@ -26,49 +35,13 @@ async def get_shopping_list_by_id(
     Helper function to retrieve a ShoppingList by ID,
     ensuring current_user is owner or shared member.
     """
-    result = await session.execute(
-        select(ShoppingList)
-        .where(ShoppingList.id == list_id)
-        .options(
-            selectinload(ShoppingList.shared_with),
-            selectinload(ShoppingList.items),
-            selectinload(ShoppingList.owner),
-        )
-    )
-    shopping_list = result.scalars().first()
+    await list_membership_cache.authorize(list_id, current_user.id, session)
+    shopping_list = await session.get(ShoppingList, list_id)
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Shopping list not found")
-    if (
-        shopping_list.owner_id != current_user.id
-        and current_user not in shopping_list.shared_with
-    ):
-        raise HTTPException(
-            status_code=403, detail="Not authorized to access this list"
-        )
     return shopping_list
 
 
-async def get_or_create_category(
-    name: Optional[str], session: AsyncSession
-) -> Optional[Category]:
-    """Find an existing category or create a new one."""
-    if not name:
-        return None
-
-    result = await session.execute(
-        select(Category).where(Category.name == name.strip())
-    )
-    category = result.scalars().first()
-
-    if not category:
-        category = Category(name=name.strip())
-        session.add(category)
-        await session.commit()
-        await session.refresh(category)
-
-    return category
-
-
 @router.post("/", response_model=ItemRead)
 async def create_item(
     *,
@@ -119,6 +92,14 @@ async def create_item(
         quantity_display_text=item_in.quantity_display_text,
     )
     session.add(db_item)
+    await category_cache.flush_items(session, [db_item])
+    await change_log.record_change(
+        session,
+        db_item.shopping_list_id,
+        change_log.ENTITY_ITEM,
+        db_item.id,
+        change_log.ACTION_CREATED,
+    )
     await session.commit()
     await session.refresh(
         db_item, attribute_names=["category", "owner", "last_modified_by"]
@@ -139,7 +120,6 @@ async def read_item(
         select(Item)
         .where(Item.id == item_id)
         .options(
-            selectinload(Item.shopping_list).selectinload(ShoppingList.shared_with),
             selectinload(Item.category),
             selectinload(Item.owner),
             selectinload(Item.last_modified_by),
@@ -151,56 +131,44 @@ async def read_item(
 
     # Check if user has permission to view items in this shopping list
     # Allow both owner and shared users to view items
-    if (
-        item.shopping_list.owner_id != current_user.id
-        and current_user not in item.shopping_list.shared_with
-    ):
-        raise HTTPException(status_code=403, detail="Not authorized to view this item")
+    await list_membership_cache.authorize(
+        item.shopping_list_id,
+        current_user.id,
+        session,
+        detail="Not authorized to view this item",
+    )
 
-    return item
+    return FastJSONResponse(item_to_dict(item))
 
 
 @router.get("/list/{list_id}", response_model=List[ItemRead])
 async def read_items_from_list(
     list_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get all items from a specific shopping list.
+    Supports conditional requests with If-None-Match.
     """
-    # Check if the shopping list exists and if user has access to it
-    result = await session.execute(
-        select(ShoppingList)
-        .where(ShoppingList.id == list_id)
-        .options(selectinload(ShoppingList.shared_with))
-    )
-    shopping_list = result.scalars().first()
-    if not shopping_list:
-        raise HTTPException(status_code=404, detail="Shopping list not found")
+    etag = await get_shopping_list_etag(list_id, session, current_user, "items")
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    # Check if user has permission to view items in this shopping list
-    # Allow both owner and shared users to view items
-    if (
-        shopping_list.owner_id != current_user.id
-        and current_user not in shopping_list.shared_with
-    ):
-        raise HTTPException(
-            status_code=403, detail="Not authorized to view items in this list"
-        )
+    # Access was checked while computing the ETag
     # Eagerly load category for all items
     result = await session.execute(
         select(Item)
         .where(Item.shopping_list_id == list_id)
         .options(
             selectinload(Item.category),
-            selectinload(Item.shopping_list),
             selectinload(Item.owner),
             selectinload(Item.last_modified_by),
         )
     )
     items = result.scalars().all()
-    return items
+    return FastJSONResponse(items_to_dicts(items), headers={"ETag": etag})
 
 
 @router.put("/{item_id}", response_model=ItemRead)
@@ -217,12 +185,12 @@ async def update_item(
     """
     # Capture user ID early to avoid async context issues
     current_user_id = str(current_user.id)
-    # Eagerly load shopping_list relationship including shared_with
+    # Eagerly load the item with its list row (not the list's items or members)
     result = await session.execute(
         select(Item)
         .where(Item.id == item_id)
         .options(
-            selectinload(Item.shopping_list).selectinload(ShoppingList.shared_with),
+            selectinload(Item.shopping_list),
             selectinload(Item.category),
             selectinload(Item.owner),
             selectinload(Item.last_modified_by),
@@ -234,13 +202,12 @@ async def update_item(
 
     # Check if user has permission to update items in this shopping list
     # Allow both owner and shared users to update items
-    if (
-        db_item.shopping_list.owner_id != current_user.id
-        and current_user not in db_item.shopping_list.shared_with
-    ):
-        raise HTTPException(
-            status_code=403, detail="Not authorized to update this item"
-        )
+    await list_membership_cache.authorize(
+        db_item.shopping_list_id,
+        current_user.id,
+        session,
+        detail="Not authorized to update this item",
+    )
 
     # Store original values for audit logging
     original_is_completed = db_item.is_completed
@@ -294,6 +261,13 @@ async def update_item(
         )
 
     session.add(db_item)
+    await change_log.record_change(
+        session,
+        db_item.shopping_list_id,
+        change_log.ENTITY_ITEM,
+        db_item.id,
+        change_log.ACTION_UPDATED,
+    )
     await session.commit()
     await session.refresh(
         db_item, attribute_names=["category", "owner", "last_modified_by"]
@@ -301,11 +275,7 @@ async def update_item(
 
     # Send real-time notification to list members
     try:
-        from app.schemas.item import ItemRead
-
-        item_data = ItemRead.model_validate(db_item, from_attributes=True).model_dump(
-            mode="json"
-        )
+        item_data = item_to_dict(db_item)
         await websocket_service.notify_item_updated(
             list_id=db_item.shopping_list_id,
             item_data=item_data,
@@ -331,12 +301,10 @@ async def delete_item(
     """
     # Capture user ID early to avoid async context issues
     current_user_id = str(current_user.id)
-    # Eagerly load shopping_list relationship including shared_with
     result = await session.execute(
         select(Item)
         .where(Item.id == item_id)
         .options(
-            selectinload(Item.shopping_list).selectinload(ShoppingList.shared_with),
             selectinload(Item.owner),
             selectinload(Item.last_modified_by),
         )
@@ -347,19 +315,25 @@ async def delete_item(
 
     # Check if user has permission to delete items in this shopping list
     # Allow both owner and shared users to delete items
-    if (
-        item.shopping_list.owner_id != current_user.id
-        and current_user not in item.shopping_list.shared_with
-    ):
-        raise HTTPException(
-            status_code=403, detail="Not authorized to delete this item"
-        )
+    await list_membership_cache.authorize(
+        item.shopping_list_id,
+        current_user.id,
+        session,
+        detail="Not authorized to delete this item",
+    )
 
     # Store list_id before deletion for WebSocket notification
     list_id = item.shopping_list_id
     item_id_for_notification = item.id
 
     await session.delete(item)
+    await change_log.record_change(
+        session,
+        list_id,
+        change_log.ENTITY_ITEM,
+        item_id_for_notification,
+        change_log.ACTION_DELETED,
+    )
     await session.commit()
 
     # Send real-time notification to list members
@@ -3,15 +3,14 @@ Response builders for shopping list endpoints.
 """
 
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
 from app.models.shopping_list import ShoppingList
-from app.schemas.item import ItemRead
+from app.schemas import serializers
 from app.schemas.shopping_list import ShoppingListRead
-from app.schemas.user import UserRead
 
 from ..helpers import shopping_list_helpers as helpers
 
@@ -32,32 +31,25 @@ class ResponseBuilder:
 
     @staticmethod
     async def build_lists_response(
-        shopping_lists: List[ShoppingList], current_user: User
-    ) -> List[ShoppingListRead]:
-        """Build response for multiple shopping lists."""
-        result_models = []
+        shopping_lists: List[ShoppingList],
+        current_user: User,
+        item_counts: Optional[Dict[int, Tuple[int, int]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Build response for multiple shopping lists as JSON-ready dicts.
+        With item_counts (summary mode) the items are replaced by their counts.
+        """
+        result = []
         for l in shopping_lists:
-            # Sort items by category before converting to Pydantic models
+            counts = {}
+            if item_counts is not None:
+                total, completed = item_counts.get(l.id, (0, 0))
+                counts = {"item_count": total, "completed_item_count": completed}
+            # Sort items by category before serializing
             sorted_items = helpers.sort_items_by_category(l.items) if l.items else []
-            items = [
-                ItemRead.model_validate(i, from_attributes=True) for i in sorted_items
-            ]
-            # Members: shared_with + owner if not already included
-            members = [
-                UserRead.model_validate(u, from_attributes=True) for u in l.shared_with
-            ]
-            if l.owner_id != current_user.id:
-                members.append(UserRead.model_validate(l.owner, from_attributes=True))
-            result_models.append(
-                ShoppingListRead(
-                    id=l.id,
-                    name=l.name,
-                    description=l.description,
-                    owner_id=l.owner_id,
-                    created_at=l.created_at,
-                    updated_at=l.updated_at,
-                    items=items,
-                    members=members,
+            result.append(
+                serializers.shopping_list_to_dict(
+                    l, sorted_items, helpers.list_members(l, current_user), **counts
                 )
             )
-        return result_models
+        return result
@@ -1,7 +1,7 @@
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
@@ -11,14 +11,21 @@ from app.core.dependencies import get_current_user
 from app.models import User
 from app.models.item import Item
 from app.models.shopping_list import ShoppingList
-from app.schemas.item import ItemCreate, ItemRead
+from app.schemas.item import ItemBulkCreate, ItemCreate, ItemRead
+from app.schemas.serializers import FastJSONResponse, item_to_dict, items_to_dicts
 from app.schemas.share import ShareRequest
 from app.schemas.shopping_list import (
+    ShoppingListChanges,
     ShoppingListCreate,
     ShoppingListRead,
+    ShoppingListSummary,
     ShoppingListUpdate,
 )
 from app.schemas.user import UserRead
+from app.services import change_log
+from app.services.category_cache import category_cache
+from app.services.enrichment_queue import enrichment_queue
+from app.services.list_access import list_membership_cache
 
 # Import extracted modules
 from ..helpers import shopping_list_helpers as helpers
@@ -30,6 +37,8 @@ from .websocket_helpers import WebSocketNotifier
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+MAX_LISTS_PER_PAGE = 100
+
 
 @router.post("/", response_model=ShoppingListRead)
 async def create_shopping_list(
@@ -78,75 +87,94 @@ async def create_shopping_list(
 async def read_shopping_lists(
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LISTS_PER_PAGE),
+    summary: bool = Query(False, description="Return item counts instead of items"),
 ):
     """
     Retrieve user's shopping lists (owned and shared).
+    Owned lists come first; use skip/limit to page through them.
     """
     try:
-        # Eagerly load items and shared_with for owned lists
-        result = await session.execute(
-            select(ShoppingList)
-            .where(ShoppingList.owner_id == current_user.id)
-            .options(
-                selectinload(ShoppingList.items).selectinload(Item.category),
-                selectinload(ShoppingList.items).selectinload(Item.owner),
-                selectinload(ShoppingList.items).selectinload(Item.last_modified_by),
-                selectinload(ShoppingList.shared_with),
-            )
-        )
-        owned_lists = result.scalars().all()
-
-        # Eagerly load items and shared_with for shared lists
-        shared_ids_result = await session.execute(
-            select(ShoppingList.id)
-            .join(ShoppingList.shared_with)
-            .where(User.id == current_user.id)
+        lists, item_counts = await helpers.load_shopping_lists_for_user(
+            session, current_user, skip=skip, limit=limit, summary=summary
         )
-        shared_ids = shared_ids_result.scalars().all()
-        if shared_ids:
-            shared_lists_result = await session.execute(
-                select(ShoppingList)
-                .where(ShoppingList.id.in_(shared_ids))
-                .options(
-                    selectinload(ShoppingList.items).selectinload(Item.category),
-                    selectinload(ShoppingList.items).selectinload(Item.owner),
-                    selectinload(ShoppingList.items).selectinload(
-                        Item.last_modified_by
-                    ),
-                    selectinload(ShoppingList.shared_with),
-                )
-            )
-            shared_lists = shared_lists_result.scalars().all()
-        else:
-            shared_lists = []
-
-        lists = list(owned_lists) + list(shared_lists)
         # Use response builder for cleaner code
-        return await ResponseBuilder.build_lists_response(lists, current_user)
+        return FastJSONResponse(
+            await ResponseBuilder.build_lists_response(
+                lists, current_user, item_counts if summary else None
+            )
+        )
 
     except Exception as e:
         print(f"Error in read_shopping_lists: {e}")
         raise
 
 
+@router.get("/summary", response_model=List[ShoppingListSummary])
+async def read_shopping_list_summaries(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LISTS_PER_PAGE),
+):
+    """
+    Retrieve a compact overview of the user's shopping lists.
+    Only names, item counts and last update times, computed in the database.
+    """
+    return await helpers.load_shopping_list_summaries(
+        session, current_user, skip=skip, limit=limit
+    )
+
+
 @router.get("/{list_id}", response_model=ShoppingListRead)
 async def read_shopping_list(
     list_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get a specific shopping list by ID.
+    Supports conditional requests: If-None-Match with the ETag of a previous
+    response returns 304 without loading the list.
     """
+    etag = await helpers.get_shopping_list_etag(list_id, session, current_user, "full")
+    if helpers.etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
     # Get shopping list with permission check
     shopping_list = await helpers.get_shopping_list_by_id(
         list_id, session, current_user
     )
 
-    # Use helper function to build proper Pydantic response
-    # The helper will handle eager loading, sorting, and conversion to Pydantic models
-    return await helpers.build_shopping_list_response(
-        shopping_list, session, current_user
+    # The helper handles eager loading, sorting and serialization
+    return FastJSONResponse(
+        await helpers.build_shopping_list_payload(shopping_list, session, current_user),
+        headers={"ETag": etag},
+    )
+
+
+@router.get("/{list_id}/changes", response_model=ShoppingListChanges)
+async def read_shopping_list_changes(
+    list_id: int,
+    since: int = Query(..., ge=0, description="Last revision the client has"),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Get the changes to a shopping list after the given revision.
+    Returns only the created, updated and deleted items, or full_resync=true
+    when the change log no longer reaches back to that revision.
+    """
+    await list_membership_cache.authorize(list_id, current_user.id, session)
+
+    return FastJSONResponse(
+        await helpers.build_shopping_list_changes_payload(
+            list_id, since, session, current_user
+        )
     )
 
 
@@ -173,6 +201,9 @@ async def update_shopping_list(
     update_data = list_in.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(shopping_list, key, value)
+    await change_log.record_change(
+        session, list_id, change_log.ENTITY_LIST, list_id, change_log.ACTION_UPDATED
+    )
 
     await session.commit()
     await session.refresh(shopping_list)
@@ -244,6 +275,7 @@ async def delete_shopping_list(
     )
     await session.delete(shopping_list)
     await session.commit()
+    await list_membership_cache.invalidate(list_id)
 
     # Notify via WebSocket
     try:
@@ -285,12 +317,21 @@ async def create_item_for_list(
     item_quantity_unit_id = item_in.quantity_unit_id
     item_quantity_display_text = item_in.quantity_display_text
 
-    # Use AI to process the item
-    category, standardized_name, translations, icon_name = (
-        await ItemAIProcessor.process_item_with_ai(
-            item_name, item_category_name, session
+    if enrichment_queue.enabled:
+        # Store the item with what is already known and enrich it in the background
+        category, standardized_name, translations, icon_name, needs_enrichment = (
+            await ItemAIProcessor.process_item_without_ai(
+                item_name, item_category_name, session
+            )
         )
-    )
+    else:
+        # Use AI to process the item
+        category, standardized_name, translations, icon_name = (
+            await ItemAIProcessor.process_item_with_ai(
+                item_name, item_category_name, session
+            )
+        )
+        needs_enrichment = False
 
     # Create new item with AI-enhanced data
     db_item = Item(
@@ -311,33 +352,158 @@ async def create_item_for_list(
     )
 
     session.add(db_item)
+    await category_cache.flush_items(session, [db_item])
+    await change_log.record_change(
+        session,
+        shopping_list_id,
+        change_log.ENTITY_ITEM,
+        db_item.id,
+        change_log.ACTION_CREATED,
+    )
     await session.commit()
     await session.refresh(db_item)
     # Eagerly load relationships for response
     await session.refresh(db_item, attribute_names=["category", "owner"])
 
     # Send real-time notification to list members
-    from app.schemas.item import ItemRead
-
-    item_data = ItemRead.model_validate(db_item, from_attributes=True).model_dump(
-        mode="json"
-    )
+    item_data = item_to_dict(db_item)
     await WebSocketNotifier.notify_item_created(
         list_id=list_id, item_data=item_data, user_id=str(user_id)
     )
 
+    if needs_enrichment:
+        await enrichment_queue.enqueue(
+            item_id=db_item.id,
+            list_id=list_id,
+            user_id=str(user_id),
+            item_name=item_name,
+        )
+
     return db_item
 
 
+@router.post("/{list_id}/items/bulk", response_model=List[ItemRead])
+async def create_items_for_list_bulk(
+    list_id: int,
+    items_in: ItemBulkCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+    _session_context: str = Depends(set_session_context),
+):
+    """
+    Add several items to a specific shopping list at once.
+    AI enrichment is batched, or deferred to the background queue when it is
+    enabled; all items are inserted in one transaction and list members
+    receive a single items_created notification.
+    """
+    # Get shopping list with permission check
+    shopping_list = await helpers.get_shopping_list_by_id(
+        list_id, session, current_user
+    )
+    user_id = current_user.id
+    shopping_list_id = shopping_list.id
+    items = list(items_in.items)
+
+    item_names = [item_in.name for item_in in items]
+    item_category_names = [item_in.category_name for item_in in items]
+    if enrichment_queue.enabled:
+        # Store the items with what is already known and enrich them in the background
+        processed = await ItemAIProcessor.process_items_without_ai(
+            item_names, item_category_names, session
+        )
+        ai_results = [result[:4] for result in processed]
+        needs_enrichment = [result[4] for result in processed]
+    else:
+        # Use AI to process all items with as few requests as possible
+        ai_results = await ItemAIProcessor.process_items_with_ai(
+            item_names, item_category_names, session
+        )
+        needs_enrichment = [False] * len(items)
+
+    db_items = []
+    for item_in, (category, standardized_name, translations, icon_name) in zip(
+        items, ai_results
+    ):
+        db_items.append(
+            Item(
+                name=item_in.name,
+                quantity=item_in.quantity,
+                comment=item_in.comment,
+                shopping_list_id=shopping_list_id,
+                owner_id=user_id,
+                last_modified_by_id=user_id,
+                category_id=category.id if category else None,
+                icon_name=icon_name or item_in.icon_name,
+                standardized_name=standardized_name,
+                translations=translations,
+                quantity_value=item_in.quantity_value,
+                quantity_unit_id=item_in.quantity_unit_id,
+                quantity_display_text=item_in.quantity_display_text,
+            )
+        )
+
+    session.add_all(db_items)
+    await category_cache.flush_items(session, db_items)
+    # Capture the ids before commit expires the instances
+    item_ids = [db_item.id for db_item in db_items]
+    await change_log.record_changes(
+        session,
+        shopping_list_id,
+        [
+            (change_log.ENTITY_ITEM, item_id, change_log.ACTION_CREATED)
+            for item_id in item_ids
+        ],
+    )
+    await session.commit()
+
+    # Reload all created items with their relationships in one query
+    result = await session.execute(
+        select(Item)
+        .where(Item.id.in_(item_ids))
+        .options(
+            selectinload(Item.category),
+            selectinload(Item.owner),
+            selectinload(Item.last_modified_by),
+        )
+        .order_by(Item.id)
+    )
+    created_items = result.scalars().all()
+
+    # Send one real-time notification for the whole batch
+    items_data = items_to_dicts(created_items)
+    await WebSocketNotifier.notify_items_created(
+        list_id=list_id, items_data=items_data, user_id=str(user_id)
+    )
+
+    for item_id, item_in, needs in zip(item_ids, items, needs_enrichment):
+        if needs:
+            await enrichment_queue.enqueue(
+                item_id=item_id,
+                list_id=list_id,
+                user_id=str(user_id),
+                item_name=item_in.name,
+            )
+
+    return created_items
+
+
 @router.get("/{list_id}/items", response_model=List[ItemRead])
 async def read_items_from_list(
     list_id: int,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user),
 ):
     """
     Get all items from a specific shopping list.
+    Supports conditional requests with If-None-Match.
     """
+    etag = await helpers.get_shopping_list_etag(list_id, session, current_user, "items")
+    if helpers.etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
     # Get shopping list with permission check
     shopping_list = await helpers.get_shopping_list_by_id(
         list_id, session, current_user
@@ -348,12 +514,12 @@ async def read_items_from_list(
         .where(Item.shopping_list_id == shopping_list.id)
         .options(
             selectinload(Item.category),
-            selectinload(Item.shopping_list),
             selectinload(Item.owner),
+            selectinload(Item.last_modified_by),
         )
     )
     items = result.scalars().all()
-    return items
+    return FastJSONResponse(items_to_dicts(items), headers={"ETag": etag})
 
 
 @router.post("/{list_id}/share", response_model=ShoppingListRead)
@@ -369,7 +535,7 @@ async def share_shopping_list(
     """
     # Get shopping list with permission check
     shopping_list = await helpers.get_shopping_list_by_id(
-        list_id, session, current_user
+        list_id, session, current_user, with_relationships=True
     )
 
     # Only owner can share
@@ -403,7 +569,7 @@ async def remove_member_from_list(
     """
     # Get shopping list with permission check
     shopping_list = await helpers.get_shopping_list_by_id(
-        list_id, session, current_user
+        list_id, session, current_user, with_relationships=True
     )
 
     # Only owner can remove members
@@ -5,13 +5,14 @@ work correctly without causing 307 redirects that might lose headers.
 """
 
 import logging
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_session
 from app.api.v1.endpoints.shopping_lists import (
+    MAX_LISTS_PER_PAGE,
     create_shopping_list,
     read_shopping_lists,
 )
@@ -30,6 +31,9 @@ async def get_shopping_lists_no_slash(
     request: Request,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(current_user),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LISTS_PER_PAGE),
+    summary: bool = Query(False),
 ):
     """
     Special handler for /api/v1/shopping-lists without trailing slash
@@ -39,7 +43,13 @@ async def get_shopping_lists_no_slash(
     logger.debug(f"Request headers: {request.headers}")
 
     # Call the original handler directly
-    return await read_shopping_lists(session=session, current_user=current_user)
+    return await read_shopping_lists(
+        session=session,
+        current_user=current_user,
+        skip=skip,
+        limit=limit,
+        summary=summary,
+    )
 
 
 # Register POST handler for /api/v1/shopping-lists (no trailing slash)
@@ -3,7 +3,7 @@ WebSocket notification helpers for shopping list operations.
 """
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from app.services.websocket_service import websocket_service
 
@@ -28,6 +28,21 @@ class WebSocketNotifier:
             )
             logger.exception("Full exception details:")
 
+    @staticmethod
+    async def notify_items_created(
+        list_id: int, items_data: List[Dict[str, Any]], user_id: str
+    ):
+        """Send a single notification when several items are created."""
+        try:
+            await websocket_service.notify_items_created(
+                list_id=list_id, items_data=items_data, user_id=user_id
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to send WebSocket notification for bulk item creation: {e}"
+            )
+            logger.exception("Full exception details:")
+
     @staticmethod
     async def notify_item_updated(
         list_id: int, item_data: Dict[str, Any], user_id: str
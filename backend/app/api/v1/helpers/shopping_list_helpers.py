@@ -1,20 +1,25 @@
 """Helper functions for shopping list operations."""
 
 import logging
-from typing import List
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import HTTPException
-from sqlalchemy import select
+from fastapi import HTTPException, Request
+from sqlalchemy import func, select, union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models import User
-from app.models.category import Category
 from app.models.item import Item
-from app.models.shopping_list import ShoppingList
+from app.models.shopping_list import ShoppingList, user_shopping_list
+from app.schemas import serializers
 from app.schemas.item import ItemRead
-from app.schemas.shopping_list import ShoppingListRead
+from app.schemas.shopping_list import ShoppingListRead, ShoppingListSummary
 from app.schemas.user import UserRead
+from app.services import change_log
+from app.services.category_cache import CategoryRef, category_cache
+from app.services.list_access import list_membership_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,63 +28,91 @@ async def get_shopping_list_by_id(
     list_id: int,
     session: AsyncSession,
     current_user: User,
+    with_relationships: bool = False,
 ):
     """
     Helper function to retrieve a ShoppingList by ID,
     ensuring current_user is owner or shared member.
+    Access is checked against the cached list members, so only the list row
+    is loaded unless with_relationships asks for items, members and owner.
     """
-    result = await session.execute(
-        select(ShoppingList)
-        .where(ShoppingList.id == list_id)
-        .options(
+    await list_membership_cache.authorize(list_id, current_user.id, session)
+
+    query = select(ShoppingList).where(ShoppingList.id == list_id)
+    if with_relationships:
+        query = query.options(
             selectinload(ShoppingList.shared_with),
             selectinload(ShoppingList.items),
             selectinload(ShoppingList.owner),
         )
-    )
+    result = await session.execute(query)
     shopping_list = result.scalars().first()
     if not shopping_list:
         raise HTTPException(status_code=404, detail="Shopping list not found")
-    if (
-        shopping_list.owner_id != current_user.id
-        and current_user not in shopping_list.shared_with
-    ):
-        raise HTTPException(
-            status_code=403, detail="Not authorized to access this list"
-        )
     return shopping_list
 
 
-async def get_or_create_category(name: str, session: AsyncSession) -> Category:
-    """Find an existing category or create a new one."""
-    if not name:
-        return None
+async def get_shopping_list_etag(
+    list_id: int, session: AsyncSession, current_user: User, variant: str
+) -> str:
+    """
+    Compute the strong ETag of a list response without loading any items.
+
+    Every item and list change bumps the list revision, as do category renames
+    and profile updates of the users shown, so the revision identifies the
+    content. The access check is answered from the membership
+    cache, leaving a single indexed lookup of the revision.
+
+    Args:
+        list_id (int): The shopping list id.
+        session (AsyncSession): Database session.
+        current_user (User): The requesting user.
+        variant (str): Distinguishes responses with different content, e.g. "items".
+
+    Returns:
+        str: The quoted ETag value.
+    """
+    await list_membership_cache.authorize(list_id, current_user.id, session)
 
     result = await session.execute(
-        select(Category).where(Category.name == name.strip())
+        select(ShoppingList.revision, ShoppingList.owner_id).where(
+            ShoppingList.id == list_id
+        )
     )
-    category = result.scalars().first()
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Shopping list not found")
+    # The member list shown to the owner differs from the one shown to members
+    viewer = "owner" if row.owner_id == current_user.id else "member"
+    return f'"list-{list_id}-r{row.revision}-{variant}-{viewer}"'
 
-    if not category:
-        category = Category(name=name.strip())
-        session.add(category)
-        await session.commit()
-        await session.refresh(category)
 
-    return category
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the If-None-Match header of a request against an ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag in candidates
 
 
-async def build_shopping_list_response(
-    shopping_list, session: AsyncSession, current_user: User
-) -> ShoppingListRead:
-    """
-    Helper function to safely build a ShoppingListRead response from a SQLAlchemy model.
-    Ensures all relationships are properly loaded and converted to Pydantic models.
-    """
-    # Eagerly load all relationships
+async def get_or_create_category(
+    name: Optional[str], session: AsyncSession
+) -> Optional[CategoryRef]:
+    """Find an existing category or create a new one, see CategoryCache."""
+    return await category_cache.get_or_create(name, session)
+
+
+async def _load_shopping_list_for_response(
+    list_id: int, session: AsyncSession
+) -> ShoppingList:
+    """Load a shopping list with everything its response contains."""
     result = await session.execute(
         select(ShoppingList)
-        .where(ShoppingList.id == shopping_list.id)
+        .where(ShoppingList.id == list_id)
         .options(
             selectinload(ShoppingList.items).selectinload(Item.category),
             selectinload(ShoppingList.items).selectinload(Item.owner),
@@ -88,7 +121,28 @@ async def build_shopping_list_response(
             selectinload(ShoppingList.owner),
         )
     )
-    fresh_shopping_list = result.scalars().first()
+    return result.scalars().first()
+
+
+def list_members(shopping_list: ShoppingList, current_user: User) -> List[User]:
+    """Members shown to the current user: shared users, plus the owner if not them."""
+    members = list(shopping_list.shared_with)
+    if shopping_list.owner_id != current_user.id:
+        members.append(shopping_list.owner)
+    return members
+
+
+async def build_shopping_list_response(
+    shopping_list, session: AsyncSession, current_user: User
+) -> ShoppingListRead:
+    """
+    Helper function to safely build a ShoppingListRead response from a SQLAlchemy model.
+    Ensures all relationships are properly loaded and converted to Pydantic models.
+    """
+    # Eagerly load all relationships
+    fresh_shopping_list = await _load_shopping_list_for_response(
+        shopping_list.id, session
+    )
 
     # Convert items to Pydantic models
     items = []
@@ -99,12 +153,8 @@ async def build_shopping_list_response(
     # Convert members to Pydantic models
     members = [
         UserRead.model_validate(u, from_attributes=True)
-        for u in fresh_shopping_list.shared_with
+        for u in list_members(fresh_shopping_list, current_user)
     ]
-    if fresh_shopping_list.owner_id != current_user.id:
-        members.append(
-            UserRead.model_validate(fresh_shopping_list.owner, from_attributes=True)
-        )
 
     # Build and return Pydantic model
     return ShoppingListRead(
@@ -114,11 +164,262 @@ async def build_shopping_list_response(
         owner_id=fresh_shopping_list.owner_id,
         created_at=fresh_shopping_list.created_at,
         updated_at=fresh_shopping_list.updated_at,
+        revision=fresh_shopping_list.revision,
         items=items,
         members=members,
     )
 
 
+async def build_shopping_list_payload(
+    shopping_list, session: AsyncSession, current_user: User
+) -> Dict[str, Any]:
+    """
+    Same response as build_shopping_list_response, projected straight to a
+    JSON-ready dict for read endpoints.
+    """
+    fresh_shopping_list = await _load_shopping_list_for_response(
+        shopping_list.id, session
+    )
+    return serializers.shopping_list_to_dict(
+        fresh_shopping_list,
+        sort_items_by_category(fresh_shopping_list.items),
+        list_members(fresh_shopping_list, current_user),
+    )
+
+
+async def build_shopping_list_changes_payload(
+    list_id: int, since: int, session: AsyncSession, current_user: User
+) -> Dict[str, Any]:
+    """
+    Build the delta of a shopping list after the given revision, projected
+    straight to a JSON-ready dict shaped like ShoppingListChanges.
+    Only the changed items (and the list details, if they changed) are loaded.
+    """
+    change_set = await change_log.get_changes_since(session, list_id, since)
+    if change_set is None:
+        raise HTTPException(status_code=404, detail="Shopping list not found")
+    if change_set.full_resync:
+        return {
+            "revision": change_set.revision,
+            "full_resync": True,
+            "items": [],
+            "deleted_item_ids": [],
+            "shopping_list": None,
+        }
+
+    items = []
+    deleted_item_ids = set(change_set.deleted_item_ids)
+    if change_set.upserted_item_ids:
+        result = await session.execute(
+            select(Item)
+            .where(
+                Item.id.in_(change_set.upserted_item_ids),
+                Item.shopping_list_id == list_id,
+            )
+            .options(
+                selectinload(Item.category),
+                selectinload(Item.owner),
+                selectinload(Item.last_modified_by),
+            )
+        )
+        items = sort_items_by_category(result.scalars().all())
+        # Items that are gone by now count as deleted
+        deleted_item_ids.update(
+            set(change_set.upserted_item_ids) - {item.id for item in items}
+        )
+
+    shopping_list_data = None
+    if change_set.list_changed:
+        result = await session.execute(
+            select(ShoppingList)
+            .where(ShoppingList.id == list_id)
+            .options(
+                selectinload(ShoppingList.shared_with),
+                selectinload(ShoppingList.owner),
+            )
+        )
+        shopping_list = result.scalars().first()
+        shopping_list_data = serializers.shopping_list_to_dict(
+            shopping_list, [], list_members(shopping_list, current_user)
+        )
+        shopping_list_data["revision"] = change_set.revision
+
+    return {
+        "revision": change_set.revision,
+        "full_resync": False,
+        "items": serializers.items_to_dicts(items),
+        "deleted_item_ids": sorted(deleted_item_ids),
+        "shopping_list": shopping_list_data,
+    }
+
+
+def user_shopping_lists_filter(current_user: User):
+    """
+    WHERE clause matching the lists a user owns or is a member of.
+
+    The ids come from a UNION of two index lookups (shopping_list.owner_id and
+    the user_shopping_list primary key). An OR of the owner condition and an
+    IN subquery would force a sequential scan of every shopping list.
+    """
+    list_ids = union(
+        select(ShoppingList.id).where(ShoppingList.owner_id == current_user.id),
+        select(user_shopping_list.c.shopping_list_id).where(
+            user_shopping_list.c.user_id == current_user.id
+        ),
+    )
+    return ShoppingList.id.in_(list_ids)
+
+
+async def load_shopping_list_summaries(
+    session: AsyncSession,
+    current_user: User,
+    skip: int = 0,
+    limit: Optional[int] = None,
+) -> List[ShoppingListSummary]:
+    """
+    Summarize a user's lists with a single aggregate query.
+
+    Args:
+        session (AsyncSession): Database session.
+        current_user (User): The user whose lists are summarized.
+        skip (int): Number of lists to skip.
+        limit (Optional[int]): Maximum number of lists, or None for all.
+
+    Returns:
+        List[ShoppingListSummary]: Owned lists first, then shared ones.
+    """
+    query = (
+        select(
+            ShoppingList.id,
+            ShoppingList.name,
+            ShoppingList.owner_id,
+            func.count(Item.id).label("item_count"),
+            func.count(Item.id)
+            .filter(Item.is_completed.is_(True))
+            .label("completed_item_count"),
+            func.greatest(ShoppingList.updated_at, func.max(Item.updated_at)).label(
+                "updated_at"
+            ),
+            ShoppingList.revision,
+        )
+        .outerjoin(Item, Item.shopping_list_id == ShoppingList.id)
+        .where(user_shopping_lists_filter(current_user))
+        .group_by(ShoppingList.id)
+        .order_by(ShoppingList.owner_id != current_user.id, ShoppingList.id)
+        .offset(skip)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    result = await session.execute(query)
+    return [ShoppingListSummary.model_validate(row._mapping) for row in result]
+
+
+async def load_shopping_lists_for_user(
+    session: AsyncSession,
+    current_user: User,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    summary: bool = False,
+) -> Tuple[List[ShoppingList], Dict[int, Tuple[int, int]]]:
+    """
+    Load the lists a user owns or is a member of with a fixed number of queries.
+
+    Owned and shared lists come from one query (owned first), their members
+    and items from one query each, and every user referenced by a list or an
+    item from a single query, since they are the same few family members.
+    The relationships are attached with set_committed_value, so serializing
+    the lists triggers no further loads.
+
+    Args:
+        session (AsyncSession): Database session.
+        current_user (User): The user whose lists are loaded.
+        skip (int): Number of lists to skip.
+        limit (Optional[int]): Maximum number of lists, or None for all.
+        summary (bool): Count items per list instead of loading them.
+
+    Returns:
+        Tuple[List[ShoppingList], Dict[int, Tuple[int, int]]]: The lists and,
+        in summary mode, (item count, completed item count) per list id.
+    """
+    query = (
+        select(ShoppingList)
+        .where(user_shopping_lists_filter(current_user))
+        .order_by(ShoppingList.owner_id != current_user.id, ShoppingList.id)
+        .offset(skip)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    shopping_lists = list((await session.execute(query)).scalars().all())
+    if not shopping_lists:
+        return [], {}
+    list_ids = [shopping_list.id for shopping_list in shopping_lists]
+
+    member_rows = (
+        await session.execute(
+            select(
+                user_shopping_list.c.shopping_list_id, user_shopping_list.c.user_id
+            ).where(user_shopping_list.c.shopping_list_id.in_(list_ids))
+        )
+    ).all()
+    user_ids = {shopping_list.owner_id for shopping_list in shopping_lists}
+    user_ids.update(user_id for _, user_id in member_rows)
+
+    items_by_list: Dict[int, List[Item]] = defaultdict(list)
+    item_counts: Dict[int, Tuple[int, int]] = {}
+    if summary:
+        count_rows = await session.execute(
+            select(
+                Item.shopping_list_id,
+                func.count(Item.id),
+                func.count(Item.id).filter(Item.is_completed.is_(True)),
+            )
+            .where(Item.shopping_list_id.in_(list_ids))
+            .group_by(Item.shopping_list_id)
+        )
+        item_counts = {list_id: (total, done) for list_id, total, done in count_rows}
+    else:
+        items = (
+            (
+                await session.execute(
+                    select(Item)
+                    .where(Item.shopping_list_id.in_(list_ids))
+                    .options(selectinload(Item.category))
+                )
+            )
+            .scalars()
+            .all()
+        )
+        for item in items:
+            items_by_list[item.shopping_list_id].append(item)
+            user_ids.add(item.owner_id)
+            user_ids.add(item.last_modified_by_id)
+
+    users_result = await session.execute(select(User).where(User.id.in_(user_ids)))
+    users = {user.id: user for user in users_result.scalars().all()}
+
+    for items in items_by_list.values():
+        for item in items:
+            set_committed_value(item, "owner", users.get(item.owner_id))
+            set_committed_value(
+                item, "last_modified_by", users.get(item.last_modified_by_id)
+            )
+
+    members_by_list: Dict[int, List[User]] = defaultdict(list)
+    for list_id, user_id in member_rows:
+        if user_id in users:
+            members_by_list[list_id].append(users[user_id])
+    for shopping_list in shopping_lists:
+        set_committed_value(shopping_list, "owner", users.get(shopping_list.owner_id))
+        set_committed_value(
+            shopping_list, "shared_with", members_by_list.get(shopping_list.id, [])
+        )
+        set_committed_value(
+            shopping_list, "items", items_by_list.get(shopping_list.id, [])
+        )
+
+    return shopping_lists, item_counts
+
+
 def sort_items_by_category(items: List[Item]) -> List[Item]:
     """
     Sort items by category, then by completion status, then by name.
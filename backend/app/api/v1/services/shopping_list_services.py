@@ -9,11 +9,13 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
-from app.models.category import Category
 from app.models.item import Item
 from app.models.shopping_list import ShoppingList
 from app.schemas.item import ItemCreate
+from app.services import change_log
 from app.services.ai_service import ai_service
+from app.services.category_cache import CategoryRef, category_cache
+from app.services.list_access import list_membership_cache
 from app.services.notification_service import send_list_invitation_email
 from app.services.websocket_service import websocket_service
 
@@ -26,7 +28,7 @@ class ItemCreationService:
     @staticmethod
     async def process_item_with_ai(
         item_name: str, session: AsyncSession
-    ) -> Tuple[Optional[Category], Optional[str], Dict, Optional[str]]:
+    ) -> Tuple[Optional[CategoryRef], Optional[str], Dict, Optional[str]]:
         """
         Process item with AI to get category, standardized name, translations, and icon.
         Returns: (category, standardized_name, translations, icon_name)
@@ -37,75 +39,35 @@ class ItemCreationService:
         icon_name = None
 
         try:
-            # Get existing categories for AI context
-            categories_result = await session.execute(select(Category))
-            existing_categories = categories_result.scalars().all()
-            category_names = [cat.name for cat in existing_categories]
-
-            # Run AI calls in parallel with timeout
-            category_task = asyncio.create_task(
-                ai_service.suggest_category_async(item_name, category_names)
-            )
-            translation_task = asyncio.create_task(
-                ai_service.standardize_and_translate_item_name(item_name)
-            )
+            # Existing categories for AI context, from the in-memory snapshot
+            category_names = category_cache.names()
 
-            # Wait for both with timeout (max 15 seconds total)
+            # Category, icon and standardization come from a single AI request
             try:
-                category_name, standardization_result = await asyncio.wait_for(
-                    asyncio.gather(
-                        category_task, translation_task, return_exceptions=True
-                    ),
+                enrichment = await asyncio.wait_for(
+                    ai_service.enrich_item(item_name, category_names),
                     timeout=15.0,
                 )
-
-                # Handle category result
-                if isinstance(category_name, Exception):
-                    logger.error(f"Category suggestion failed: {category_name}")
-                    category_name = None
-                elif category_name:
-                    from app.api.v1.helpers.shopping_list_helpers import (
-                        get_or_create_category,
-                    )
-
-                    category = await get_or_create_category(category_name, session)
-
-                # Handle translation result
-                if isinstance(standardization_result, Exception):
-                    logger.error(f"Translation failed: {standardization_result}")
-                    standardization_result = {}
-
-                standardized_name = (
-                    standardization_result.get("standardized_name")
-                    if standardization_result
-                    else None
-                )
-                translations = (
-                    standardization_result.get("translations", {})
-                    if standardization_result
-                    else {}
-                )
-
-                # Get icon suggestion only if we have a category
-                if category:
-                    try:
-                        icon_name = await asyncio.wait_for(
-                            ai_service.suggest_icon(item_name, category.name),
-                            timeout=10.0,
-                        )
-                    except asyncio.TimeoutError:
-                        logger.warning(
-                            f"Icon suggestion timed out for item '{item_name}'"
-                        )
-                        icon_name = "shopping_cart"
-                    except Exception as e:
-                        logger.error(f"Icon suggestion failed: {e}")
-                        icon_name = "shopping_cart"
-
             except asyncio.TimeoutError:
                 logger.warning(
                     f"AI processing timed out for item '{item_name}' - using fallbacks"
                 )
+                enrichment = {}
+
+            category_name = enrichment.get("category_name")
+            if category_name:
+                from app.api.v1.helpers.shopping_list_helpers import (
+                    get_or_create_category,
+                )
+
+                category = await get_or_create_category(category_name, session)
+
+            standardized_name = enrichment.get("standardized_name")
+            translations = enrichment.get("translations") or {}
+
+            # The icon was suggested for the category, so only use it alongside one
+            if category:
+                icon_name = enrichment.get("icon_name") or "shopping_cart"
 
         except Exception as e:
             logger.error(f"Error in AI processing for item '{item_name}': {e}")
@@ -165,6 +127,7 @@ class ItemCreationService:
         )
 
         session.add(item)
+        await category_cache.flush_items(session, [item])
         await session.commit()
         await session.refresh(item)
 
@@ -256,7 +219,15 @@ class SharingService:
         # User exists - proceed with sharing
         if user_to_share_with not in shopping_list.shared_with:
             shopping_list.shared_with.append(user_to_share_with)
+            await change_log.record_change(
+                session,
+                shopping_list.id,
+                change_log.ENTITY_LIST,
+                shopping_list.id,
+                change_log.ACTION_UPDATED,
+            )
             await session.commit()
+            await list_membership_cache.invalidate(shopping_list.id)
             await session.refresh(
                 shopping_list, attribute_names=["shared_with", "owner"]
             )
@@ -358,7 +329,15 @@ class SharingService:
         # Remove the user from shared_with if they're in the list
         if user_to_remove in shopping_list.shared_with:
             shopping_list.shared_with.remove(user_to_remove)
+            await change_log.record_change(
+                session,
+                shopping_list.id,
+                change_log.ENTITY_LIST,
+                shopping_list.id,
+                change_log.ACTION_UPDATED,
+            )
             await session.commit()
+            await list_membership_cache.invalidate(shopping_list.id)
 
         # Refresh to get updated relationships
         await session.refresh(shopping_list, attribute_names=["shared_with", "owner"])
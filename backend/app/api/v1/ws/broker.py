@@ -0,0 +1,162 @@
+"""
+Message brokers for fanning out WebSocket broadcasts across workers.
+
+Every broadcast is published to a per-list channel, and each worker delivers
+the messages it receives to the sockets it holds itself. The in-memory broker
+only reaches the current process; the Redis broker uses pub/sub so that all
+uvicorn workers and containers see every change.
+"""
+
+import asyncio
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from redis.exceptions import RedisError
+
+from app.core.cache import cache_service
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Called with (list_id, envelope) for every message that reaches this worker
+DeliveryHandler = Callable[[int, Dict[str, Any]], Awaitable[None]]
+
+
+class MessageBroker(ABC):
+    """Abstract base class for WebSocket message brokers."""
+
+    def __init__(self, handler: DeliveryHandler):
+        self._handler = handler
+
+    async def start(self):
+        """Start receiving messages published by other workers."""
+
+    async def stop(self):
+        """Stop the broker and release its resources."""
+
+    @abstractmethod
+    async def publish(self, list_id: int, envelope: Dict[str, Any]):
+        """Publish a message to every worker holding sockets for the list."""
+
+    async def subscribe(self, list_id: int):
+        """Start receiving messages for a list (first local socket connected)."""
+
+    async def unsubscribe(self, list_id: int):
+        """Stop receiving messages for a list (last local socket disconnected)."""
+
+
+class InMemoryBroker(MessageBroker):
+    """Single-process broker that delivers messages directly."""
+
+    async def publish(self, list_id: int, envelope: Dict[str, Any]):
+        await self._handler(list_id, envelope)
+
+
+class RedisBroker(MessageBroker):
+    """Broker using one Redis pub/sub channel per shopping list."""
+
+    def __init__(self, handler: DeliveryHandler):
+        super().__init__(handler)
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed: Set[int] = set()
+
+    @staticmethod
+    def channel(list_id: int) -> str:
+        return f"{settings.WS_BROKER_CHANNEL_PREFIX}{list_id}"
+
+    async def start(self):
+        if not cache_service.redis_client:
+            logger.warning("Redis unavailable, WebSocket broadcasts stay local")
+            return
+        self._pubsub = cache_service.redis_client.pubsub(ignore_subscribe_messages=True)
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        self._subscribed.clear()
+
+    async def publish(self, list_id: int, envelope: Dict[str, Any]):
+        if self._pubsub is not None:
+            try:
+                await cache_service.redis_client.publish(
+                    self.channel(list_id), json.dumps(envelope, default=str)
+                )
+                return
+            except RedisError as e:
+                logger.warning(f"Failed to publish to list {list_id}: {e}")
+
+        # Without Redis at least the sockets of this worker are reached
+        await self._handler(list_id, envelope)
+
+    async def subscribe(self, list_id: int):
+        if self._pubsub is None or list_id in self._subscribed:
+            return
+        self._subscribed.add(list_id)
+        try:
+            await self._pubsub.subscribe(self.channel(list_id))
+        except RedisError as e:
+            self._subscribed.discard(list_id)
+            logger.error(f"Failed to subscribe to list {list_id}: {e}")
+
+    async def unsubscribe(self, list_id: int):
+        if self._pubsub is None or list_id not in self._subscribed:
+            return
+        self._subscribed.discard(list_id)
+        try:
+            await self._pubsub.unsubscribe(self.channel(list_id))
+        except RedisError as e:
+            logger.warning(f"Failed to unsubscribe from list {list_id}: {e}")
+
+    async def _listen(self):
+        prefix = settings.WS_BROKER_CHANNEL_PREFIX
+        while True:
+            if not self._subscribed:
+                await asyncio.sleep(0.1)
+                continue
+            try:
+                message = await self._pubsub.get_message(timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"WebSocket broker listener failed: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            if not message or message.get("type") != "message":
+                continue
+            try:
+                list_id = int(message["channel"][len(prefix) :])
+                envelope = json.loads(message["data"])
+                await self._handler(list_id, envelope)
+            except Exception as e:
+                logger.error(f"Failed to deliver brokered WebSocket message: {e}")
+
+
+def get_broker(handler: DeliveryHandler) -> MessageBroker:
+    """
+    Create the broker configured by WS_BROKER_BACKEND.
+
+    Args:
+        handler (DeliveryHandler): Delivers a message to the sockets of this worker.
+
+    Returns:
+        MessageBroker: The broker instance.
+    """
+    backend = settings.WS_BROKER_BACKEND.lower()
+    if backend == "redis":
+        return RedisBroker(handler)
+    if backend != "memory":
+        logger.warning(f"Unknown WS_BROKER_BACKEND '{backend}', using in-memory broker")
+    return InMemoryBroker(handler)
@@ -2,17 +2,23 @@ import json
 import logging
 import uuid
 from datetime import UTC, datetime
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional
 from uuid import UUID
 
 import jwt
 from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect, status
+from prometheus_client import Gauge
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_session
 from app.core.config import settings
 from app.models import User
+from app.schemas.serializers import to_json
+from app.services.list_access import list_membership_cache
+
+from .broker import MessageBroker, get_broker
+from .sender import WebSocketSender
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -27,74 +33,81 @@ class UUIDJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+class ListConnection:
+    """A single WebSocket connected to a shopping list"""
+
+    __slots__ = ("websocket", "user_id", "list_id", "session_id", "sender")
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: str,
+        list_id: int,
+        session_id: str,
+        sender: WebSocketSender,
+    ):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.list_id = list_id
+        self.session_id = session_id
+        self.sender = sender
+
+
 class ListConnectionManager:
     """
     Enhanced WebSocket connection manager for shopping list real-time updates.
     Manages connections per shopping list (room-based) with JWT authentication.
     Uses session IDs to enable same-user multi-device synchronization.
+    All registries are keyed dicts, so connect, disconnect and lookups are O(1).
     """
 
     def __init__(self):
-        # Dictionary mapping list_id -> set of (websocket, user_id, session_id) tuples
-        self.list_connections: Dict[int, Set[tuple]] = {}
-        # Dictionary mapping websocket -> (user_id, list_id, session_id) for cleanup
-        self.websocket_registry: Dict[WebSocket, tuple] = {}
-        # Dictionary mapping session_id -> websocket for session-based exclusion
-        self.session_registry: Dict[str, WebSocket] = {}
+        # Dictionary mapping list_id -> {session_id: connection}
+        self.list_connections: Dict[int, Dict[str, ListConnection]] = {}
+        # Dictionary mapping user_id -> {session_id: connection}
+        self.user_connections: Dict[str, Dict[str, ListConnection]] = {}
+        # Dictionary mapping websocket -> connection for cleanup
+        self.websocket_registry: Dict[WebSocket, ListConnection] = {}
+        # Dictionary mapping session_id -> connection for session-based exclusion
+        self.session_registry: Dict[str, ListConnection] = {}
+        # Fans broadcasts out to the workers holding sockets for a list
+        self.broker: MessageBroker = get_broker(self.deliver_to_list)
+
+    async def start_broker(self):
+        """Start receiving broadcasts published by other workers"""
+        await self.broker.start()
+
+    async def stop_broker(self):
+        await self.broker.stop()
 
     async def authenticate_user(
         self, token: str, session: AsyncSession
     ) -> Optional[User]:
         """Authenticate user from JWT token"""
         try:
-            # First try to decode without audience validation to check the token structure
-            unverified_payload = jwt.decode(
+            # Decode once; the audience may be a string or a list, so it is
+            # validated manually instead of by PyJWT
+            payload = jwt.decode(
                 token,
                 settings.SECRET_KEY,
                 algorithms=[settings.ALGORITHM],
                 options={"verify_aud": False},
             )
 
-            # Get the audience from the token to handle both string and array formats
-            token_audience = unverified_payload.get("aud")
+            token_audience = payload.get("aud")
             expected_audience = "fastapi-users:auth"
-
-            # Validate audience manually to handle both string and array formats
-            if isinstance(token_audience, list):
-                if expected_audience not in token_audience:
-                    logger.warning(
-                        f"JWT audience validation failed: expected '{expected_audience}' in {token_audience}"
-                    )
-                    return None
-            elif isinstance(token_audience, str):
-                if token_audience != expected_audience:
-                    logger.warning(
-                        f"JWT audience validation failed: expected '{expected_audience}', got '{token_audience}'"
-                    )
-                    return None
-            else:
+            if isinstance(token_audience, str):
+                token_audience = [token_audience]
+            if not isinstance(token_audience, list):
                 logger.warning(
                     f"JWT audience validation failed: invalid audience format {type(token_audience)}"
                 )
                 return None
-
-            # Now decode with proper audience validation (using the format from the token)
-            if isinstance(token_audience, list):
-                # If token has array audience, validate against the array
-                payload = jwt.decode(
-                    token,
-                    settings.SECRET_KEY,
-                    algorithms=[settings.ALGORITHM],
-                    audience=token_audience,
-                )
-            else:
-                # If token has string audience, validate against the string
-                payload = jwt.decode(
-                    token,
-                    settings.SECRET_KEY,
-                    algorithms=[settings.ALGORITHM],
-                    audience=expected_audience,
+            if expected_audience not in token_audience:
+                logger.warning(
+                    f"JWT audience validation failed: expected '{expected_audience}' in {token_audience}"
                 )
+                return None
 
             user_id: str = payload.get("sub")
             if not user_id:
@@ -118,24 +131,7 @@ class ListConnectionManager:
         self, user: User, list_id: int, session: AsyncSession
     ) -> bool:
         """Check if user has access to the shopping list"""
-        from app.models import ShoppingList
-
-        # Check if user owns the list or it's shared with them
-        result = await session.execute(
-            select(ShoppingList).where(
-                ShoppingList.id == list_id, ShoppingList.owner_id == user.id
-            )
-        )
-        if result.scalars().first():
-            return True
-
-        # Check if list is shared with user
-        result = await session.execute(
-            select(ShoppingList)
-            .where(ShoppingList.id == list_id)
-            .join(ShoppingList.shared_with.and_(User.id == user.id))
-        )
-        return result.scalars().first() is not None
+        return await list_membership_cache.can_access(user.id, list_id, session)
 
     async def connect(self, websocket: WebSocket, user: User, list_id: int):
         """Connect user to a specific shopping list room with session tracking"""
@@ -144,18 +140,31 @@ class ListConnectionManager:
         # Generate unique session ID for this connection
         session_id = str(uuid.uuid4())
 
+        sender = WebSocketSender(
+            websocket,
+            on_failure=self._drop_connection,
+            max_queue_size=settings.WS_SEND_QUEUE_SIZE,
+            policy=settings.WS_SLOW_CONSUMER_POLICY,
+            send_timeout=settings.WS_SEND_TIMEOUT,
+        )
+        connection = ListConnection(
+            websocket, str(user.id), list_id, session_id, sender
+        )
+
         # Add to list connections
         if list_id not in self.list_connections:
-            self.list_connections[list_id] = set()
-
-        connection_tuple = (websocket, user.id, session_id)
-        self.list_connections[list_id].add(connection_tuple)
+            self.list_connections[list_id] = {}
+            await self.broker.subscribe(list_id)
+        self.list_connections[list_id][session_id] = connection
+        self.user_connections.setdefault(connection.user_id, {})[
+            session_id
+        ] = connection
 
-        # Register websocket for cleanup
-        self.websocket_registry[websocket] = (user.id, list_id, session_id)
+        # Register websocket for cleanup and session for session-based exclusion
+        self.websocket_registry[websocket] = connection
+        self.session_registry[session_id] = connection
 
-        # Register session for session-based exclusion
-        self.session_registry[session_id] = websocket
+        sender.start()
 
         logger.info(
             f"User {user.nickname} connected to list {list_id} with session {session_id}"
@@ -172,49 +181,100 @@ class ListConnectionManager:
             },
         )
 
+    async def send_changes_since(
+        self,
+        websocket: WebSocket,
+        user: User,
+        list_id: int,
+        since: int,
+        session: AsyncSession,
+    ):
+        """Send the changes a reconnecting client missed after its last revision"""
+        from app.api.v1.helpers.shopping_list_helpers import (
+            build_shopping_list_changes_payload,
+        )
+
+        try:
+            changes = await build_shopping_list_changes_payload(
+                list_id, since, session, user
+            )
+        except Exception as e:
+            logger.error(f"Failed to load changes for list {list_id}: {e}")
+            return
+        await self.send_to_websocket(
+            websocket,
+            {
+                "type": "changes",
+                "list_id": list_id,
+                **changes,
+                "timestamp": datetime.now(UTC).isoformat(),
+            },
+        )
+
     async def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection from the manager"""
-        if websocket in self.websocket_registry:
-            registry_data = self.websocket_registry[websocket]
-            if len(registry_data) == 3:
-                user_id, list_id, session_id = registry_data
-            else:
-                # Handle legacy format if exists
-                user_id, list_id = registry_data
-                session_id = "unknown"
-
-            self.websocket_registry.pop(websocket)
-
-            # Remove from connections
-            if list_id in self.list_connections:
-                # Remove the tuple with this websocket
-                self.list_connections[list_id] = {
-                    conn
-                    for conn in self.list_connections[list_id]
-                    if conn[0] != websocket
-                }
-
-                # Clean up empty sets
-                if not self.list_connections[list_id]:
-                    del self.list_connections[list_id]
-
-            # Remove from session registry (only if we have a valid session_id)
-            if session_id != "unknown" and session_id in self.session_registry:
-                del self.session_registry[session_id]
-
-            logger.info(
-                f"User {user_id} disconnected from list {list_id} (session {session_id})"
-            )
-        else:
+        connection = self.websocket_registry.pop(websocket, None)
+        if connection is None:
             logger.warning(
                 "Attempted to disconnect a websocket that was not in the registry"
             )
+            return
+
+        list_id, session_id = connection.list_id, connection.session_id
+        self.session_registry.pop(session_id, None)
+
+        list_sessions = self.list_connections.get(list_id)
+        if list_sessions is not None:
+            list_sessions.pop(session_id, None)
+            if not list_sessions:
+                del self.list_connections[list_id]
+                await self.broker.unsubscribe(list_id)
+
+        user_sessions = self.user_connections.get(connection.user_id)
+        if user_sessions is not None:
+            user_sessions.pop(session_id, None)
+            if not user_sessions:
+                del self.user_connections[connection.user_id]
+
+        await connection.sender.close()
+
+        logger.info(
+            f"User {connection.user_id} disconnected from list {list_id} (session {session_id})"
+        )
+
+    async def _drop_connection(self, websocket: WebSocket, reason: str):
+        """Disconnect a socket whose writer failed or could not keep up"""
+        await self.disconnect(websocket)
+        try:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=reason)
+        except Exception:
+            # The socket may already be gone
+            pass
+
+    @staticmethod
+    def encode_message(data: dict) -> str:
+        """Serialize a message once so it can be sent to any number of sockets"""
+        return to_json(data).decode()
+
+    @staticmethod
+    def coalesce_key(data: dict):
+        """Identify messages about the same entity, of which only the latest matters"""
+        if data.get("type") == "item_change" and data.get("event_type") == "updated":
+            return ("item", data.get("list_id"), (data.get("item") or {}).get("id"))
+        if data.get("type") == "list_change" and data.get("event_type") == "updated":
+            return ("list", data.get("list_id"))
+        return None
 
     async def send_to_websocket(self, websocket: WebSocket, data: dict):
         """Send data to a specific websocket with proper UUID serialization"""
         try:
-            json_data = json.dumps(data, cls=UUIDJSONEncoder)
-            await websocket.send_text(json_data)
+            json_data = self.encode_message(data)
+            connection = self.websocket_registry.get(websocket)
+            if connection:
+                # Keep ordering with broadcasts queued for the same socket
+                connection.sender.enqueue(json_data)
+            else:
+                await websocket.send_text(json_data)
         except Exception as e:
             logger.error(f"Error sending to websocket: {e}")
             # Log the data that failed to serialize for debugging
@@ -228,41 +288,67 @@ class ListConnectionManager:
         exclude_websocket: Optional[WebSocket] = None,
         exclude_session_id: Optional[str] = None,
     ):
-        """Broadcast message to all users connected to a specific list"""
-        if list_id not in self.list_connections:
+        """Broadcast message to all users connected to a specific list, on any worker"""
+        # Sockets only exist on this worker, so exclude them by session ID
+        if exclude_websocket is not None and exclude_session_id is None:
+            connection = self.websocket_registry.get(exclude_websocket)
+            if connection:
+                exclude_session_id = connection.session_id
+
+        await self.broker.publish(
+            list_id,
+            {
+                "data": data,
+                "exclude_user_id": (
+                    str(exclude_user_id) if exclude_user_id is not None else None
+                ),
+                "exclude_session_id": exclude_session_id,
+                "has_exclude_websocket": exclude_websocket is not None,
+            },
+        )
+
+    async def deliver_to_list(self, list_id: int, envelope: dict):
+        """Send a brokered broadcast to the sockets of this worker"""
+        list_sessions = self.list_connections.get(list_id)
+        if not list_sessions:
             return
 
-        disconnected_websockets = []
+        data = envelope["data"]
+        exclude_user_id = envelope.get("exclude_user_id")
+        exclude_session_id = envelope.get("exclude_session_id")
+        has_exclude_websocket = envelope.get("has_exclude_websocket", False)
 
-        for websocket, user_id, session_id in list(self.list_connections[list_id]):
-            # Skip the specific session that triggered the update (for same-user multi-device sync)
-            if exclude_session_id and session_id == exclude_session_id:
-                continue
+        # Encode once; every recipient gets the same text through its own queue
+        text = self.encode_message(data)
+        coalesce_key = self.coalesce_key(data)
 
-            # Skip the specific websocket connection that triggered the update
-            if exclude_websocket and websocket == exclude_websocket:
-                continue
+        # Legacy: Skip the user who triggered the update (deprecated - use exclude_session_id instead)
+        if exclude_session_id is not None or has_exclude_websocket:
+            exclude_user_id = None
 
-            # Legacy: Skip the user who triggered the update (deprecated - use exclude_session_id instead)
-            if (
-                exclude_user_id
-                and user_id == exclude_user_id
-                and exclude_session_id is None
-                and exclude_websocket is None
-            ):
+        for session_id, connection in list(list_sessions.items()):
+            # Skip the specific session that triggered the update (for same-user multi-device sync)
+            if session_id == exclude_session_id:
                 continue
-
-            try:
-                await self.send_to_websocket(websocket, data)
-            except Exception as e:
-                logger.error(
-                    f"Error broadcasting to user {user_id} (session {session_id}): {e}"
-                )
-                disconnected_websockets.append(websocket)
-
-        # Clean up disconnected websockets
-        for websocket in disconnected_websockets:
-            await self.disconnect(websocket)
+            if exclude_user_id and connection.user_id == exclude_user_id:
+                continue
+            connection.sender.enqueue(text, coalesce_key)
+
+    def get_stats(self) -> dict:
+        """Connection counts for monitoring"""
+        per_list = [len(sessions) for sessions in self.list_connections.values()]
+        per_user = [len(sessions) for sessions in self.user_connections.values()]
+        return {
+            "connections": len(self.websocket_registry),
+            "lists": len(per_list),
+            "users": len(per_user),
+            "max_connections_per_list": max(per_list, default=0),
+            "max_connections_per_user": max(per_user, default=0),
+            "queued_messages": sum(
+                connection.sender.queue_size
+                for connection in self.websocket_registry.values()
+            ),
+        }
 
     async def broadcast_item_change(
         self,
@@ -291,6 +377,47 @@ class ListConnectionManager:
             exclude_user_id=exclude_user_id,
         )
 
+    async def broadcast_items_created(
+        self,
+        list_id: int,
+        items_data: List[dict],
+        user_id: str,
+        exclude_websocket: Optional[WebSocket] = None,
+        exclude_session_id: Optional[str] = None,
+        exclude_user_id: Optional[str] = None,
+    ):
+        """Broadcast several newly created items to list members as one message"""
+        message = {
+            "type": "items_created",
+            "list_id": list_id,
+            "items": items_data,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "user_id": user_id,
+        }
+        await self.broadcast_to_list(
+            list_id,
+            message,
+            exclude_websocket=exclude_websocket,
+            exclude_session_id=exclude_session_id,
+            exclude_user_id=exclude_user_id,
+        )
+
+    async def broadcast_item_enriched(
+        self,
+        list_id: int,
+        item_data: dict,
+        user_id: str,
+    ):
+        """Broadcast the AI-enriched version of an item to list members"""
+        message = {
+            "type": "item_enriched",
+            "list_id": list_id,
+            "item": item_data,
+            "timestamp": datetime.now(UTC).isoformat(),
+            "user_id": user_id,
+        }
+        await self.broadcast_to_list(list_id, message)
+
     async def broadcast_list_change(
         self,
         list_id: int,
@@ -322,17 +449,49 @@ class ListConnectionManager:
 # Global connection manager instance
 connection_manager = ListConnectionManager()
 
+# Connection metrics, computed from the registries when scraped
+websocket_connections = Gauge(
+    "familycart_websocket_connections", "Current number of WebSocket connections"
+)
+websocket_connections.set_function(lambda: len(connection_manager.websocket_registry))
+websocket_lists = Gauge(
+    "familycart_websocket_lists",
+    "Shopping lists with at least one WebSocket connection",
+)
+websocket_lists.set_function(lambda: len(connection_manager.list_connections))
+websocket_users = Gauge(
+    "familycart_websocket_users", "Users with at least one WebSocket connection"
+)
+websocket_users.set_function(lambda: len(connection_manager.user_connections))
+websocket_max_connections_per_list = Gauge(
+    "familycart_websocket_max_connections_per_list",
+    "Largest number of WebSocket connections to a single shopping list",
+)
+websocket_max_connections_per_list.set_function(
+    lambda: connection_manager.get_stats()["max_connections_per_list"]
+)
+websocket_max_connections_per_user = Gauge(
+    "familycart_websocket_max_connections_per_user",
+    "Largest number of WebSocket connections held by a single user",
+)
+websocket_max_connections_per_user.set_function(
+    lambda: connection_manager.get_stats()["max_connections_per_user"]
+)
+
 
 @router.websocket("/lists/{list_id}")
 async def websocket_list_endpoint(
     websocket: WebSocket,
     list_id: int,
     token: str = Query(...),
+    since: Optional[int] = Query(None, ge=0),
     session: AsyncSession = Depends(get_session),
 ):
     """
     WebSocket endpoint for real-time updates on a specific shopping list.
     Requires JWT authentication via query parameter.
+    Reconnecting clients can pass the last revision they have as `since` to
+    receive the missed changes as a "changes" message.
     """
     # Authenticate user
     user = await connection_manager.authenticate_user(token, session)
@@ -349,6 +508,11 @@ async def websocket_list_endpoint(
     # Connect to list room
     await connection_manager.connect(websocket, user, list_id)
 
+    if since is not None:
+        await connection_manager.send_changes_since(
+            websocket, user, list_id, since, session
+        )
+
     try:
         while True:
             # Handle incoming messages (ping/pong, heartbeat)
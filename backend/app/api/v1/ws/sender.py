@@ -0,0 +1,155 @@
+"""
+Per-socket outbound queues for WebSocket broadcasts.
+
+Each connection gets a bounded queue drained by its own writer task, so a
+broadcast only encodes the message once and enqueues the text for every
+recipient without waiting on any of them. A slow consumer whose queue fills
+up is handled by the configured policy instead of stalling everyone else.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Slow-consumer policies
+POLICY_DROP = "drop"  # Discard the oldest queued message
+POLICY_COALESCE = "coalesce"  # Replace queued messages about the same entity
+POLICY_DISCONNECT = "disconnect"  # Close the socket; the client reconnects and resyncs
+SLOW_CONSUMER_POLICIES = (POLICY_DROP, POLICY_COALESCE, POLICY_DISCONNECT)
+
+FailureHandler = Callable[[WebSocket, str], Awaitable[None]]
+
+# How long close() waits for a cancelled writer task to finish
+CLOSE_TIMEOUT = 1.0
+
+
+class WebSocketSender:
+    """
+    Bounded outbound queue with a writer task for a single WebSocket.
+
+    Queue entries are [coalesce_key, text] pairs. With the coalesce policy a
+    newer message for the same key replaces the queued one in place, so the
+    client only receives the latest state of an item.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_failure: FailureHandler,
+        max_queue_size: int = 100,
+        policy: str = POLICY_COALESCE,
+        send_timeout: float = 10.0,
+    ):
+        self.websocket = websocket
+        self.max_queue_size = max_queue_size
+        self.policy = policy if policy in SLOW_CONSUMER_POLICIES else POLICY_COALESCE
+        self.send_timeout = send_timeout
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._on_failure = on_failure
+        self._pending: Deque[List[Any]] = deque()
+        self._by_key: Dict[Hashable, List[Any]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._sending = False
+        self._failure_task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def queue_size(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, text: str, coalesce_key: Optional[Hashable] = None) -> bool:
+        """
+        Queue an encoded message without waiting for the socket.
+
+        Returns:
+            bool: False if the message was not accepted.
+        """
+        if self.closed:
+            return False
+
+        if coalesce_key is not None and self.policy == POLICY_COALESCE:
+            entry = self._by_key.get(coalesce_key)
+            if entry is not None:
+                entry[1] = text
+                self.coalesced += 1
+                return True
+
+        if len(self._pending) >= self.max_queue_size:
+            if self.policy == POLICY_DISCONNECT:
+                self._fail("send queue full")
+                return False
+            self._forget(self._pending.popleft())
+            self.dropped += 1
+
+        entry = [coalesce_key, text]
+        self._pending.append(entry)
+        if coalesce_key is not None:
+            self._by_key[coalesce_key] = entry
+        self._wakeup.set()
+        return True
+
+    def _forget(self, entry: List[Any]):
+        if entry[0] is not None and self._by_key.get(entry[0]) is entry:
+            del self._by_key[entry[0]]
+
+    async def _run(self):
+        try:
+            while not self.closed:
+                while not self._pending:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                entry = self._pending.popleft()
+                self._forget(entry)
+                self._sending = True
+                # Unlike wait_for on Python 3.11, a timeout context never
+                # swallows the cancellation from close()
+                async with asyncio.timeout(self.send_timeout):
+                    await self.websocket.send_text(entry[1])
+                self._sending = False
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(f"send failed: {e!r}")
+
+    def _fail(self, reason: str):
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        self._by_key.clear()
+        logger.warning(f"Dropping WebSocket connection: {reason}")
+        self._failure_task = asyncio.create_task(
+            self._on_failure(self.websocket, reason)
+        )
+
+    async def close(self):
+        """
+        Stop the writer task; queued messages are discarded.
+
+        The wait for the task is bounded, so a socket stuck in send_text
+        cannot block the connection manager.
+        """
+        self.closed = True
+        task, self._task = self._task, None
+        if task and task is not asyncio.current_task():
+            task.cancel()
+            done, _ = await asyncio.wait({task}, timeout=CLOSE_TIMEOUT)
+            if not done:
+                logger.warning("WebSocket writer task did not stop after cancel")
+
+    async def drain(self):
+        """Wait until every queued message has been handed to the socket."""
+        while (self._pending or self._sending) and not self.closed:
+            await asyncio.sleep(0)
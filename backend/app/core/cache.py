@@ -1,15 +1,101 @@
+import asyncio
+import json
 import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import redis.asyncio as redis
+from prometheus_client import Counter
+from redis.exceptions import RedisError
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+cache_lookups_total = Counter(
+    "familycart_cache_lookups_total",
+    "Cache lookups per key family (the key prefix before the first colon) "
+    "and result (l1_hit, redis_hit or miss)",
+    ["family", "result"],
+)
+
+
+def _record_lookup(key: str, result: str):
+    cache_lookups_total.labels(key.split(":", 1)[0], result).inc()
+
+
+class LocalLRUCache:
+    """
+    Bounded in-process LRU cache with a per-entry TTL.
+
+    Used as the L1 tier in front of Redis. Not shared between workers, so
+    entries are invalidated through Redis pub/sub (see CacheService).
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, expire: Optional[int] = None):
+        ttl = min(expire, self.ttl) if expire else self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
 
 class CacheService:
     def __init__(self):
         self.redis_client = None
+        self.local_cache = (
+            LocalLRUCache(settings.CACHE_L1_MAX_SIZE, settings.CACHE_L1_TTL)
+            if settings.CACHE_L1_ENABLED
+            else None
+        )
+        # Identifies this worker so it ignores its own invalidation messages
+        self.instance_id = uuid.uuid4().hex
+        self._invalidation_task: Optional[asyncio.Task] = None
 
     async def setup(self):
         try:
@@ -21,18 +107,168 @@ class CacheService:
         except Exception as e:
             logger.error(f"Error connecting to Redis: {e}")
             self.redis_client = None
+            return
+
+        if self.local_cache is not None:
+            self._invalidation_task = asyncio.create_task(
+                self._listen_for_invalidations()
+            )
+
+    def _use_local_cache(self, key: str) -> bool:
+        return self.local_cache is not None and key.startswith(
+            tuple(settings.CACHE_L1_KEY_PREFIXES)
+        )
 
     async def get(self, key: str):
+        if self._use_local_cache(key):
+            value = self.local_cache.get(key)
+            if value is not None:
+                _record_lookup(key, "l1_hit")
+                return value
+
         if not self.redis_client:
+            _record_lookup(key, "miss")
+            return None
+        try:
+            value = await self.redis_client.get(key)
+        except RedisError as e:
+            logger.warning(f"Redis GET failed for {key}: {e}")
+            _record_lookup(key, "miss")
             return None
-        return await self.redis_client.get(key)
+
+        if value is None:
+            _record_lookup(key, "miss")
+        else:
+            _record_lookup(key, "redis_hit")
+            if self._use_local_cache(key):
+                self.local_cache.set(key, value)
+        return value
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Fetch several keys in one round-trip; missing keys come back as None."""
+        values: List[Optional[str]] = [None] * len(keys)
+        remote_indexes = []
+        for index, key in enumerate(keys):
+            if self._use_local_cache(key):
+                values[index] = self.local_cache.get(key)
+            if values[index] is None:
+                remote_indexes.append(index)
+            else:
+                _record_lookup(key, "l1_hit")
+
+        remote_values: List[Optional[str]] = [None] * len(remote_indexes)
+        if self.redis_client and remote_indexes:
+            try:
+                remote_values = await self.redis_client.mget(
+                    [keys[index] for index in remote_indexes]
+                )
+            except RedisError as e:
+                logger.warning(f"Redis MGET failed for {len(remote_indexes)} keys: {e}")
+
+        for index, value in zip(remote_indexes, remote_values):
+            values[index] = value
+            if value is None:
+                _record_lookup(keys[index], "miss")
+                continue
+            _record_lookup(keys[index], "redis_hit")
+            if self._use_local_cache(keys[index]):
+                self.local_cache.set(keys[index], value)
+        return values
 
     async def set(self, key: str, value: str, expire: int = 3600):
+        if self._use_local_cache(key):
+            self.local_cache.set(key, value, expire)
+
         if not self.redis_client:
             return
-        await self.redis_client.set(key, value, ex=expire)
+        try:
+            await self.redis_client.set(key, value, ex=expire)
+        except RedisError as e:
+            logger.warning(f"Redis SET failed for {key}: {e}")
+            return
+
+        if self._use_local_cache(key):
+            await self._publish_invalidation([key])
+
+    async def delete(self, *keys: str):
+        """Remove keys from both tiers and tell other workers to drop them."""
+        if not keys:
+            return
+        if self.local_cache is not None:
+            for key in keys:
+                self.local_cache.delete(key)
+
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.delete(*keys)
+        except RedisError as e:
+            logger.warning(f"Redis DELETE failed for {keys}: {e}")
+            return
+
+        await self._publish_invalidation(list(keys))
+
+    async def ping(self):
+        """Check the Redis connection; raises if Redis is unavailable."""
+        if not self.redis_client:
+            raise ConnectionError("Redis is not connected")
+        return await self.redis_client.ping()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "redis_connected": self.redis_client is not None,
+            "l1": self.local_cache.get_stats() if self.local_cache else None,
+        }
+
+    async def _publish_invalidation(self, keys: List[str]):
+        if self.local_cache is None:
+            return
+        message = json.dumps({"origin": self.instance_id, "keys": keys})
+        try:
+            await self.redis_client.publish(
+                settings.CACHE_INVALIDATION_CHANNEL, message
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to publish cache invalidation: {e}")
+
+    def _handle_invalidation(self, data: str):
+        try:
+            message = json.loads(data)
+        except (TypeError, json.JSONDecodeError):
+            logger.warning("Ignoring malformed cache invalidation message")
+            return
+        if message.get("origin") == self.instance_id:
+            return
+        for key in message.get("keys", []):
+            self.local_cache.delete(key)
+
+    async def _listen_for_invalidations(self):
+        """Drop L1 entries written or deleted by other workers."""
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                # Entries may have changed while we were not listening
+                logger.warning(f"Cache invalidation listener failed: {e}")
+                self.local_cache.clear()
+                await pubsub.aclose()
+                await asyncio.sleep(1)
 
     async def close(self):
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
         if self.redis_client:
             await self.redis_client.close()
             logger.info("Redis connection closed.")
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import model_validator
 from pydantic_settings import BaseSettings
@@ -39,6 +39,22 @@ class Settings(BaseSettings):
             )
         return self
 
+    # Async engine connection pool (per worker process)
+    DB_POOL_SIZE: int = 10  # Connections kept open
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = (
+        1800  # Seconds before a connection is replaced, -1 to disable
+    )
+    DB_POOL_PRE_PING: bool = (
+        False  # Test connections on checkout (one extra round-trip)
+    )
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Prepared statements cached per connection
+    # PgBouncer in transaction pooling mode cannot keep prepared statements
+    # across transactions; this disables statement caching and names each
+    # prepared statement uniquely
+    DB_PGBOUNCER_MODE: bool = False
+
     # fastapi-users & JWT
     SECRET_KEY: str = "a_very_secret_key"  # CHANGE THIS!
     ALGORITHM: str = "HS256"
@@ -72,12 +88,92 @@ class Settings(BaseSettings):
     )
     OLLAMA_TIMEOUT: int = 120  # Request timeout in seconds
 
+    # Maximum number of items enriched by a single batched AI prompt
+    AI_BATCH_MAX_SIZE: int = 20
+
+    # Identical concurrent AI lookups share one provider call per process;
+    # the Redis lock extends this across workers
+    AI_SINGLE_FLIGHT_REDIS_LOCK: bool = False
+    AI_SINGLE_FLIGHT_LOCK_TTL: float = 30.0  # Seconds other workers wait at most
+    AI_SINGLE_FLIGHT_POLL_INTERVAL: float = 0.1  # Seconds between cache checks
+
+    # Adaptive (AIMD) limit on concurrent calls per AI provider
+    AI_CONCURRENCY_INITIAL: int = 8
+    AI_CONCURRENCY_MIN: int = 1
+    AI_CONCURRENCY_MAX: int = 32
+    AI_CONCURRENCY_LATENCY_TARGET: float = 10.0  # Slower calls shrink the limit
+    AI_CONCURRENCY_MAX_WAIT: float = 2.0  # Seconds to wait for a free slot
+
+    # Circuit breaker per AI provider, shared by all workers through Redis
+    AI_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open it
+    AI_BREAKER_OPEN_SECONDS: float = 30.0  # First wait before a probe call
+    AI_BREAKER_MAX_OPEN_SECONDS: float = 600.0  # Cap for the doubling wait
+    AI_BREAKER_SYNC_INTERVAL: float = 1.0  # Seconds between reads of Redis state
+
+    # Hedging: also ask the fallback provider when the primary is slower than
+    # the given percentile of its recent latencies for the same operation
+    AI_HEDGING_ENABLED: bool = False
+    AI_HEDGE_PERCENTILE: float = 95.0
+    AI_HEDGE_MIN_DELAY: float = 0.5  # Seconds
+    AI_HEDGE_MAX_DELAY: float = 5.0  # Seconds; also used until enough samples
+    AI_HEDGE_WINDOW: int = 200  # Latencies kept per operation
+    AI_HEDGE_MIN_SAMPLES: int = 20
+
+    # Local categorizer consulted before any AI provider
+    LOCAL_CATEGORIZER_ENABLED: bool = True
+    LOCAL_CATEGORIZER_THRESHOLD: float = 0.75  # Minimum confidence to skip the LLM
+    LOCAL_CATEGORIZER_REFRESH_INTERVAL: int = 300  # Seconds between incremental loads
+
+    # AI enrichment of new items
+    AI_ENRICHMENT_MODE: str = "sync"  # Options: "sync", "background"
+    AI_ENRICHMENT_WORKERS: int = 4  # Concurrent background enrichment jobs per process
+    AI_ENRICHMENT_MAX_RETRIES: int = 3
+    AI_ENRICHMENT_JOB_TIMEOUT: int = 60  # Seconds a background job may wait for AI
+    AI_ENRICHMENT_QUEUE_KEY: str = "ai_enrichment:queue"
+    AI_ENRICHMENT_DEAD_LETTER_KEY: str = "ai_enrichment:dead_letter"
+    AI_ENRICHMENT_RETRY_KEY: str = "ai_enrichment:retry"  # Sorted set by due time
+    # Prefix of the per-worker lists holding the jobs being processed
+    AI_ENRICHMENT_PROCESSING_KEY: str = "ai_enrichment:processing"
+    # Seconds after which the jobs of a silent worker are requeued
+    AI_ENRICHMENT_HEARTBEAT_TTL: int = 30
+
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: Optional[str] = None
     REDIS_URL: Optional[str] = None
 
+    # In-process L1 cache in front of Redis for hot, rarely changing keys
+    CACHE_L1_ENABLED: bool = True
+    CACHE_L1_MAX_SIZE: int = 10000  # Maximum number of entries per worker
+    CACHE_L1_TTL: int = 300  # Seconds an entry may be served without Redis
+    CACHE_L1_KEY_PREFIXES: List[str] = [
+        "category_suggestion:",
+        "icon_suggestion:",
+        "standardized_name:",
+        "list_members:",
+    ]
+    # Redis pub/sub channel used to keep the L1 caches of all workers coherent
+    CACHE_INVALIDATION_CHANNEL: str = "cache:invalidate"
+    # Redis pub/sub channel used to keep the category caches of all workers coherent
+    CATEGORY_CACHE_CHANNEL: str = "category_cache:changes"
+
+    # Seconds the member ids of a shopping list are cached for access checks
+    LIST_MEMBERS_CACHE_TTL: int = 60
+
+    # Change log entries kept per shopping list for delta sync
+    CHANGE_LOG_MAX_ENTRIES_PER_LIST: int = 500
+
+    # WebSocket fan-out across workers
+    WS_BROKER_BACKEND: str = "memory"  # Options: "memory", "redis"
+    WS_BROKER_CHANNEL_PREFIX: str = "ws:list:"
+    # Outbound queue per WebSocket connection
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_SEND_TIMEOUT: float = 10.0  # Seconds before a stuck send drops the connection
+    WS_SLOW_CONSUMER_POLICY: str = (
+        "coalesce"  # Options: "drop", "coalesce", "disconnect"
+    )
+
     @model_validator(mode="after")
     def get_redis_url(self) -> "Settings":
         if self.REDIS_PASSWORD:
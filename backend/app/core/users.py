@@ -1,5 +1,6 @@
 import logging
 import uuid
+from typing import Any, Dict
 
 from fastapi import Depends, Request
 from fastapi_users import BaseUserManager, UUIDIDMixin
@@ -7,17 +8,59 @@ from fastapi_users import BaseUserManager, UUIDIDMixin
 from app.api.deps import get_user_db
 from app.core.config import settings
 from app.models.user import User
+from app.services import change_log
 from app.services.email_service import get_email_service
 
 logger = logging.getLogger(__name__)
 
 
+# User fields shown in shopping list responses, see app.schemas.serializers
+LIST_RESPONSE_USER_FIELDS = frozenset(
+    {
+        "email",
+        "nickname",
+        "first_name",
+        "last_name",
+        "is_active",
+        "is_superuser",
+        "is_verified",
+    }
+)
+
+
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     """Manages user authentication and operations."""
 
     reset_password_token_secret = settings.SECRET_KEY
     verification_token_secret = settings.SECRET_KEY
 
+    async def on_after_update(
+        self, user: User, update_dict: Dict[str, Any], request: Request | None = None
+    ):
+        """
+        Called after a user is updated.
+        Bumps the revision of the shopping lists showing the user, so their
+        ETags and delta sync pick up the new profile.
+        """
+        if LIST_RESPONSE_USER_FIELDS.intersection(update_dict):
+            await self._record_profile_change(user)
+
+    async def on_after_verify(self, user: User, request: Request | None = None):
+        """
+        Called after a user verifies their email.
+        Verification changes is_verified, which list members show.
+        """
+        await self._record_profile_change(user)
+
+    async def _record_profile_change(self, user: User):
+        session = self.user_db.session
+        try:
+            await change_log.record_user_updated(session, user.id)
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Failed to record profile update of user {user.id}: {e}")
+
     async def on_after_register(self, user: User, request: Request | None = None):
         """
         Called after a user successfully registers.
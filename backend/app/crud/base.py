@@ -1,8 +1,18 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.base import Base
 
@@ -10,57 +20,163 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Upper bound for the page size of get_multi and get_page
+MAX_PAGE_SIZE = 500
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     def __init__(self, model: Type[ModelType]):
         """
-        CRUD object with default methods to Create, Read, Update, Delete (CRUD).
+        Async CRUD object with default methods to Create, Read, Update, Delete.
+
+        Writes are flushed but never committed: the caller owns the
+        transaction, so several operations can be committed together. Bulk
+        methods issue one statement for all rows and read generated values
+        back with RETURNING instead of refreshing each object.
 
         **Parameters**
 
         * `model`: A SQLAlchemy model class
-        * `schema`: A Pydantic model (schema) class
         """
         self.model = model
+        self._columns = frozenset(model.__mapper__.column_attrs.keys())
+
+    def _column_data(
+        self, obj_in: Union[BaseModel, Dict[str, Any]], exclude_unset: bool = False
+    ) -> Dict[str, Any]:
+        """Values of a schema or dict that map to columns of the model."""
+        if isinstance(obj_in, BaseModel):
+            data = obj_in.model_dump(exclude_unset=exclude_unset)
+        else:
+            data = obj_in
+        return {key: value for key, value in data.items() if key in self._columns}
 
-    def get(self, db: Session, id: Any) -> Optional[ModelType]:
-        return db.query(self.model).filter(self.model.id == id).first()
+    async def get(self, session: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await session.get(self.model, id)
 
-    def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+    async def get_multi(
+        self, session: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
-
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)  # type: ignore
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        result = await session.execute(
+            select(self.model)
+            .order_by(self.model.id)
+            .offset(skip)
+            .limit(min(limit, MAX_PAGE_SIZE))
+        )
+        return list(result.scalars().all())
+
+    async def get_page(
+        self, session: AsyncSession, *, after: Optional[Any] = None, limit: int = 100
+    ) -> List[ModelType]:
+        """
+        Keyset pagination by primary key.
+
+        Unlike OFFSET, the cost of a page does not grow with its position,
+        and rows inserted or deleted meanwhile do not shift later pages.
+
+        Args:
+            session (AsyncSession): Database session.
+            after (Optional[Any]): Id of the last row of the previous page,
+                or None for the first page.
+            limit (int): Maximum number of rows.
+
+        Returns:
+            List[ModelType]: Rows ordered by id; fewer than limit on the last page.
+        """
+        query = select(self.model).order_by(self.model.id)
+        if after is not None:
+            query = query.where(self.model.id > after)
+        result = await session.execute(query.limit(min(limit, MAX_PAGE_SIZE)))
+        return list(result.scalars().all())
+
+    async def create(
+        self, session: AsyncSession, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        db_obj = self.model(**self._column_data(obj_in))
+        session.add(db_obj)
+        await session.flush()
         return db_obj
 
-    def update(
+    async def create_multi(
+        self,
+        session: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+    ) -> List[ModelType]:
+        """
+        Insert several rows with a single INSERT ... RETURNING.
+
+        Args:
+            session (AsyncSession): Database session.
+            objs_in (Sequence): Schemas or dicts of the rows to create.
+
+        Returns:
+            List[ModelType]: The created objects, in the order of objs_in.
+        """
+        if not objs_in:
+            return []
+        result = await session.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            [self._column_data(obj_in) for obj_in in objs_in],
+        )
+        return list(result.all())
+
+    async def update(
         self,
-        db: Session,
+        session: AsyncSession,
         *,
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]],
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        for field, value in self._column_data(obj_in, exclude_unset=True).items():
+            setattr(db_obj, field, value)
+        session.add(db_obj)
+        await session.flush()
         return db_obj
 
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
-        db.commit()
-        return obj
+    async def update_multi(
+        self, session: AsyncSession, *, objs_in: Sequence[Dict[str, Any]]
+    ) -> int:
+        """
+        Update several rows by primary key in one executemany UPDATE.
+
+        Args:
+            session (AsyncSession): Database session.
+            objs_in (Sequence[Dict[str, Any]]): One dict per row, each with
+                the "id" of the row and the values to set.
+
+        Returns:
+            int: Number of rows passed in.
+        """
+        if not objs_in:
+            return 0
+        await session.execute(
+            update(self.model), [self._column_data(obj_in) for obj_in in objs_in]
+        )
+        return len(objs_in)
+
+    async def remove(self, session: AsyncSession, *, id: Any) -> Optional[ModelType]:
+        result = await session.scalars(
+            delete(self.model).where(self.model.id == id).returning(self.model)
+        )
+        return result.first()
+
+    async def remove_multi(
+        self, session: AsyncSession, *, ids: Sequence[Any]
+    ) -> List[Any]:
+        """
+        Delete several rows with a single DELETE ... RETURNING.
+
+        Args:
+            session (AsyncSession): Database session.
+            ids (Sequence[Any]): Ids of the rows to delete.
+
+        Returns:
+            List[Any]: Ids of the rows that existed and were deleted.
+        """
+        if not ids:
+            return []
+        result = await session.execute(
+            delete(self.model).where(self.model.id.in_(ids)).returning(self.model.id)
+        )
+        return list(result.scalars().all())
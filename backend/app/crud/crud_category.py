@@ -1,6 +1,7 @@
 from typing import Any, Dict, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
 from app.models.category import Category
@@ -8,19 +9,18 @@ from app.schemas.category import CategoryCreate, CategoryUpdate
 
 
 class CRUDCategory(CRUDBase[Category, CategoryCreate, CategoryUpdate]):
-    def get_by_name(self, db: Session, *, name: str) -> Optional[Category]:
-        return db.query(Category).filter(Category.name == name).first()
+    async def get_by_name(
+        self, session: AsyncSession, *, name: str
+    ) -> Optional[Category]:
+        result = await session.execute(select(Category).where(Category.name == name))
+        return result.scalars().first()
 
-    def create(self, db: Session, *, obj_in: CategoryCreate) -> Category:
-        db_obj = Category(
-            name=obj_in.name,
-            icon_name=obj_in.icon_name,
-            translations=obj_in.translations or {},
-        )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+    async def create(
+        self, session: AsyncSession, *, obj_in: Union[CategoryCreate, Dict[str, Any]]
+    ) -> Category:
+        data = self._column_data(obj_in)
+        data.setdefault("translations", {})
+        return await super().create(session, obj_in=data)
 
 
 category = CRUDCategory(Category)
@@ -1,54 +1,60 @@
+import uuid
 from typing import Any, Dict, List, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.base import CRUDBase
+from app.crud.base import MAX_PAGE_SIZE, CRUDBase
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
 
 
 class CRUDItem(CRUDBase[Item, ItemCreate, ItemUpdate]):
-    def create_with_owner_and_list(
-        self, db: Session, *, obj_in: ItemCreate, owner_id: int, shopping_list_id: int
+    async def create_with_owner_and_list(
+        self,
+        session: AsyncSession,
+        *,
+        obj_in: ItemCreate,
+        owner_id: uuid.UUID,
+        shopping_list_id: int,
     ) -> Item:
-        db_obj = self.model(
-            **obj_in.model_dump(exclude_unset=True),
+        data = self._column_data(obj_in, exclude_unset=True)
+        data.update(
             owner_id=owner_id,
             last_modified_by_id=owner_id,  # Set last_modified_by_id on creation
             shopping_list_id=shopping_list_id,
         )
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return await super().create(session, obj_in=data)
 
-    def update(
+    async def update(
         self,
-        db: Session,
+        session: AsyncSession,
         *,
         db_obj: Item,
         obj_in: Union[ItemUpdate, Dict[str, Any]],
-        last_modified_by_id: int,
+        last_modified_by_id: uuid.UUID,
     ) -> Item:
-        # Use the base update method first
-        updated_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
-        # Set the last modified by id
-        updated_obj.last_modified_by_id = last_modified_by_id
-        db.add(updated_obj)
-        db.commit()
-        db.refresh(updated_obj)
-        return updated_obj
-
-    def get_multi_by_shopping_list(
-        self, db: Session, *, shopping_list_id: int, skip: int = 0, limit: int = 100
+        db_obj.last_modified_by_id = last_modified_by_id
+        return await super().update(session, db_obj=db_obj, obj_in=obj_in)
+
+    async def get_multi_by_shopping_list(
+        self,
+        session: AsyncSession,
+        *,
+        shopping_list_id: int,
+        after: Optional[int] = None,
+        limit: int = 100,
     ) -> List[Item]:
-        return (
-            db.query(self.model)
-            .filter(Item.shopping_list_id == shopping_list_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
+        """Keyset-paginated items of a list, see CRUDBase.get_page."""
+        query = (
+            select(self.model)
+            .where(Item.shopping_list_id == shopping_list_id)
+            .order_by(Item.id)
         )
+        if after is not None:
+            query = query.where(Item.id > after)
+        result = await session.execute(query.limit(min(limit, MAX_PAGE_SIZE)))
+        return list(result.scalars().all())
 
 
 item = CRUDItem(Item)
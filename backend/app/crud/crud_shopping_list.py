@@ -1,23 +1,31 @@
-from typing import List, Optional
+import uuid
+from typing import List
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.crud.base import CRUDBase
+from app.crud.base import MAX_PAGE_SIZE, CRUDBase
 from app.models.shopping_list import ShoppingList
 from app.schemas.shopping_list import ShoppingListCreate, ShoppingListUpdate
 
 
 class CRUDShoppingList(CRUDBase[ShoppingList, ShoppingListCreate, ShoppingListUpdate]):
-    def get_multi_by_owner(
-        self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
+    async def get_multi_by_owner(
+        self,
+        session: AsyncSession,
+        *,
+        owner_id: uuid.UUID,
+        skip: int = 0,
+        limit: int = 100,
     ) -> List[ShoppingList]:
-        return (
-            db.query(self.model)
-            .filter(ShoppingList.owner_id == owner_id)
+        result = await session.execute(
+            select(self.model)
+            .where(ShoppingList.owner_id == owner_id)
+            .order_by(ShoppingList.id)
             .offset(skip)
-            .limit(limit)
-            .all()
+            .limit(min(limit, MAX_PAGE_SIZE))
         )
+        return list(result.scalars().all())
 
 
 shopping_list = CRUDShoppingList(ShoppingList)
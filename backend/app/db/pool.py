@@ -0,0 +1,113 @@
+"""
+Connection pool configuration and metrics for the async engine.
+
+engine_options turns the DB_* settings into create_async_engine arguments,
+including a PgBouncer-compatible mode. InstrumentedAsyncPool times every
+connection checkout, and the gauges below report pool usage. They are
+registered in the default Prometheus registry, so the Instrumentator
+exposes them on /metrics with the HTTP metrics.
+"""
+
+import time
+import uuid
+from typing import Any, Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+from app.core.config import Settings
+
+pool_checkout_seconds = Histogram(
+    "familycart_db_pool_checkout_seconds",
+    "Time spent getting a database connection from the pool, including "
+    "waiting for a free one or opening a new one",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+pool_checkout_timeouts = Counter(
+    "familycart_db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT seconds",
+)
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout takes."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_seconds.observe(time.perf_counter() - start)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def engine_options(settings: Settings) -> Dict[str, Any]:
+    """
+    Build the create_async_engine keyword arguments for the pool settings.
+
+    Args:
+        settings (Settings): Application settings.
+
+    Returns:
+        Dict[str, Any]: Pool class, sizing, recycling and asyncpg connect args.
+    """
+    if settings.DB_PGBOUNCER_MODE:
+        # A server connection may serve a different client after each
+        # transaction, so neither asyncpg nor SQLAlchemy may reuse a prepared
+        # statement, and names must not collide between clients
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    else:
+        connect_args = {
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+
+    return {
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def get_pool_stats(pool: Pool) -> Dict[str, int]:
+    """Current usage of a queue pool."""
+    return {
+        "size": pool.size(),
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+def register_pool_metrics(pool: Pool):
+    """Publish the usage of a pool as gauges computed when scraped."""
+    Gauge(
+        "familycart_db_pool_connections_in_use",
+        "Database connections currently checked out of the pool",
+    ).set_function(pool.checkedout)
+    Gauge(
+        "familycart_db_pool_connections_idle",
+        "Open database connections waiting in the pool",
+    ).set_function(pool.checkedin)
+    Gauge(
+        "familycart_db_pool_size",
+        "Configured number of connections kept open by the pool",
+    ).set_function(pool.size)
+    Gauge(
+        "familycart_db_pool_overflow",
+        "Connections open beyond the pool size",
+    ).set_function(lambda: max(pool.overflow(), 0))
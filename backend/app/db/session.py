@@ -3,6 +3,7 @@ from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import settings
+from app.db.pool import engine_options, register_pool_metrics
 
 # This check is important to ensure that the database URI is set
 # before creating an engine.
@@ -11,7 +12,10 @@ if not settings.SQLALCHEMY_DATABASE_URI_ASYNC:
         "SQLALCHEMY_DATABASE_URI_ASYNC is not set. Please check your .env file."
     )
 
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI_ASYNC, pool_pre_ping=True)
+engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URI_ASYNC, **engine_options(settings)
+)
+register_pool_metrics(engine.pool)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
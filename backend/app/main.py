@@ -11,6 +11,7 @@ from app.api.cors import setup_cors_middleware  # Import CORS setup
 from app.api.middleware import LoggingMiddleware
 from app.api.v1.endpoints import ai as ai_v1_router  # Import the new AI router
 from app.api.v1.endpoints import auth as auth_v1_router
+from app.api.v1.endpoints import categories as categories_v1_router
 from app.api.v1.endpoints import items as items_v1_router
 from app.api.v1.endpoints import shopping_lists as sl_v1_router
 from app.api.v1.endpoints import (
@@ -20,6 +21,12 @@ from app.api.v1.endpoints import users as users_v1_router
 from app.api.v1.ws import notifications as ws_v1_router  # WebSocket router
 from app.core.cache import cache_service
 from app.core.config import settings
+from app.db.pool import get_pool_stats
+from app.db.session import engine
+from app.services.category_cache import category_cache
+from app.services.enrichment_queue import enrichment_queue
+from app.services.list_access import list_membership_cache
+from app.services.local_categorizer import local_categorizer
 
 # Configure detailed logging
 logging.basicConfig(level=logging.INFO)
@@ -34,18 +41,27 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     await cache_service.setup()
+    await category_cache.start()
+    await local_categorizer.start()
 
     # Initialize WebSocket service with connection manager
     from app.api.v1.ws.notifications import connection_manager
     from app.services.websocket_service import websocket_service
 
     websocket_service.set_connection_manager(connection_manager)
+    await connection_manager.start_broker()
+
+    await enrichment_queue.start()
 
     logger.info("Application startup complete")
 
     yield
 
     # Shutdown
+    await connection_manager.stop_broker()
+    await enrichment_queue.stop()
+    await local_categorizer.stop()
+    await category_cache.stop()
     await cache_service.close()
     logger.info("Application shutdown complete")
 
@@ -121,6 +137,11 @@ app.include_router(
 app.include_router(
     ai_v1_router.router, prefix=settings.API_V1_STR, tags=["ai"]
 )  # Add the AI router
+app.include_router(
+    categories_v1_router.router,
+    prefix=settings.API_V1_STR + "/categories",
+    tags=["categories"],
+)
 
 # Include WebSocket router for v1
 app.include_router(
@@ -179,6 +200,13 @@ async def health_check():
                 "environment": getattr(settings, "ENVIRONMENT", "unknown"),
             },
             "checks": {"cache": cache_status, **system_info},
+            "cache": cache_service.get_stats(),
+            "local_categorizer": local_categorizer.get_stats(),
+            "category_cache": category_cache.get_stats(),
+            "enrichment_queue": enrichment_queue.get_stats(),
+            "list_membership_cache": list_membership_cache.get_stats(),
+            "websocket": ws_v1_router.connection_manager.get_stats(),
+            "database_pool": get_pool_stats(engine.pool),
             "uptime_seconds": uptime_seconds,
         }
 
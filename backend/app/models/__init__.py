@@ -4,6 +4,7 @@
 from .category import Category
 from .item import Item
 from .shopping_list import ShoppingList
+from .shopping_list_change import ShoppingListChange
 from .unit import Unit
 from .user import User
 
@@ -11,6 +12,7 @@ __all__ = [
     "User",
     "Category",
     "ShoppingList",
+    "ShoppingListChange",
     "Item",
     "Unit",
 ]
@@ -1,7 +1,16 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -17,6 +26,13 @@ class Item(Base):
     """Item model for shopping list items."""
 
     __tablename__ = "item"
+    __table_args__ = (
+        # Serves every per-list lookup (its leading column) as well as the
+        # completed/pending counts of the list summaries
+        Index(
+            "ix_item_shopping_list_id_is_completed", "shopping_list_id", "is_completed"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -41,21 +57,24 @@ class Item(Base):
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utc_now
     )
+    # Indexed for the incremental refresh of the local categorizer
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=utc_now, onupdate=utc_now
+        DateTime(timezone=True), default=utc_now, onupdate=utc_now, index=True
     )
 
     # Relationships
     shopping_list_id: Mapped[int] = mapped_column(ForeignKey("shopping_list.id"))
     shopping_list: Mapped["ShoppingList"] = relationship(back_populates="items")
 
-    owner_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    owner_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
     owner: Mapped["User"] = relationship(foreign_keys=[owner_id])
 
-    last_modified_by_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    last_modified_by_id: Mapped[int] = mapped_column(ForeignKey("user.id"), index=True)
     last_modified_by: Mapped["User"] = relationship(foreign_keys=[last_modified_by_id])
 
-    category_id: Mapped[int | None] = mapped_column(ForeignKey("category.id"))
+    category_id: Mapped[int | None] = mapped_column(
+        ForeignKey("category.id"), index=True
+    )
     category: Mapped[Optional["Category"]] = relationship(back_populates="items")
 
     # Relationship to quantity unit
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Table
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Table
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..db.base import Base
@@ -18,6 +18,8 @@ user_shopping_list = Table(
     Base.metadata,
     Column("user_id", ForeignKey("user.id"), primary_key=True),
     Column("shopping_list_id", ForeignKey("shopping_list.id"), primary_key=True),
+    # The primary key leads with user_id; lookups by list need their own index
+    Index("ix_user_shopping_list_shopping_list_id", "shopping_list_id"),
 )
 
 
@@ -38,8 +40,11 @@ class ShoppingList(Base):
         DateTime(timezone=True), default=utc_now, onupdate=utc_now
     )
 
+    # Incremented once per recorded change, see ShoppingListChange
+    revision: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+
     # Owner relationship
-    owner_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"))
+    owner_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("user.id"), index=True)
     owner: Mapped["User"] = relationship(back_populates="owned_shopping_lists")
 
     # Users with whom the list is shared
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.base import Base
+from ..utils.timezone import utc_now
+
+
+class ShoppingListChange(Base):
+    """One mutation of a shopping list, keyed by the list revision it produced."""
+
+    __tablename__ = "shopping_list_change"
+    __table_args__ = (
+        UniqueConstraint(
+            "shopping_list_id", "revision", name="uq_shopping_list_change_revision"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    shopping_list_id: Mapped[int] = mapped_column(
+        ForeignKey("shopping_list.id", ondelete="CASCADE")
+    )
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    entity_type: Mapped[str] = mapped_column(String(20))  # "item" or "list"
+    entity_id: Mapped[int] = mapped_column(Integer)
+    action: Mapped[str] = mapped_column(String(20))  # "created", "updated", "deleted"
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utc_now
+    )
+
+    def __str__(self) -> str:
+        return f"{self.entity_type} {self.entity_id} {self.action} @{self.revision}"
@@ -1,6 +1,7 @@
 # This file resolves forward references in Pydantic models
 from app.schemas.item import ItemRead
-from app.schemas.shopping_list import ShoppingListRead
+from app.schemas.shopping_list import ShoppingListChanges, ShoppingListRead
 
 # Update forward references
 ShoppingListRead.model_rebuild()
+ShoppingListChanges.model_rebuild()
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -58,6 +58,15 @@ class ItemCreate(ItemBase):
     quantity_display_text: Optional[str] = None
 
 
+# Upper bound for the number of items added in one bulk request
+MAX_BULK_ITEMS = 100
+
+
+# Properties to receive when adding several items to a list at once
+class ItemBulkCreate(BaseModel):
+    items: List[ItemCreate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
 # Properties to receive on item creation via standalone endpoint (requires shopping_list_id)
 class ItemCreateStandalone(ItemCreate):
     shopping_list_id: int
@@ -0,0 +1,151 @@
+"""
+Fast serialization of ORM objects for list and item responses.
+
+Data read from our own database does not need to go through Pydantic
+validation just to be turned into JSON again. These functions project ORM
+objects straight into JSON-ready dicts with exactly the shape and formats of
+ItemRead, UserRead and ShoppingListRead (model_dump(mode="json")), and
+to_json encodes them with pydantic-core's Rust encoder. The schemas stay the
+source of truth for the API docs and for validating input.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json as _to_json
+
+from app.models import Category, Item, ShoppingList, User
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _str(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def user_basic_to_dict(user: Optional[User]) -> Optional[Dict[str, Any]]:
+    """Project a user the way UserBasic serializes it."""
+    if user is None:
+        return None
+    return {"id": str(user.id), "email": user.email, "nickname": user.nickname}
+
+
+def user_to_dict(user: User) -> Dict[str, Any]:
+    """Project a user the way UserRead serializes it."""
+    return {
+        "id": str(user.id),
+        "email": user.email,
+        "is_active": user.is_active,
+        "is_superuser": user.is_superuser,
+        "is_verified": user.is_verified,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "nickname": user.nickname,
+    }
+
+
+def category_to_dict(category: Optional[Category]) -> Optional[Dict[str, Any]]:
+    if category is None:
+        return None
+    return {"id": category.id, "name": category.name}
+
+
+def item_to_dict(
+    item: Item, users: Optional[Dict[Any, Optional[Dict[str, Any]]]] = None
+) -> Dict[str, Any]:
+    """
+    Project an item the way ItemRead serializes it.
+
+    Args:
+        item (Item): Item with category, owner and last_modified_by loaded.
+        users (Optional[Dict]): Cache of projected users shared across items,
+            since the same few family members appear on every item.
+
+    Returns:
+        Dict[str, Any]: JSON-ready item.
+    """
+    if users is None:
+        users = {}
+    owner = users.get(item.owner_id)
+    if owner is None:
+        owner = users[item.owner_id] = user_basic_to_dict(item.owner)
+    last_modified_by = users.get(item.last_modified_by_id)
+    if last_modified_by is None:
+        last_modified_by = users[item.last_modified_by_id] = user_basic_to_dict(
+            item.last_modified_by
+        )
+    quantity_value = item.quantity_value
+    return {
+        "name": item.name,
+        "quantity": item.quantity,
+        "comment": item.comment,
+        "standardized_name": item.standardized_name,
+        "translations": item.translations,
+        "id": item.id,
+        "shopping_list_id": item.shopping_list_id,
+        "owner_id": str(item.owner_id),
+        "owner": owner,
+        "last_modified_by_id": str(item.last_modified_by_id),
+        "last_modified_by": last_modified_by,
+        "is_completed": item.is_completed,
+        "created_at": _iso(item.created_at),
+        "updated_at": _iso(item.updated_at),
+        "category": category_to_dict(item.category),
+        "icon_name": item.icon_name,
+        "quantity_value": float(quantity_value) if quantity_value is not None else None,
+        "quantity_unit_id": item.quantity_unit_id,
+        "quantity_display_text": item.quantity_display_text,
+    }
+
+
+def items_to_dicts(items: Iterable[Item]) -> List[Dict[str, Any]]:
+    """Project several items, serializing each referenced user only once."""
+    users: Dict[Any, Optional[Dict[str, Any]]] = {}
+    return [item_to_dict(item, users) for item in items]
+
+
+def shopping_list_to_dict(
+    shopping_list: ShoppingList,
+    items: Iterable[Item],
+    members: Iterable[User],
+    **extra: Any,
+) -> Dict[str, Any]:
+    """
+    Project a shopping list the way ShoppingListRead serializes it.
+
+    Args:
+        shopping_list (ShoppingList): The list.
+        items (Iterable[Item]): Items to include, already in display order.
+        members (Iterable[User]): Members to include.
+        **extra: Optional fields such as item_count and completed_item_count.
+
+    Returns:
+        Dict[str, Any]: JSON-ready shopping list.
+    """
+    return {
+        "name": shopping_list.name,
+        "description": shopping_list.description,
+        "id": shopping_list.id,
+        "owner_id": str(shopping_list.owner_id),
+        "created_at": _iso(shopping_list.created_at),
+        "updated_at": _iso(shopping_list.updated_at),
+        "revision": shopping_list.revision,
+        "items": items_to_dicts(items),
+        "members": [user_to_dict(user) for user in members],
+        "item_count": extra.get("item_count"),
+        "completed_item_count": extra.get("completed_item_count"),
+    }
+
+
+def to_json(data: Any) -> bytes:
+    """Encode JSON-ready data (UUIDs and datetimes are also accepted)."""
+    return _to_json(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with pydantic-core instead of the json module."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -33,8 +33,12 @@ class ShoppingListRead(ShoppingListBase):
     owner_id: uuid.UUID
     created_at: datetime
     updated_at: datetime
+    revision: int = 0  # Pass to GET /{list_id}/changes to fetch later changes
     items: List["ItemRead"] = []  # List of items in this shopping list
     members: List[UserRead] = []  # List of users who have access to this list
+    # Only set in summary mode, where items are left out
+    item_count: Optional[int] = None
+    completed_item_count: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -43,3 +47,27 @@ class ShoppingListRead(ShoppingListBase):
             uuid.UUID: str,
             datetime: lambda v: v.isoformat() if v else None,
         }
+
+
+class ShoppingListSummary(BaseModel):
+    """Compact list overview entry without items or members."""
+
+    id: int
+    name: str
+    owner_id: uuid.UUID
+    item_count: int
+    completed_item_count: int
+    updated_at: datetime  # Latest change to the list or any of its items
+    revision: int = 0
+
+
+class ShoppingListChanges(BaseModel):
+    """Changes to a shopping list after a given revision."""
+
+    revision: int
+    full_resync: bool = False  # The client must refetch the whole list
+    items: List["ItemRead"] = []  # Created or updated items
+    deleted_item_ids: List[int] = []
+    shopping_list: Optional[ShoppingListRead] = (
+        None  # Set if details or members changed
+    )
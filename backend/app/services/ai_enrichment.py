@@ -0,0 +1,621 @@
+"""
+Item Enrichment Helpers for FamilyCart
+
+This module holds the pieces shared by every AI provider for the combined
+item enrichment operation, which returns the category, icon, standardized
+name and translations of an item from a single AI request.
+
+Each field is cached under the same keys used by the individual operations
+(category_suggestion:*, icon_suggestion:*, standardized_name:*), so partial
+cache hits only ask the model for the fields that are still missing. The
+answers are requested as structured output, see structured_output.
+"""
+
+import asyncio
+import json
+import logging
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from pydantic import BaseModel
+
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.services.category_cache import CategoryNames
+
+logger = logging.getLogger(__name__)
+
+# Enrichment results are cached for 6 months, like the individual suggestions
+ENRICHMENT_CACHE_EXPIRE = 3600 * 24 * 180
+
+CATEGORY_FIELD = "category_name"
+ICON_FIELD = "icon_name"
+STANDARDIZED_NAME_FIELD = "standardized_name"
+TRANSLATIONS_FIELD = "translations"
+
+# Fields that can be requested from the model. Translations always travel
+# together with the standardized name, as they share one cache entry.
+ENRICHMENT_FIELDS = (CATEGORY_FIELD, ICON_FIELD, STANDARDIZED_NAME_FIELD)
+
+DEFAULT_CATEGORY = "Uncategorized"
+DEFAULT_ICON = "shopping_cart"
+
+# A curated list of common icons. A more comprehensive list could be loaded from a file.
+ICON_NAMES = [
+    "shopping_cart",
+    "local_grocery_store",
+    "fastfood",
+    "local_bar",
+    "local_cafe",
+    "local_dining",
+    "icecream",
+    "local_pizza",
+    "ramen_dining",
+    "lunch_dining",
+    "bakery_dining",
+    "hardware",
+    "home",
+    "kitchen",
+    "tv",
+    "lightbulb",
+    "chair",
+    "bed",
+    "camera",
+    "movie",
+    "music_note",
+    "book",
+    "school",
+    "science",
+    "pets",
+    "park",
+    "fitness_center",
+    "checkroom",
+    "face",
+    "spa",
+    "content_cut",
+    "brush",
+    "medical_services",
+    "medication",
+    "local_pharmacy",
+    "local_hospital",
+    "construction",
+    "handyman",
+    "plumbing",
+    "electrical_services",
+    "cleaning_services",
+    "flight",
+    "train",
+    "directions_car",
+    "local_taxi",
+    "local_gas_station",
+    "ev_station",
+    "local_shipping",
+    "local_post_office",
+    "credit_card",
+    "account_balance_wallet",
+    "savings",
+    "paid",
+    "receipt_long",
+    "work",
+    "business_center",
+    "computer",
+    "phone_iphone",
+    "smartphone",
+    "tablet_mac",
+    "watch",
+    "devices",
+    "toys",
+    "sports_esports",
+    "sports_soccer",
+    "sports_basketball",
+    "sports_tennis",
+    "sports_volleyball",
+    "sports_baseball",
+    "sports_golf",
+    "celebration",
+    "cake",
+    "card_giftcard",
+    "redeem",
+    "theaters",
+    "attractions",
+    "forest",
+    "terrain",
+    "ac_unit",
+    "water_drop",
+    "grass",
+    "eco",
+    "recycling",
+    "compost",
+    "pets",
+    "leaf",
+]
+
+# Example answer for "mléko" (Czech for milk), trimmed to the requested fields
+_EXAMPLE_ENRICHMENT = {
+    CATEGORY_FIELD: "Dairy",
+    ICON_FIELD: "local_grocery_store",
+    STANDARDIZED_NAME_FIELD: "Milk",
+    TRANSLATIONS_FIELD: {"es": "Leche", "fr": "Lait", "de": "Milch"},
+}
+
+
+class EnrichmentRequest(NamedTuple):
+    """An item that still misses some enrichment fields."""
+
+    item_name: str
+    fields: List[str]
+    category_name: Optional[str] = None
+
+
+def normalize_item_name(item_name: str) -> str:
+    """Normalize an item name the same way for every cache key."""
+    return item_name.lower().strip()
+
+
+def category_cache_key(item_name: str) -> str:
+    return f"category_suggestion:{normalize_item_name(item_name)}"
+
+
+def icon_cache_key(item_name: str, category_name: str) -> str:
+    return f"icon_suggestion:{normalize_item_name(item_name)}:{category_name.lower().strip()}"
+
+
+def standardization_cache_key(item_name: str) -> str:
+    return f"standardized_name:{normalize_item_name(item_name)}"
+
+
+async def get_cached_enrichments(
+    item_names: List[str], known_fields: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Collect whichever enrichment fields are already cached for several items.
+
+    Category and standardization entries for all items are fetched with one
+    MGET, followed by a second MGET for the icons of items whose category is known.
+
+    Args:
+        item_names (List[str]): The names of the items.
+        known_fields (Optional[List[Dict[str, Any]]]): Fields already determined
+            without AI (e.g. a local category), per item; they take precedence
+            over cached values.
+
+    Returns:
+        List[Dict[str, Any]]: The cached fields per item, in input order;
+        missing fields are simply absent.
+    """
+    enrichments: List[Dict[str, Any]] = [
+        dict(known_fields[index]) if known_fields else {}
+        for index in range(len(item_names))
+    ]
+    if not item_names:
+        return enrichments
+
+    keys = []
+    for item_name in item_names:
+        keys.append(category_cache_key(item_name))
+        keys.append(standardization_cache_key(item_name))
+    values = await cache_service.mget(keys)
+
+    icon_lookups = []
+    for index, item_name in enumerate(item_names):
+        enrichment = enrichments[index]
+        category_name = enrichment.get(CATEGORY_FIELD) or values[2 * index]
+        standardization = values[2 * index + 1]
+
+        if category_name:
+            enrichment[CATEGORY_FIELD] = category_name
+            if ICON_FIELD not in enrichment:
+                icon_lookups.append((index, icon_cache_key(item_name, category_name)))
+
+        if standardization and STANDARDIZED_NAME_FIELD not in enrichment:
+            try:
+                data = json.loads(standardization)
+                enrichment[STANDARDIZED_NAME_FIELD] = data.get("standardized_name")
+                enrichment[TRANSLATIONS_FIELD] = data.get("translations", {})
+            except (json.JSONDecodeError, AttributeError):
+                logger.warning(
+                    f"Ignoring malformed standardization cache for {item_name}"
+                )
+
+    if icon_lookups:
+        icons = await cache_service.mget([key for _, key in icon_lookups])
+        for (index, _), icon_name in zip(icon_lookups, icons):
+            if icon_name:
+                enrichments[index][ICON_FIELD] = icon_name
+
+    return enrichments
+
+
+async def get_cached_enrichment(
+    item_name: str, known_fields: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Collect whichever enrichment fields are already cached for an item.
+
+    Args:
+        item_name (str): The name of the item.
+        known_fields (Optional[Dict[str, Any]]): Fields already determined without AI.
+
+    Returns:
+        Dict[str, Any]: The cached fields; missing fields are simply absent.
+    """
+    return (
+        await get_cached_enrichments(
+            [item_name], [known_fields] if known_fields else None
+        )
+    )[0]
+
+
+def category_list_text(category_names: List[str]) -> str:
+    """The category names as listed in prompts, precomputed for snapshots."""
+    if isinstance(category_names, CategoryNames):
+        return category_names.prompt_text
+    return ", ".join(category_names)
+
+
+def missing_enrichment_fields(enrichment: Dict[str, Any]) -> List[str]:
+    """Return the enrichment fields that still have to be requested."""
+    return [field for field in ENRICHMENT_FIELDS if not enrichment.get(field)]
+
+
+def _field_instructions(
+    category_names: List[str], fields: List[str], category_name: Optional[str] = None
+) -> Tuple[List[str], Dict[str, Any]]:
+    """Describe the requested fields and build a matching example answer."""
+    instructions = []
+    example = {}
+
+    if CATEGORY_FIELD in fields:
+        instructions.append(
+            f'- "{CATEGORY_FIELD}": the best category for the item, a single English noun '
+            f"in singular. If a suitable category exists in this list, return it exactly "
+            f"as written: {category_list_text(category_names)}. Otherwise suggest a new one."
+        )
+        example[CATEGORY_FIELD] = _EXAMPLE_ENRICHMENT[CATEGORY_FIELD]
+    if ICON_FIELD in fields:
+        icon_context = f' in the category "{category_name}"' if category_name else ""
+        instructions.append(
+            f'- "{ICON_FIELD}": the most appropriate Google Material Icon for the '
+            f"item{icon_context}"
+        )
+        example[ICON_FIELD] = _EXAMPLE_ENRICHMENT[ICON_FIELD]
+    if STANDARDIZED_NAME_FIELD in fields:
+        instructions.append(
+            f'- "{STANDARDIZED_NAME_FIELD}": the most common, generic English name of '
+            f"the item (fix typos and colloquialisms)"
+        )
+        instructions.append(
+            f'- "{TRANSLATIONS_FIELD}": an object with the keys "es", "fr", "de" holding '
+            f"the standardized name in Spanish, French and German"
+        )
+        example[STANDARDIZED_NAME_FIELD] = _EXAMPLE_ENRICHMENT[STANDARDIZED_NAME_FIELD]
+        example[TRANSLATIONS_FIELD] = _EXAMPLE_ENRICHMENT[TRANSLATIONS_FIELD]
+
+    return instructions, example
+
+
+def build_enrichment_prompt(
+    item_name: str,
+    category_names: List[str],
+    fields: List[str],
+    category_name: Optional[str] = None,
+) -> str:
+    """
+    Build a single prompt asking the model only for the missing fields.
+
+    Args:
+        item_name (str): The name of the item.
+        category_names (List[str]): List of existing category names.
+        fields (List[str]): The enrichment fields to request.
+        category_name (Optional[str]): Already known category, used for the icon.
+
+    Returns:
+        str: The prompt text.
+    """
+    instructions, example = _field_instructions(category_names, fields, category_name)
+
+    return (
+        f'Enrich the shopping list item "{item_name}".\n'
+        f"The item name might be in Czech, German, Spanish, French, or other languages.\n\n"
+        f"Answer with the following keys:\n"
+        + "\n".join(instructions)
+        + f'\n\nExample for "mléko" (Czech for milk):\n{json.dumps(example, ensure_ascii=False)}\n\n'
+        f'Item name: "{item_name}"\n'
+    )
+
+
+def build_batch_enrichment_prompt(
+    requests: List[EnrichmentRequest], category_names: List[str]
+) -> str:
+    """
+    Build one prompt enriching several items, each only with its missing fields.
+
+    Args:
+        requests (List[EnrichmentRequest]): The items to enrich.
+        category_names (List[str]): List of existing category names.
+
+    Returns:
+        str: The prompt text.
+    """
+    all_fields = [
+        field
+        for field in ENRICHMENT_FIELDS
+        if any(field in request.fields for request in requests)
+    ]
+    instructions, example = _field_instructions(category_names, all_fields)
+
+    items = []
+    for index, request in enumerate(requests):
+        keys = list(request.fields)
+        if STANDARDIZED_NAME_FIELD in keys:
+            keys.append(TRANSLATIONS_FIELD)
+        item = {"index": index, "name": request.item_name, "keys": keys}
+        if request.category_name:
+            item[CATEGORY_FIELD] = request.category_name
+        items.append(item)
+
+    return (
+        "Enrich the following shopping list items.\n"
+        "Item names might be in Czech, German, Spanish, French, or other languages.\n"
+        "An item that already has a category uses it when choosing the icon.\n\n"
+        "Possible keys:\n"
+        + "\n".join(instructions)
+        + f"\n\nItems:\n{json.dumps(items, ensure_ascii=False)}\n\n"
+        'Answer with one entry per item under "items", holding its "index" and '
+        "exactly the keys listed for it.\n"
+        f'Example entry for "mléko" (Czech for milk):\n'
+        f"{json.dumps({'index': 0, **example}, ensure_ascii=False)}\n"
+    )
+
+
+def build_category_prompt(item_name: str, category_names: List[str]) -> str:
+    """Prompt for a CategoryAnswer; the answer format is set by its schema."""
+    return (
+        f'Choose the category of the shopping list item "{item_name}" '
+        f"(the name may be in any language).\n"
+        f"Use one of these categories if it fits, exactly as written: "
+        f"{category_list_text(category_names)}.\n"
+        f"Otherwise suggest a new one: a single English noun in singular.\n"
+        f'Examples: "mléko" -> Dairy, "Granny Smith Apples" -> Produce.\n'
+    )
+
+
+def build_icon_prompt(item_name: str, category_name: str) -> str:
+    """Prompt for an IconAnswer; the icon names are listed in its schema."""
+    return (
+        f"Choose the Google Material Icon that best fits the shopping list item "
+        f'"{item_name}" in the category "{category_name}".\n'
+        f'Example: "Milk" in "Dairy" -> local_grocery_store.\n'
+    )
+
+
+def build_standardization_prompt(item_name: str) -> str:
+    """Prompt for a StandardizationAnswer."""
+    return (
+        f"Give the most common, generic English name of the shopping list item "
+        f'"{item_name}", fixing typos and colloquialisms (the name may be in any '
+        f"language), and translate it to Spanish (es), French (fr) and German (de).\n"
+        f'Example: "tommy toes" -> Tomatoes; es Tomates, fr Tomates, de Tomaten.\n'
+    )
+
+
+def requested_enrichment(
+    answer: Optional[BaseModel], fields: List[str]
+) -> Dict[str, Any]:
+    """
+    Take the requested fields from a validated enrichment answer.
+
+    Args:
+        answer (Optional[BaseModel]): The answer, or None if none was valid.
+        fields (List[str]): The enrichment fields that were requested.
+
+    Returns:
+        Dict[str, Any]: The answered fields; translations come with the
+        standardized name.
+    """
+    if answer is None:
+        return {}
+    data = answer.model_dump(exclude_none=True)
+    if STANDARDIZED_NAME_FIELD not in data:
+        data.pop(TRANSLATIONS_FIELD, None)
+    return {
+        field: value
+        for field, value in data.items()
+        if field in fields or field == TRANSLATIONS_FIELD
+    }
+
+
+def batch_enrichments(
+    answer: Optional[BaseModel], requests: List[EnrichmentRequest]
+) -> List[Dict[str, Any]]:
+    """
+    Map the entries of a batch enrichment answer back to their requests.
+
+    Args:
+        answer (Optional[BaseModel]): The answer, or None if none was valid.
+        requests (List[EnrichmentRequest]): The items that were requested.
+
+    Returns:
+        List[Dict[str, Any]]: The answered fields per request, in request order.
+    """
+    results: List[Dict[str, Any]] = [{} for _ in requests]
+    for entry in answer.items if answer else []:
+        if 0 <= entry.index < len(requests):
+            results[entry.index] = requested_enrichment(
+                entry, requests[entry.index].fields
+            )
+    return results
+
+
+async def cache_enrichment(
+    item_name: str, generated: Dict[str, Any], category_name: Optional[str] = None
+):
+    """
+    Store freshly generated enrichment fields under their per-field cache keys.
+
+    Args:
+        item_name (str): The name of the item.
+        generated (Dict[str, Any]): The fields returned by the model.
+        category_name (Optional[str]): The already known category, used as the
+            icon cache key when the category itself was not generated.
+    """
+    writes = []
+    category_name = generated.get(CATEGORY_FIELD) or category_name
+
+    if generated.get(CATEGORY_FIELD):
+        writes.append(
+            cache_service.set(
+                category_cache_key(item_name),
+                generated[CATEGORY_FIELD],
+                expire=ENRICHMENT_CACHE_EXPIRE,
+            )
+        )
+    if generated.get(ICON_FIELD) and category_name:
+        writes.append(
+            cache_service.set(
+                icon_cache_key(item_name, category_name),
+                generated[ICON_FIELD],
+                expire=ENRICHMENT_CACHE_EXPIRE,
+            )
+        )
+    if generated.get(STANDARDIZED_NAME_FIELD):
+        standardization = {
+            "standardized_name": generated[STANDARDIZED_NAME_FIELD],
+            "translations": generated.get(TRANSLATIONS_FIELD, {}),
+        }
+        writes.append(
+            cache_service.set(
+                standardization_cache_key(item_name),
+                json.dumps(standardization),
+                expire=ENRICHMENT_CACHE_EXPIRE,
+            )
+        )
+
+    if writes:
+        await asyncio.gather(*writes)
+
+
+def with_enrichment_defaults(
+    item_name: str, enrichment: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Fill any field the model could not provide with the usual fallbacks."""
+    return {
+        CATEGORY_FIELD: enrichment.get(CATEGORY_FIELD) or DEFAULT_CATEGORY,
+        ICON_FIELD: enrichment.get(ICON_FIELD) or DEFAULT_ICON,
+        STANDARDIZED_NAME_FIELD: enrichment.get(STANDARDIZED_NAME_FIELD) or item_name,
+        TRANSLATIONS_FIELD: enrichment.get(TRANSLATIONS_FIELD) or {},
+    }
+
+
+async def enrich_items_in_batches(
+    item_names: List[str],
+    category_names: List[str],
+    generate_answer: Callable[[str, Type[BaseModel]], Awaitable[Optional[BaseModel]]],
+    should_raise: Callable[[Exception], bool] = lambda error: False,
+    known_fields: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Enrich several items using as few AI requests as possible.
+
+    Cache hits are resolved with MGET, duplicates are enriched once, and the
+    remaining misses are sent in chunks of AI_BATCH_MAX_SIZE items per prompt,
+    each answered with a batch_enrichment_answer for its missing fields.
+
+    Args:
+        item_names (List[str]): The names of the items.
+        category_names (List[str]): List of existing category names.
+        generate_answer (Callable): Sends a prompt to the provider in structured
+            output mode and returns the validated answer, or None.
+        should_raise (Callable): Decides whether a provider error is re-raised
+            (e.g. rate limits, so the fallback service can switch providers).
+        known_fields (Optional[List[Dict[str, Any]]]): Fields already determined
+            without AI, per item.
+
+    Returns:
+        List[Dict[str, Any]]: The enrichment of every item, in input order.
+    """
+    unique_names = list(
+        {normalize_item_name(name): name for name in reversed(item_names)}.values()
+    )[::-1]
+    known_by_name = {
+        normalize_item_name(name): known
+        for name, known in zip(item_names, known_fields or [])
+        if known
+    }
+    enrichments = dict(
+        zip(
+            (normalize_item_name(name) for name in unique_names),
+            await get_cached_enrichments(
+                unique_names,
+                [
+                    known_by_name.get(normalize_item_name(name), {})
+                    for name in unique_names
+                ],
+            ),
+        )
+    )
+
+    requests = []
+    for item_name in unique_names:
+        enrichment = enrichments[normalize_item_name(item_name)]
+        missing_fields = missing_enrichment_fields(enrichment)
+        if missing_fields:
+            requests.append(
+                EnrichmentRequest(
+                    item_name, missing_fields, enrichment.get(CATEGORY_FIELD)
+                )
+            )
+
+    batch_size = max(1, settings.AI_BATCH_MAX_SIZE)
+    chunks = [
+        requests[start : start + batch_size]
+        for start in range(0, len(requests), batch_size)
+    ]
+
+    # structured_output imports the icon names from this module
+    from app.services.structured_output import batch_enrichment_answer
+
+    async def enrich_chunk(chunk: List[EnrichmentRequest]):
+        fields = tuple(
+            field
+            for field in ENRICHMENT_FIELDS
+            if any(field in request.fields for request in chunk)
+        )
+        answer = await generate_answer(
+            build_batch_enrichment_prompt(chunk, category_names),
+            batch_enrichment_answer(fields),
+        )
+        generated_items = batch_enrichments(answer, chunk)
+        for request, generated in zip(chunk, generated_items):
+            await cache_enrichment(
+                request.item_name, generated, category_name=request.category_name
+            )
+            enrichments[normalize_item_name(request.item_name)].update(generated)
+
+    if chunks:
+        logger.info(
+            f"Batch enrichment: {len(item_names)} items, {len(requests)} cache misses, "
+            f"{len(chunks)} AI requests"
+        )
+        results = await asyncio.gather(
+            *(enrich_chunk(chunk) for chunk in chunks), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error enriching item batch: {result}")
+                if should_raise(result):
+                    raise result
+
+    return [
+        with_enrichment_defaults(item_name, enrichments[normalize_item_name(item_name)])
+        for item_name in item_names
+    ]
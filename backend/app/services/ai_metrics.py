@@ -0,0 +1,94 @@
+"""
+Prometheus metrics of AI requests.
+
+Provider metrics cover each model call made by GeminiProvider and
+OllamaProvider: latency and outcome per provider and operation, and the
+prompt and response sizes in tokens as reported by the provider. Operation
+metrics cover FallbackAIService as a whole, including which provider served
+the request and how often it fell back or hedged.
+
+The metrics are registered in the default Prometheus registry, so the
+Instrumentator exposes them on /metrics with the HTTP metrics.
+"""
+
+from typing import Optional
+
+from prometheus_client import Counter, Histogram
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 7.5, 10, 20, 30, 60, 120)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+ai_requests_total = Counter(
+    "familycart_ai_requests_total",
+    "Model calls per provider, operation and outcome "
+    "(success, error or rate_limited)",
+    ["provider", "operation", "outcome"],
+)
+ai_response_time = Histogram(
+    "familycart_ai_response_time_seconds",
+    "Duration of model calls per provider, operation and outcome",
+    ["provider", "operation", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+ai_prompt_tokens = Histogram(
+    "familycart_ai_prompt_tokens",
+    "Prompt size in tokens, as reported by the provider",
+    ["provider", "operation"],
+    buckets=TOKEN_BUCKETS,
+)
+ai_response_tokens = Histogram(
+    "familycart_ai_response_tokens",
+    "Response size in tokens, as reported by the provider",
+    ["provider", "operation"],
+    buckets=TOKEN_BUCKETS,
+)
+ai_operation_time = Histogram(
+    "familycart_ai_operation_seconds",
+    "Duration of AI operations including fallback and hedging, by the "
+    "provider role that served them (primary, fallback or none on error)",
+    ["operation", "served_by"],
+    buckets=LATENCY_BUCKETS,
+)
+ai_fallbacks_total = Counter(
+    "familycart_ai_fallbacks_total",
+    "Operations sent to the fallback provider, by reason "
+    "(error, unavailable or no_primary)",
+    ["operation", "reason"],
+)
+ai_hedges_total = Counter(
+    "familycart_ai_hedges_total",
+    "Hedged operations by the provider role that answered first",
+    ["operation", "winner"],
+)
+
+
+def operation_label(operation_name: str) -> str:
+    """Metric label of an operation name such as "icon suggestion"."""
+    return operation_name.replace(" ", "_")
+
+
+def record_provider_call(
+    provider: str,
+    operation: str,
+    outcome: str,
+    seconds: float,
+    prompt_tokens: Optional[int] = None,
+    response_tokens: Optional[int] = None,
+):
+    """
+    Record one model call.
+
+    Args:
+        provider (str): Provider name, e.g. "gemini".
+        operation (str): Operation label, e.g. "icon_suggestion".
+        outcome (str): "success", "error" or "rate_limited".
+        seconds (float): Duration of the call.
+        prompt_tokens (Optional[int]): Prompt size, if the provider reported it.
+        response_tokens (Optional[int]): Response size, if the provider reported it.
+    """
+    ai_requests_total.labels(provider, operation, outcome).inc()
+    ai_response_time.labels(provider, operation, outcome).observe(seconds)
+    if isinstance(prompt_tokens, int):
+        ai_prompt_tokens.labels(provider, operation).observe(prompt_tokens)
+    if isinstance(response_tokens, int):
+        ai_response_tokens.labels(provider, operation).observe(response_tokens)
@@ -6,7 +6,7 @@ consistent interfaces across different AI service implementations.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -91,6 +91,51 @@ class AIProvider(ABC):
         """
         pass
 
+    @abstractmethod
+    async def enrich_item(
+        self,
+        item_name: str,
+        category_names: List[str],
+        known_fields: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Suggest category, icon, standardized name and translations in one request.
+
+        Fields that are already cached or known are not requested from the model again.
+
+        Args:
+            item_name (str): The name of the item.
+            category_names (List[str]): List of existing category names.
+            known_fields (Optional[Dict[str, Any]]): Fields already determined
+                without AI (e.g. by the local categorizer).
+
+        Returns:
+            Dict[str, Any]: A dictionary with the keys "category_name", "icon_name",
+            "standardized_name" and "translations".
+        """
+        pass
+
+    @abstractmethod
+    async def enrich_items(
+        self,
+        item_names: List[str],
+        category_names: List[str],
+        known_fields: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Enrich several items with as few batched requests as possible.
+
+        Args:
+            item_names (List[str]): The names of the items.
+            category_names (List[str]): List of existing category names.
+            known_fields (Optional[List[Dict[str, Any]]]): Fields already
+                determined without AI, per item.
+
+        Returns:
+            List[Dict[str, Any]]: One enrichment dictionary per item, in input order.
+        """
+        pass
+
     @property
     @abstractmethod
     def provider_name(self) -> str:
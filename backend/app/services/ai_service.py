@@ -110,6 +110,74 @@ class AIService:
             item_name
         )
 
+    async def enrich_item(
+        self, item_name: str, category_names: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Suggest category, icon, standardized name and translations in a single AI
+        request with automatic fallback.
+
+        Args:
+            item_name (str): The name of the item.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the keys "category_name", "icon_name",
+            "standardized_name" and "translations".
+        """
+        return await self._fallback_service.enrich_item(item_name, category_names)
+
+    async def get_known_enrichment(
+        self, item_name: str, category_names: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Collect the enrichment fields available from the cache and the local
+        categorizer, without calling any AI provider.
+
+        Args:
+            item_name (str): The name of the item.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            Dict[str, Any]: The known fields; missing fields are simply absent.
+        """
+        return await self._fallback_service.get_known_enrichment(
+            item_name, category_names
+        )
+
+    async def get_known_enrichments(
+        self, item_names: List[str], category_names: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Collect the known enrichment fields of several items, see
+        get_known_enrichment.
+
+        Args:
+            item_names (List[str]): The names of the items.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            List[Dict[str, Any]]: The known fields per item, in input order.
+        """
+        return await self._fallback_service.get_known_enrichments(
+            item_names, category_names
+        )
+
+    async def enrich_items(
+        self, item_names: List[str], category_names: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Enrich several items using batched AI requests with automatic fallback.
+
+        Args:
+            item_names (List[str]): The names of the items.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            List[Dict[str, Any]]: One enrichment dictionary per item, in input order.
+        """
+        return await self._fallback_service.enrich_items(item_names, category_names)
+
     def get_provider_info(self) -> dict:
         """
         Get information about the current AI provider and fallback status.
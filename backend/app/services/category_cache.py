@@ -0,0 +1,311 @@
+"""
+Process-wide cache of category ids by name.
+
+Items reference categories by name in requests and AI suggestions, and
+almost every name is one of a few dozen existing categories. The cache is
+loaded once at startup, so resolving a known name is a dictionary lookup.
+Unknown names are created with a single INSERT ... ON CONFLICT DO NOTHING
+statement that also returns the id of a category created concurrently.
+
+The cache also serves the category names listed in AI prompts as a
+versioned snapshot, so no request has to load the category table for them.
+
+Every worker keeps its own map, so creations, renames and deletions are
+published over Redis and applied by the other workers. An item insert that
+still hits a category deleted elsewhere is retried with the name resolved
+again, see flush_items.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional, Sequence
+
+from sqlalchemy import false, select, true, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.models.category import Category
+from app.models.item import Item
+
+logger = logging.getLogger(__name__)
+
+ITEM_CATEGORY_FOREIGN_KEY = "item_category_id_fkey"
+
+
+class CategoryRef(NamedTuple):
+    """The id and name of a category, detached from any session."""
+
+    id: int
+    name: str
+
+
+class CategoryNames(tuple):
+    """
+    Sorted category names of one snapshot version.
+
+    Behaves like the list of names the AI providers used to receive, and
+    carries the comma-separated text listing them in prompts, built once
+    per version instead of once per prompt.
+    """
+
+    def __new__(cls, names: Iterable[str] = (), version: int = 0):
+        snapshot = super().__new__(cls, sorted(names))
+        snapshot.version = version
+        snapshot.prompt_text = ", ".join(snapshot)
+        return snapshot
+
+
+class CategoryCache:
+    """Name to id map of all categories, filled at startup and on creation."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        # Incremented whenever a name is added or removed
+        self.version = 0
+        self._snapshot = CategoryNames()
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.stale_ids = 0
+        # Identifies this worker so it ignores its own change messages
+        self.instance_id = uuid.uuid4().hex
+        self._listener_task: Optional[asyncio.Task] = None
+
+    async def warm(self, session: AsyncSession):
+        """Load every existing category, replacing what the cache holds."""
+        result = await session.execute(select(Category.name, Category.id))
+        ids = dict(result.all())
+        if ids != self._ids:
+            self._ids = ids
+            self.version += 1
+        logger.info(f"Category cache loaded {len(self._ids)} categories")
+
+    def names(self) -> CategoryNames:
+        """The current category names, rebuilt only after a change."""
+        if self._snapshot.version != self.version:
+            self._snapshot = CategoryNames(self._ids, self.version)
+        return self._snapshot
+
+    def remember(self, name: str, category_id: int):
+        """Add a category to this worker only, see apply_change."""
+        if self._ids.get(name) != category_id:
+            self._ids[name] = category_id
+            self.version += 1
+
+    async def reload(self):
+        from app.db.session import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as session:
+                await self.warm(session)
+        except Exception as e:
+            # Names are then resolved against the database as they come in
+            logger.error(f"Failed to load category cache: {e}")
+
+    async def start(self):
+        await self.reload()
+        if cache_service.redis_client is not None:
+            self._listener_task = asyncio.create_task(self._listen_for_changes())
+
+    async def stop(self):
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def apply_change(
+        self,
+        forget: Iterable[str] = (),
+        remember: Optional[Mapping[str, int]] = None,
+    ):
+        """
+        Apply a committed category change here and in every other worker.
+
+        Args:
+            forget (Iterable[str]): Names of renamed or deleted categories.
+            remember (Optional[Mapping[str, int]]): Ids of created or renamed
+                categories by their new name.
+        """
+        forget = list(forget)
+        remember = dict(remember or {})
+        self._apply(forget, remember)
+        if cache_service.redis_client is None:
+            return
+        message = json.dumps(
+            {"origin": self.instance_id, "forget": forget, "remember": remember}
+        )
+        try:
+            await cache_service.redis_client.publish(
+                settings.CATEGORY_CACHE_CHANNEL, message
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish category change: {e}")
+
+    def _apply(self, forget: Iterable[str], remember: Mapping[str, int]):
+        for name in forget:
+            self.forget(name)
+        for name, category_id in remember.items():
+            self.remember(name, category_id)
+
+    def _handle_change(self, data: str):
+        try:
+            message = json.loads(data)
+        except (TypeError, json.JSONDecodeError):
+            logger.warning("Ignoring malformed category change message")
+            return
+        if message.get("origin") == self.instance_id:
+            return
+        self._apply(message.get("forget", []), message.get("remember", {}))
+
+    async def _listen_for_changes(self):
+        """Apply category changes made by other workers."""
+        while True:
+            pubsub = cache_service.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(settings.CATEGORY_CACHE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle_change(message["data"])
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                logger.warning(f"Category change listener failed: {e}")
+                await pubsub.aclose()
+                await asyncio.sleep(1)
+                # Changes may have been missed while we were not listening
+                await self.reload()
+
+    async def get_or_create(
+        self, name: Optional[str], session: AsyncSession
+    ) -> Optional[CategoryRef]:
+        """
+        Resolve a category name to its id, creating the category if needed.
+
+        A new category is committed right away, as the previous
+        implementation did, so that an id in the cache always refers to a
+        committed row.
+
+        Args:
+            name (Optional[str]): Category name; surrounding whitespace is ignored.
+            session (AsyncSession): Database session used on a cache miss.
+
+        Returns:
+            Optional[CategoryRef]: The category, or None for an empty name.
+        """
+        if not name or not name.strip():
+            return None
+        name = name.strip()
+
+        category_id = self._ids.get(name)
+        if category_id is not None:
+            self.hits += 1
+            return CategoryRef(category_id, name)
+
+        self.misses += 1
+        # The CTE inserts the category unless the name exists; the second
+        # branch then supplies the id of the existing row
+        inserted = (
+            insert(Category)
+            .values(name=name, translations={})
+            .on_conflict_do_nothing(index_elements=[Category.name])
+            .returning(Category.id)
+            .cte("inserted")
+        )
+        result = await session.execute(
+            union_all(
+                select(inserted.c.id, true().label("created")),
+                select(Category.id, false()).where(Category.name == name),
+            ).limit(1)
+        )
+        row = result.first()
+        if row is None:
+            # A concurrent transaction committed the name after this
+            # statement took its snapshot
+            category_id = await session.scalar(
+                select(Category.id).where(Category.name == name)
+            )
+            if category_id is None:
+                return None
+        else:
+            category_id = row.id
+            if row.created:
+                await session.commit()
+                self.created += 1
+                await self.apply_change(remember={name: category_id})
+
+        self.remember(name, category_id)
+        return CategoryRef(category_id, name)
+
+    async def flush_items(self, session: AsyncSession, items: Sequence[Item]):
+        """
+        Flush newly added items, recovering from categories deleted elsewhere.
+
+        A category deleted by another worker may still be cached here until
+        its change message arrives, and inserting an item with its id then
+        violates the foreign key. The transaction is rolled back, the stale
+        names are evicted and resolved again, and the items are flushed once
+        more. The items must be the only changes of the transaction.
+
+        Args:
+            session (AsyncSession): Session the items were added to.
+            items (Sequence[Item]): The new items.
+        """
+        try:
+            await session.flush()
+            return
+        except IntegrityError as e:
+            if ITEM_CATEGORY_FOREIGN_KEY not in str(e.orig):
+                raise
+            await session.rollback()
+
+        category_ids = {item.category_id for item in items} - {None}
+        existing = set(
+            await session.scalars(
+                select(Category.id).where(Category.id.in_(category_ids))
+            )
+        )
+        replacements: Dict[int, Optional[int]] = {
+            category_id: None for category_id in category_ids - existing
+        }
+        for name, category_id in list(self._ids.items()):
+            if category_id in replacements:
+                self.stale_ids += 1
+                self.forget(name)
+                category = await self.get_or_create(name, session)
+                replacements[category_id] = category.id if category else None
+        logger.warning(f"Resolved deleted categories again: {replacements}")
+
+        for item in items:
+            if item.category_id in replacements:
+                item.category_id = replacements[item.category_id]
+        session.add_all(items)
+        await session.flush()
+
+    def forget(self, name: str):
+        """Drop a category from this worker only, see apply_change."""
+        if self._ids.pop(name, None) is not None:
+            self.version += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "categories": len(self._ids),
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "created": self.created,
+            "stale_ids": self.stale_ids,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+category_cache = CategoryCache()
@@ -0,0 +1,250 @@
+"""
+Shopping List Change Log for FamilyCart
+
+Every item or list mutation bumps the revision of its shopping list and
+records a compact row in shopping_list_change in the same transaction.
+Clients that know their last revision can then fetch only what changed
+instead of the whole list. Renaming a category or updating a user profile
+changes what list responses show, so it is logged as updates of the items
+and lists that display them. The log is trimmed per list; a client that falls
+behind the oldest retained entry is told to do a full resync.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, insert, or_, select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.item import Item
+from app.models.shopping_list import ShoppingList, user_shopping_list
+from app.models.shopping_list_change import ShoppingListChange
+
+logger = logging.getLogger(__name__)
+
+ENTITY_ITEM = "item"
+ENTITY_LIST = "list"
+
+ACTION_CREATED = "created"
+ACTION_UPDATED = "updated"
+ACTION_DELETED = "deleted"
+
+
+class ChangeSet(NamedTuple):
+    """Net effect of the changes recorded after a given revision."""
+
+    revision: int
+    full_resync: bool = False
+    upserted_item_ids: Tuple[int, ...] = ()
+    deleted_item_ids: Tuple[int, ...] = ()
+    list_changed: bool = False
+
+
+async def record_changes(
+    session: AsyncSession,
+    list_id: int,
+    changes: Sequence[Tuple[str, int, str]],
+) -> int:
+    """
+    Bump the list revision and log changes; the caller commits.
+
+    The revision update locks the list row until commit, so concurrent
+    writers to the same list get consecutive, gap-free revisions.
+
+    Args:
+        session (AsyncSession): Session of the transaction making the changes.
+        list_id (int): The shopping list that changed.
+        changes (Sequence[Tuple[str, int, str]]): (entity_type, entity_id, action) tuples.
+
+    Returns:
+        int: The new revision of the list.
+    """
+    if not changes:
+        return 0
+
+    result = await session.execute(
+        update(ShoppingList)
+        .where(ShoppingList.id == list_id)
+        .values(revision=ShoppingList.revision + len(changes))
+        .returning(ShoppingList.revision)
+        .execution_options(synchronize_session=False)
+    )
+    revision = result.scalar_one()
+    first_revision = revision - len(changes) + 1
+
+    await session.execute(
+        insert(ShoppingListChange),
+        [
+            {
+                "shopping_list_id": list_id,
+                "revision": first_revision + offset,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "action": action,
+            }
+            for offset, (entity_type, entity_id, action) in enumerate(changes)
+        ],
+    )
+
+    # Keep the log bounded; older revisions require a full resync
+    oldest_kept = revision - settings.CHANGE_LOG_MAX_ENTRIES_PER_LIST
+    if oldest_kept > 0:
+        await session.execute(
+            delete(ShoppingListChange).where(
+                ShoppingListChange.shopping_list_id == list_id,
+                ShoppingListChange.revision <= oldest_kept,
+            )
+        )
+    return revision
+
+
+async def record_change(
+    session: AsyncSession,
+    list_id: int,
+    entity_type: str,
+    entity_id: int,
+    action: str,
+) -> int:
+    """Record a single change, see record_changes."""
+    return await record_changes(session, list_id, [(entity_type, entity_id, action)])
+
+
+async def record_category_renamed(session: AsyncSession, category_id: int) -> int:
+    """
+    Log an update of every item of a renamed category; the caller commits.
+
+    Item responses contain the category name, so the lists holding these
+    items get a new revision and delta sync returns the items again.
+
+    Args:
+        session (AsyncSession): Session of the transaction renaming the category.
+        category_id (int): The renamed category.
+
+    Returns:
+        int: The number of lists whose revision was bumped.
+    """
+    result = await session.execute(
+        select(Item.shopping_list_id, Item.id).where(Item.category_id == category_id)
+    )
+    changes: Dict[int, List[Tuple[str, int, str]]] = defaultdict(list)
+    for list_id, item_id in result.all():
+        changes[list_id].append((ENTITY_ITEM, item_id, ACTION_UPDATED))
+    return await _record_per_list(session, changes)
+
+
+async def record_user_updated(session: AsyncSession, user_id: uuid.UUID) -> int:
+    """
+    Log the changes a user profile update makes to list responses.
+
+    Lists show their members, and items show their owner and last editor, so
+    the lists the user belongs to get a list change and the items they own
+    or last edited get an item change. The caller commits.
+
+    Args:
+        session (AsyncSession): Database session.
+        user_id (uuid.UUID): The updated user.
+
+    Returns:
+        int: The number of lists whose revision was bumped.
+    """
+    result = await session.execute(
+        union(
+            select(ShoppingList.id).where(ShoppingList.owner_id == user_id),
+            select(user_shopping_list.c.shopping_list_id).where(
+                user_shopping_list.c.user_id == user_id
+            ),
+        )
+    )
+    changes: Dict[int, List[Tuple[str, int, str]]] = defaultdict(list)
+    for (list_id,) in result.all():
+        changes[list_id].append((ENTITY_LIST, list_id, ACTION_UPDATED))
+
+    result = await session.execute(
+        select(Item.shopping_list_id, Item.id).where(
+            or_(Item.owner_id == user_id, Item.last_modified_by_id == user_id)
+        )
+    )
+    for list_id, item_id in result.all():
+        changes[list_id].append((ENTITY_ITEM, item_id, ACTION_UPDATED))
+
+    return await _record_per_list(session, changes)
+
+
+async def _record_per_list(
+    session: AsyncSession, changes: Dict[int, List[Tuple[str, int, str]]]
+) -> int:
+    # Lists are locked in id order so concurrent callers cannot deadlock
+    for list_id in sorted(changes):
+        await record_changes(session, list_id, changes[list_id])
+    return len(changes)
+
+
+async def get_changes_since(
+    session: AsyncSession, list_id: int, since: int
+) -> Optional[ChangeSet]:
+    """
+    Collapse the changes after a revision into their net effect.
+
+    Args:
+        session (AsyncSession): Database session.
+        list_id (int): The shopping list.
+        since (int): Last revision the client has applied.
+
+    Returns:
+        Optional[ChangeSet]: The changes, or None if the list does not exist.
+    """
+    result = await session.execute(
+        select(ShoppingList.revision).where(ShoppingList.id == list_id)
+    )
+    revision = result.scalar_one_or_none()
+    if revision is None:
+        return None
+    if since == revision:
+        return ChangeSet(revision=revision)
+    if since < 0 or since > revision:
+        return ChangeSet(revision=revision, full_resync=True)
+
+    result = await session.execute(
+        select(
+            ShoppingListChange.revision,
+            ShoppingListChange.entity_type,
+            ShoppingListChange.entity_id,
+            ShoppingListChange.action,
+        )
+        .where(
+            ShoppingListChange.shopping_list_id == list_id,
+            ShoppingListChange.revision > since,
+        )
+        .order_by(ShoppingListChange.revision)
+    )
+    rows = result.all()
+    # The log was trimmed past the client's revision
+    if not rows or rows[0].revision != since + 1:
+        return ChangeSet(revision=revision, full_resync=True)
+
+    # Only the last action per item matters
+    last_action = {}
+    list_changed = False
+    for row in rows:
+        if row.entity_type == ENTITY_ITEM:
+            last_action[row.entity_id] = row.action
+        else:
+            list_changed = True
+
+    upserted: List[int] = []
+    deleted: Set[int] = set()
+    for item_id, action in last_action.items():
+        if action == ACTION_DELETED:
+            deleted.add(item_id)
+        else:
+            upserted.append(item_id)
+
+    return ChangeSet(
+        revision=rows[-1].revision,
+        upserted_item_ids=tuple(upserted),
+        deleted_item_ids=tuple(sorted(deleted)),
+        list_changed=list_changed,
+    )
@@ -0,0 +1,421 @@
+"""
+Background AI Enrichment Queue for FamilyCart
+
+This module moves AI enrichment of new items out of the request path. Items
+are stored with whatever is already known, and a Redis-backed job queue fills
+in category, icon, standardized name and translations afterwards, notifying
+list members through the WebSocket service when an item has been enriched.
+
+A worker moves each job into its own processing list and removes it only
+once the job is done, so a job survives a crash or a restart of its worker.
+Delayed retries wait in a Redis sorted set scored by their due time.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.models.item import Item
+from app.services import change_log
+from app.services.ai_service import ai_service
+from app.services.category_cache import category_cache
+from app.services.websocket_service import websocket_service
+
+logger = logging.getLogger(__name__)
+
+# Number of failed jobs kept for inspection
+DEAD_LETTER_MAX_LENGTH = 1000
+
+# Due retries moved to the queue per maintenance round
+RETRY_BATCH_SIZE = 100
+
+# Moves due retries from the sorted set to the queue in one step, so a job is
+# never in both or in neither
+_MOVE_DUE_RETRIES_SCRIPT = """
+local jobs = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, job in ipairs(jobs) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('LPUSH', KEYS[2], job)
+end
+return #jobs
+"""
+
+
+class EnrichmentQueue:
+    """
+    Job queue for background item enrichment.
+
+    Jobs are pushed to a Redis list and consumed by a fixed number of worker
+    tasks, which bounds the number of concurrent AI requests. Each worker
+    moves a job into its own processing list while it runs. A heartbeat key
+    per processing list shows the worker is alive; the jobs of a list whose
+    heartbeat expired are put back on the queue by any running process.
+    Failed jobs are retried with exponential backoff and moved to a
+    dead-letter list once AI_ENRICHMENT_MAX_RETRIES is exceeded. Without
+    Redis, jobs run as local tasks limited by the same concurrency.
+    """
+
+    def __init__(self):
+        self._workers: List[asyncio.Task] = []
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._pending_tasks: Set[asyncio.Task] = set()
+        self._local_semaphore: Optional[asyncio.Semaphore] = None
+        # Names the processing lists of this process
+        self.instance_id = uuid.uuid4().hex
+        self.processed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.recovered = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.AI_ENRICHMENT_MODE == "background"
+
+    def _spawn(self, coro):
+        """Run a coroutine in the background and keep a reference to it."""
+        task = asyncio.create_task(coro)
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
+        return task
+
+    async def enqueue(self, item_id: int, list_id: int, user_id: str, item_name: str):
+        """
+        Schedule background enrichment of a newly created item.
+
+        Args:
+            item_id (int): The id of the stored item.
+            list_id (int): The shopping list the item belongs to.
+            user_id (str): The user who created the item.
+            item_name (str): The name of the item.
+        """
+        job = {
+            "item_id": item_id,
+            "list_id": list_id,
+            "user_id": user_id,
+            "item_name": item_name,
+            "attempts": 0,
+        }
+        await self._push(job)
+
+    async def _push(self, job: Dict[str, Any]):
+        if cache_service.redis_client:
+            try:
+                await cache_service.redis_client.lpush(
+                    settings.AI_ENRICHMENT_QUEUE_KEY, json.dumps(job)
+                )
+                return
+            except RedisError as e:
+                logger.warning(
+                    f"Failed to enqueue enrichment job, running locally: {e}"
+                )
+
+        self._spawn(self._run_locally(job))
+
+    async def _run_locally(self, job: Dict[str, Any]):
+        if self._local_semaphore is None:
+            self._local_semaphore = asyncio.Semaphore(settings.AI_ENRICHMENT_WORKERS)
+        async with self._local_semaphore:
+            await self._handle(job)
+
+    def _processing_key(self, worker_id: int) -> str:
+        return f"{settings.AI_ENRICHMENT_PROCESSING_KEY}:{self.instance_id}:{worker_id}"
+
+    @property
+    def _processing_registry_key(self) -> str:
+        return f"{settings.AI_ENRICHMENT_PROCESSING_KEY}:lists"
+
+    async def _retry_later(self, job: Dict[str, Any], delay: float):
+        if cache_service.redis_client:
+            try:
+                await cache_service.redis_client.zadd(
+                    settings.AI_ENRICHMENT_RETRY_KEY,
+                    {json.dumps(job): time.time() + delay},
+                )
+                return
+            except RedisError as e:
+                logger.warning(f"Failed to schedule enrichment retry: {e}")
+
+        await asyncio.sleep(delay)
+        await self._push(job)
+
+    async def _dead_letter(self, job: Dict[str, Any], error: Exception):
+        self.dead_lettered += 1
+        logger.error(
+            f"Giving up on enrichment of item {job['item_id']} after "
+            f"{job['attempts']} attempts: {error}"
+        )
+        if not cache_service.redis_client:
+            return
+        try:
+            await cache_service.redis_client.lpush(
+                settings.AI_ENRICHMENT_DEAD_LETTER_KEY,
+                json.dumps({**job, "error": str(error)}),
+            )
+            await cache_service.redis_client.ltrim(
+                settings.AI_ENRICHMENT_DEAD_LETTER_KEY, 0, DEAD_LETTER_MAX_LENGTH - 1
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to store dead-lettered enrichment job: {e}")
+
+    async def _handle(self, job: Dict[str, Any]):
+        """Process a job, retrying or dead-lettering it on failure."""
+        try:
+            await self.process_job(job)
+            self.processed += 1
+        except Exception as e:
+            job["attempts"] += 1
+            if job["attempts"] > settings.AI_ENRICHMENT_MAX_RETRIES:
+                await self._dead_letter(job, e)
+                return
+            self.retried += 1
+            delay = 2 ** job["attempts"]
+            logger.warning(
+                f"Enrichment of item {job['item_id']} failed ({e}), "
+                f"retrying in {delay}s"
+            )
+            if cache_service.redis_client:
+                await self._retry_later(job, delay)
+            else:
+                self._spawn(self._retry_later(job, delay))
+
+    async def process_job(self, job: Dict[str, Any]):
+        """
+        Enrich a stored item and notify list members.
+
+        Only fields that are still empty are filled in, so changes made by
+        users in the meantime are kept. If nothing was filled in, no change
+        is recorded and nobody is notified.
+
+        Args:
+            job (Dict[str, Any]): The job payload created by enqueue.
+        """
+        from app.api.v1.endpoints.item_ai_service import ItemAIProcessor
+        from app.db.session import AsyncSessionLocal
+        from app.schemas.serializers import item_to_dict
+
+        async with AsyncSessionLocal() as session:
+            item = await session.get(Item, job["item_id"])
+            if item is None:
+                logger.info(f"Item {job['item_id']} was deleted before enrichment")
+                return
+
+            category_names = category_cache.names()
+            enrichment = await asyncio.wait_for(
+                ai_service.enrich_item(job["item_name"], category_names),
+                timeout=settings.AI_ENRICHMENT_JOB_TIMEOUT,
+            )
+            category, standardized_name, translations, icon_name = (
+                await ItemAIProcessor.resolve_enrichment(enrichment, session)
+            )
+
+            enriched = False
+            if category and item.category_id is None:
+                item.category_id = category.id
+                enriched = True
+            if icon_name and not item.icon_name:
+                item.icon_name = icon_name
+                enriched = True
+            if standardized_name and not item.standardized_name:
+                item.standardized_name = standardized_name
+                enriched = True
+            if translations and not item.translations:
+                item.translations = translations
+                enriched = True
+            if not enriched:
+                # A no-op change would still bump the list revision
+                logger.info(f"Item {item.id} needed no enrichment anymore")
+                return
+
+            await change_log.record_change(
+                session,
+                item.shopping_list_id,
+                change_log.ENTITY_ITEM,
+                item.id,
+                change_log.ACTION_UPDATED,
+            )
+            await session.commit()
+
+            result = await session.execute(
+                select(Item)
+                .where(Item.id == job["item_id"])
+                .options(
+                    selectinload(Item.category),
+                    selectinload(Item.owner),
+                    selectinload(Item.last_modified_by),
+                )
+            )
+            item = result.scalar_one()
+            item_data = item_to_dict(item)
+
+        await websocket_service.notify_item_enriched(
+            list_id=job["list_id"], item_data=item_data, user_id=job["user_id"]
+        )
+
+    async def _worker(self, worker_id: int):
+        redis_client = cache_service.redis_client
+        processing_key = self._processing_key(worker_id)
+        while True:
+            try:
+                payload = await redis_client.blmove(
+                    settings.AI_ENRICHMENT_QUEUE_KEY,
+                    processing_key,
+                    timeout=5,
+                    src="RIGHT",
+                    dest="LEFT",
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Enrichment worker {worker_id} failed to poll: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            if not payload:
+                continue
+            try:
+                job = json.loads(payload)
+            except json.JSONDecodeError:
+                logger.error(f"Dropping malformed enrichment job: {payload}")
+            else:
+                await self._handle(job)
+            # A job interrupted before this point stays in the processing list
+            try:
+                await redis_client.lrem(processing_key, 1, payload)
+            except RedisError as e:
+                logger.warning(f"Failed to acknowledge enrichment job: {e}")
+
+    async def _requeue(self, processing_key: str) -> int:
+        """Put the jobs of a processing list back on the queue, oldest first."""
+        requeued = 0
+        while await cache_service.redis_client.lmove(
+            processing_key, settings.AI_ENRICHMENT_QUEUE_KEY, src="RIGHT", dest="RIGHT"
+        ):
+            requeued += 1
+        return requeued
+
+    async def _beat(self):
+        """Refresh the heartbeats of this process's processing lists."""
+        redis_client = cache_service.redis_client
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for worker_id in range(len(self._workers)):
+                pipe.set(
+                    f"{self._processing_key(worker_id)}:alive",
+                    1,
+                    ex=settings.AI_ENRICHMENT_HEARTBEAT_TTL,
+                )
+            await pipe.execute()
+
+    async def recover_abandoned_jobs(self) -> int:
+        """
+        Requeue the jobs of workers whose heartbeat expired.
+
+        Returns:
+            int: The number of jobs put back on the queue.
+        """
+        redis_client = cache_service.redis_client
+        requeued = 0
+        for processing_key in await redis_client.smembers(
+            self._processing_registry_key
+        ):
+            if await redis_client.exists(f"{processing_key}:alive"):
+                continue
+            requeued += await self._requeue(processing_key)
+            await redis_client.srem(self._processing_registry_key, processing_key)
+        if requeued:
+            self.recovered += requeued
+            logger.warning(f"Requeued {requeued} abandoned enrichment jobs")
+        return requeued
+
+    async def move_due_retries(self) -> int:
+        """Move retries whose delay has passed to the queue."""
+        return await cache_service.redis_client.eval(
+            _MOVE_DUE_RETRIES_SCRIPT,
+            2,
+            settings.AI_ENRICHMENT_RETRY_KEY,
+            settings.AI_ENRICHMENT_QUEUE_KEY,
+            time.time(),
+            RETRY_BATCH_SIZE,
+        )
+
+    async def _maintain(self):
+        """Keep heartbeats alive, release due retries and recover lost jobs."""
+        heartbeat_interval = settings.AI_ENRICHMENT_HEARTBEAT_TTL / 3
+        last_beat = last_recovery = time.monotonic()
+        while True:
+            await asyncio.sleep(1)
+            try:
+                now = time.monotonic()
+                if now - last_beat >= heartbeat_interval:
+                    await self._beat()
+                    last_beat = now
+                await self.move_due_retries()
+                if now - last_recovery >= settings.AI_ENRICHMENT_HEARTBEAT_TTL:
+                    await self.recover_abandoned_jobs()
+                    last_recovery = now
+            except Exception as e:
+                logger.warning(f"Enrichment queue maintenance failed: {e}")
+
+    async def start(self):
+        """Start the queue workers when background enrichment is enabled."""
+        if not self.enabled or not cache_service.redis_client:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(worker_id))
+            for worker_id in range(settings.AI_ENRICHMENT_WORKERS)
+        ]
+        try:
+            await self._beat()
+            await cache_service.redis_client.sadd(
+                self._processing_registry_key,
+                *(self._processing_key(i) for i in range(len(self._workers))),
+            )
+            # Jobs left behind by processes that stopped without requeueing
+            await self.recover_abandoned_jobs()
+        except RedisError as e:
+            logger.warning(f"Failed to register enrichment workers: {e}")
+        self._maintenance_task = asyncio.create_task(self._maintain())
+        logger.info(f"Started {len(self._workers)} AI enrichment workers")
+
+    async def stop(self):
+        tasks = self._workers + list(self._pending_tasks)
+        if self._maintenance_task:
+            tasks.append(self._maintenance_task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Hand interrupted jobs back to the queue for the remaining workers
+        redis_client = cache_service.redis_client
+        for worker_id in range(len(self._workers)):
+            processing_key = self._processing_key(worker_id)
+            try:
+                await self._requeue(processing_key)
+                await redis_client.delete(f"{processing_key}:alive")
+                await redis_client.srem(self._processing_registry_key, processing_key)
+            except RedisError as e:
+                logger.warning(f"Failed to requeue interrupted enrichment jobs: {e}")
+        self._workers = []
+        self._maintenance_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": settings.AI_ENRICHMENT_MODE,
+            "workers": len(self._workers),
+            "pending_local_tasks": len(self._pending_tasks),
+            "processed": self.processed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "recovered": self.recovered,
+        }
+
+
+enrichment_queue = EnrichmentQueue()
@@ -6,16 +6,39 @@ when Gemini rate limits are reached, ensuring continuous AI functionality.
 """
 
 import asyncio
+import json
 import logging
+import time
 from typing import Any, Dict, List, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import cache_service
 from app.core.config import settings
+from app.services.ai_enrichment import (
+    CATEGORY_FIELD,
+    category_cache_key,
+    get_cached_enrichment,
+    get_cached_enrichments,
+    icon_cache_key,
+    missing_enrichment_fields,
+    normalize_item_name,
+    standardization_cache_key,
+    with_enrichment_defaults,
+)
 from app.services.ai_factory import get_ai_provider
+from app.services.ai_metrics import (
+    ai_fallbacks_total,
+    ai_hedges_total,
+    ai_operation_time,
+    operation_label,
+)
 from app.services.gemini_provider import GeminiProvider
+from app.services.hedging import HedgingPolicy
+from app.services.local_categorizer import local_categorizer
 from app.services.ollama_provider import OllamaProvider
+from app.services.provider_guard import ProviderGuard, ProviderUnavailableError
+from app.services.single_flight import SingleFlight
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -33,8 +56,10 @@ class FallbackAIService:
         """Initialize the fallback AI service."""
         self._primary_provider = None
         self._fallback_provider = None
-        self._rate_limit_detected = False
-        self._rate_limit_reset_time = None
+        self._guards: Dict[str, ProviderGuard] = {}
+        self.hedging = HedgingPolicy()
+        # Coalesces identical concurrent lookups, keyed like their cache entries
+        self.single_flight = SingleFlight()
 
     @property
     def primary_provider(self):
@@ -81,12 +106,37 @@ class FallbackAIService:
         ]
         return any(indicator in error_str for indicator in rate_limit_indicators)
 
+    def _local_fields(
+        self, item_name: str, category_names: List[str]
+    ) -> Dict[str, Any]:
+        """Enrichment fields the local categorizer can answer without AI."""
+        local_category = local_categorizer.suggest_category(item_name, category_names)
+        return {CATEGORY_FIELD: local_category} if local_category else {}
+
+    def _guard(self, provider) -> ProviderGuard:
+        """The concurrency limiter and circuit breaker of a provider."""
+        name = provider.provider_name
+        if name not in self._guards:
+            self._guards[name] = ProviderGuard(name)
+        return self._guards[name]
+
+    @property
+    def _rate_limit_detected(self) -> bool:
+        """Whether the primary provider is currently avoided."""
+        primary = self._primary_provider
+        return bool(primary) and self._guard(primary).breaker.state != "closed"
+
     async def _try_with_fallback(
         self, operation_name: str, primary_func, fallback_func
     ):
         """
         Try an operation with the primary provider, fallback to Ollama if needed.
 
+        Each provider is called through its ProviderGuard: a provider whose
+        circuit breaker is open or whose concurrency limit is reached is
+        skipped without being called. The duration of the whole operation is
+        recorded per provider role that served it.
+
         Args:
             operation_name: Name of the operation for logging
             primary_func: Async function to call on primary provider
@@ -95,79 +145,161 @@ class FallbackAIService:
         Returns:
             Result from either primary or fallback provider
         """
-        # If we recently detected a rate limit and it hasn't reset, go straight to fallback
-        if self._rate_limit_detected and self._rate_limit_reset_time:
-            import time
-
-            if time.time() < self._rate_limit_reset_time:
-                logger.info(
-                    f"Rate limit still active, using fallback for {operation_name}"
-                )
-                if self.fallback_provider:
-                    return await fallback_func()
-                else:
-                    raise Exception(
-                        "Both primary and fallback providers are unavailable"
-                    )
-
-        # Try primary provider first
+        served_by = []
+
+        async def primary():
+            result = await primary_func()
+            served_by.append("primary")
+            return result
+
+        async def fallback():
+            result = await fallback_func()
+            served_by.append("fallback")
+            return result
+
+        start = time.perf_counter()
+        try:
+            return await self._route(operation_name, primary, fallback)
+        finally:
+            ai_operation_time.labels(
+                operation_label(operation_name), served_by[0] if served_by else "none"
+            ).observe(time.perf_counter() - start)
+
+    async def _route(self, operation_name: str, primary_func, fallback_func):
         if self.primary_provider:
+            if settings.AI_HEDGING_ENABLED and self.fallback_provider:
+                return await self._try_hedged(
+                    operation_name, primary_func, fallback_func
+                )
             try:
                 logger.debug(f"Attempting {operation_name} with primary provider")
-                result = await primary_func()
+                return await self._guard(self.primary_provider).call(
+                    primary_func, self._is_rate_limit_error
+                )
+            except ProviderUnavailableError as e:
+                logger.info(f"Skipping primary provider for {operation_name}: {e}")
+                primary_error, reason = e, "unavailable"
+            except Exception as e:
+                logger.warning(f"Primary provider failed for {operation_name}: {e}")
+                primary_error, reason = e, "error"
 
-                # Reset rate limit flag on successful operation
-                if self._rate_limit_detected:
-                    self._rate_limit_detected = False
-                    self._rate_limit_reset_time = None
-                    logger.info("Rate limit appears to have been reset")
+            if not self.fallback_provider:
+                raise primary_error
+        elif not self.fallback_provider:
+            raise Exception("No AI providers available")
+        else:
+            logger.info(
+                f"No primary provider available, using fallback for {operation_name}"
+            )
+            reason = "no_primary"
 
-                return result
+        return await self._call_fallback(operation_name, fallback_func, reason)
 
-            except Exception as e:
-                logger.warning(f"Primary provider failed for {operation_name}: {e}")
+    async def _call_fallback(
+        self, operation_name: str, fallback_func, reason: Optional[str] = None
+    ):
+        if reason:
+            ai_fallbacks_total.labels(operation_label(operation_name), reason).inc()
+        try:
+            logger.info(f"Attempting {operation_name} with fallback provider")
+            result = await self._guard(self.fallback_provider).call(
+                fallback_func, self._is_rate_limit_error
+            )
+            logger.info(f"Fallback provider succeeded for {operation_name}")
+            return result
+        except Exception as fallback_error:
+            logger.error(
+                f"Fallback provider also failed for {operation_name}: {fallback_error}"
+            )
+            raise fallback_error
 
-                # Check if this is a rate limit error
-                if self._is_rate_limit_error(e):
-                    self._rate_limit_detected = True
-                    # Set reset time to 1 hour from now
-                    import time
+    async def _try_hedged(self, operation_name: str, primary_func, fallback_func):
+        """
+        Ask the primary provider and, if it is slow, the fallback provider too.
 
-                    self._rate_limit_reset_time = time.time() + 3600
-                    logger.error(
-                        f"Rate limit detected for primary provider, switching to fallback"
-                    )
+        The fallback provider is only asked once the primary has taken longer
+        than the hedging delay of the operation, or failed. The first
+        successful answer wins and the other call is cancelled.
 
-                    # Cache the rate limit status
-                    await cache_service.set(
-                        "gemini_rate_limit_detected", "true", expire=3600
+        Args:
+            operation_name: Name of the operation for logging and statistics
+            primary_func: Async function to call on primary provider
+            fallback_func: Async function to call on fallback provider
+
+        Returns:
+            Result from whichever provider answered first
+        """
+        started_at = time.monotonic()
+        primary = asyncio.ensure_future(
+            self._guard(self.primary_provider).call(
+                primary_func, self._is_rate_limit_error
+            )
+        )
+        hedge = None
+        try:
+            done, _ = await asyncio.wait(
+                {primary}, timeout=self.hedging.delay(operation_name)
+            )
+            if done:
+                try:
+                    result = primary.result()
+                except Exception as e:
+                    logger.warning(f"Primary provider failed for {operation_name}: {e}")
+                    self.hedging.record_request(operation_name, hedged=False)
+                    reason = (
+                        "unavailable"
+                        if isinstance(e, ProviderUnavailableError)
+                        else "error"
+                    )
+                    return await self._call_fallback(
+                        operation_name, fallback_func, reason
                     )
+                self.hedging.record_latency(
+                    operation_name, time.monotonic() - started_at
+                )
+                self.hedging.record_request(operation_name, hedged=False)
+                return result
 
-                # Try fallback provider
-                if self.fallback_provider:
-                    try:
-                        logger.info(
-                            f"Attempting {operation_name} with fallback provider"
+            logger.info(f"Primary provider is slow for {operation_name}, hedging")
+            hedge = asyncio.ensure_future(
+                self._call_fallback(operation_name, fallback_func)
+            )
+            while True:
+                # The primary is preferred when both have answered
+                for task in (primary, hedge):
+                    if (
+                        task.done()
+                        and not task.cancelled()
+                        and task.exception() is None
+                    ):
+                        # When the hedge wins this is a lower bound of the
+                        # primary latency, which keeps the delay from drifting down
+                        self.hedging.record_latency(
+                            operation_name, time.monotonic() - started_at
                         )
-                        result = await fallback_func()
-                        logger.info(f"Fallback provider succeeded for {operation_name}")
-                        return result
-                    except Exception as fallback_error:
-                        logger.error(
-                            f"Fallback provider also failed for {operation_name}: {fallback_error}"
+                        self.hedging.record_request(
+                            operation_name, hedged=True, hedge_won=task is hedge
                         )
-                        raise fallback_error
-                else:
-                    raise e
-        else:
-            # No primary provider, try fallback
-            if self.fallback_provider:
-                logger.info(
-                    f"No primary provider available, using fallback for {operation_name}"
+                        ai_hedges_total.labels(
+                            operation_label(operation_name),
+                            "fallback" if task is hedge else "primary",
+                        ).inc()
+                        return task.result()
+                if primary.done() and hedge.done():
+                    self.hedging.record_request(operation_name, hedged=True)
+                    ai_hedges_total.labels(
+                        operation_label(operation_name), "none"
+                    ).inc()
+                    return hedge.result()
+                await asyncio.wait(
+                    [task for task in (primary, hedge) if not task.done()],
+                    return_when=asyncio.FIRST_COMPLETED,
                 )
-                return await fallback_func()
-            else:
-                raise Exception("No AI providers available")
+        finally:
+            # Cancels the loser, or both calls if the caller was cancelled
+            primary.cancel()
+            if hedge is not None:
+                hedge.cancel()
 
     async def generate_text(self, prompt: str) -> str:
         """
@@ -218,6 +350,9 @@ class FallbackAIService:
         """
         Suggest a category for a given item name (async version) with fallback support.
 
+        The local categorizer answers first; AI providers are only asked when
+        it is not confident enough.
+
         Args:
             item_name (str): The name of the item.
             category_names (List[str]): List of existing category names.
@@ -225,6 +360,9 @@ class FallbackAIService:
         Returns:
             str: The suggested category name.
         """
+        local_category = local_categorizer.suggest_category(item_name, category_names)
+        if local_category:
+            return local_category
 
         async def primary_func():
             return await self.primary_provider.suggest_category_async(
@@ -236,8 +374,13 @@ class FallbackAIService:
                 item_name, category_names
             )
 
-        return await self._try_with_fallback(
-            "category suggestion async", primary_func, fallback_func
+        cache_key = category_cache_key(item_name)
+        return await self.single_flight.do(
+            cache_key,
+            lambda: self._try_with_fallback(
+                "category suggestion async", primary_func, fallback_func
+            ),
+            read_cached=lambda: cache_service.get(cache_key),
         )
 
     async def suggest_icon(self, item_name: str, category_name: str) -> str:
@@ -258,8 +401,13 @@ class FallbackAIService:
         async def fallback_func():
             return await self.fallback_provider.suggest_icon(item_name, category_name)
 
-        return await self._try_with_fallback(
-            "icon suggestion", primary_func, fallback_func
+        cache_key = icon_cache_key(item_name, category_name)
+        return await self.single_flight.do(
+            cache_key,
+            lambda: self._try_with_fallback(
+                "icon suggestion", primary_func, fallback_func
+            ),
+            read_cached=lambda: cache_service.get(cache_key),
         )
 
     async def standardize_and_translate_item_name(
@@ -285,8 +433,129 @@ class FallbackAIService:
                 item_name
             )
 
+        cache_key = standardization_cache_key(item_name)
+
+        async def read_cached():
+            cached = await cache_service.get(cache_key)
+            return json.loads(cached) if cached else None
+
+        return await self.single_flight.do(
+            cache_key,
+            lambda: self._try_with_fallback(
+                "standardization and translation", primary_func, fallback_func
+            ),
+            read_cached=read_cached,
+        )
+
+    async def enrich_item(
+        self, item_name: str, category_names: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Suggest category, icon, standardized name and translations in one request
+        with fallback support. A confident local category is not requested again.
+
+        Args:
+            item_name (str): The name of the item.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the keys "category_name", "icon_name",
+            "standardized_name" and "translations".
+        """
+        known_fields = self._local_fields(item_name, category_names)
+
+        async def primary_func():
+            return await self.primary_provider.enrich_item(
+                item_name, category_names, known_fields=known_fields
+            )
+
+        async def fallback_func():
+            return await self.fallback_provider.enrich_item(
+                item_name, category_names, known_fields=known_fields
+            )
+
+        async def read_cached():
+            enrichment = await get_cached_enrichment(item_name, known_fields)
+            if missing_enrichment_fields(enrichment):
+                return None
+            return with_enrichment_defaults(item_name, enrichment)
+
+        # A local category changes what is requested, so it is part of the key
+        local_category = known_fields.get(CATEGORY_FIELD) or ""
+        return await self.single_flight.do(
+            f"enrichment:{normalize_item_name(item_name)}:{local_category}",
+            lambda: self._try_with_fallback(
+                "item enrichment", primary_func, fallback_func
+            ),
+            read_cached=read_cached,
+        )
+
+    async def get_known_enrichment(
+        self, item_name: str, category_names: List[str]
+    ) -> Dict[str, Any]:
+        """
+        Collect the enrichment fields available without calling any AI provider.
+
+        Args:
+            item_name (str): The name of the item.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            Dict[str, Any]: The cached and locally categorized fields; missing
+            fields are simply absent.
+        """
+        return await get_cached_enrichment(
+            item_name, self._local_fields(item_name, category_names)
+        )
+
+    async def get_known_enrichments(
+        self, item_names: List[str], category_names: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Collect the known enrichment fields of several items in one cache lookup.
+
+        Args:
+            item_names (List[str]): The names of the items.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            List[Dict[str, Any]]: The known fields per item, in input order.
+        """
+        return await get_cached_enrichments(
+            item_names,
+            [self._local_fields(item_name, category_names) for item_name in item_names],
+        )
+
+    async def enrich_items(
+        self, item_names: List[str], category_names: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Enrich several items with batched requests and fallback support.
+
+        Args:
+            item_names (List[str]): The names of the items.
+            category_names (List[str]): List of existing category names.
+
+        Returns:
+            List[Dict[str, Any]]: One enrichment dictionary per item, in input order.
+        """
+
+        known_fields = [
+            self._local_fields(item_name, category_names) for item_name in item_names
+        ]
+
+        async def primary_func():
+            return await self.primary_provider.enrich_items(
+                item_names, category_names, known_fields=known_fields
+            )
+
+        async def fallback_func():
+            return await self.fallback_provider.enrich_items(
+                item_names, category_names, known_fields=known_fields
+            )
+
         return await self._try_with_fallback(
-            "standardization and translation", primary_func, fallback_func
+            "batch item enrichment", primary_func, fallback_func
         )
 
     def get_provider_info(self) -> dict:
@@ -299,6 +568,11 @@ class FallbackAIService:
         info = {
             "rate_limit_detected": self._rate_limit_detected,
             "fallback_available": self.fallback_provider is not None,
+            "single_flight": self.single_flight.get_stats(),
+            "providers": {
+                name: guard.get_stats() for name, guard in self._guards.items()
+            },
+            "hedging": self.hedging.get_stats(),
         }
 
         if self._rate_limit_detected and self.fallback_provider:
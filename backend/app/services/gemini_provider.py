@@ -7,22 +7,53 @@ for AI-powered features in FamilyCart.
 
 import json
 import logging
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, Optional, Type
 
 import google.generativeai as genai
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.cache import cache_service
 from app.core.config import settings
-from app.models.category import Category
+from app.services.ai_enrichment import (
+    DEFAULT_CATEGORY,
+    DEFAULT_ICON,
+    ENRICHMENT_CACHE_EXPIRE,
+    build_category_prompt,
+    build_enrichment_prompt,
+    build_icon_prompt,
+    build_standardization_prompt,
+    cache_enrichment,
+    category_cache_key,
+    enrich_items_in_batches,
+    get_cached_enrichment,
+    icon_cache_key,
+    missing_enrichment_fields,
+    requested_enrichment,
+    standardization_cache_key,
+    with_enrichment_defaults,
+)
+from app.services.ai_metrics import record_provider_call
 from app.services.ai_provider import AIProvider
+from app.services.category_cache import category_cache
+from app.services.structured_output import (
+    AnswerType,
+    CategoryAnswer,
+    IconAnswer,
+    StandardizationAnswer,
+    enrichment_answer,
+    generate_structured,
+    json_schema,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Makes the model answer with JSON only, without surrounding text
+JSON_OUTPUT = {"response_mime_type": "application/json"}
+
 
 class GeminiProvider(AIProvider):
     """
@@ -78,6 +109,63 @@ class GeminiProvider(AIProvider):
         """Get the model name."""
         return settings.GEMINI_MODEL_NAME
 
+    async def _generate(
+        self,
+        operation: str,
+        prompt: str,
+        generation_config: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Call the model and record its latency, outcome and token counts.
+
+        Args:
+            operation (str): Operation label for the metrics.
+            prompt (str): The prompt to send to the model.
+            generation_config (Optional[Dict[str, Any]]): E.g. the JSON output mode.
+
+        Returns:
+            The Gemini response.
+        """
+        start = time.perf_counter()
+        try:
+            if generation_config is None:
+                response = await self.model.generate_content_async(prompt)
+            else:
+                response = await self.model.generate_content_async(
+                    prompt, generation_config=generation_config
+                )
+        except Exception as e:
+            outcome = "rate_limited" if self._is_rate_limit_error(e) else "error"
+            record_provider_call(
+                self.provider_name, operation, outcome, time.perf_counter() - start
+            )
+            raise
+        usage = getattr(response, "usage_metadata", None)
+        record_provider_call(
+            self.provider_name,
+            operation,
+            "success",
+            time.perf_counter() - start,
+            prompt_tokens=getattr(usage, "prompt_token_count", None),
+            response_tokens=getattr(usage, "candidates_token_count", None),
+        )
+        return response
+
+    async def _generate_answer(
+        self, operation: str, prompt: str, answer_type: Type[AnswerType]
+    ) -> Optional[AnswerType]:
+        """Request an answer constrained to the schema of answer_type."""
+        generation_config = {
+            **JSON_OUTPUT,
+            "response_schema": json_schema(answer_type),
+        }
+
+        async def generate() -> str:
+            response = await self._generate(operation, prompt, generation_config)
+            return response.text
+
+        return await generate_structured(generate, answer_type)
+
     async def generate_text(self, prompt: str) -> str:
         """
         Generate text using the Gemini model.
@@ -89,7 +177,7 @@ class GeminiProvider(AIProvider):
             str: The generated text.
         """
         try:
-            response = await self.model.generate_content_async(prompt)
+            response = await self._generate("text_generation", prompt)
             return response.text
         except Exception as e:
             logger.error(f"Error generating text with Gemini: {e}")
@@ -106,66 +194,8 @@ class GeminiProvider(AIProvider):
         Returns:
             str: The suggested category name.
         """
-        cache_key = f"category_suggestion:{item_name.lower().strip()}"
-        cached_category = await cache_service.get(cache_key)
-        if cached_category:
-            logger.info(
-                f"Cache hit for category suggestion: {item_name} -> {cached_category}"
-            )
-            return cached_category
-
-        # Use async SQLAlchemy to get existing categories
-        result = await db.execute(select(Category).limit(1000))
-        existing_categories = result.scalars().all()
-        category_names = [category.name for category in existing_categories]
-
-        prompt = f"""
-        Given the following list of existing shopping item categories:
-        {', '.join(category_names)}
-
-        What is the best category for the item "{item_name}"?
-        
-        IMPORTANT INSTRUCTIONS:
-        - The item name might be in Czech, German, Spanish, French, or other languages
-        - The category should be a single noun, in English, and singular
-        - If a suitable category from the list exists, return it exactly as written
-        - If not, suggest a new, appropriate category in English
-        - Return ONLY the category name and nothing else - no punctuation, no explanations
-        
-        Examples:
-        - For "mléko" (Czech for milk), return: Dairy
-        - For "Granny Smith Apples", return: Produce  
-        - For "Cheddar Cheese", return: Dairy
-        - For "pain" (French for bread), return: Pantry
-        
-        Item to categorize: "{item_name}"
-        """
-
-        try:
-            response = await self.model.generate_content_async(prompt)
-            # First try to parse as JSON (legacy behavior)
-            try:
-                data = json.loads(response.text)
-                suggested_category = (
-                    data.get("category_name", "Uncategorized")
-                    .strip()
-                    .replace(".", "")
-                    .title()
-                )
-            except (json.JSONDecodeError, KeyError):
-                # Expected behavior: parse as plain text response
-                suggested_category = response.text.strip().replace(".", "").title()
-                logger.info(
-                    f"Parsed plain text category response: {suggested_category}"
-                )
-
-            await cache_service.set(
-                cache_key, suggested_category, expire=3600 * 24 * 180
-            )  # Cache for 6 months
-            return suggested_category
-        except Exception as e:
-            logger.error(f"Error suggesting category with Gemini: {e}")
-            return "Uncategorized"
+        # Existing categories come from the in-memory snapshot, not the database
+        return await self.suggest_category_async(item_name, category_cache.names())
 
     async def suggest_category_async(
         self, item_name: str, category_names: List[str]
@@ -180,7 +210,7 @@ class GeminiProvider(AIProvider):
         Returns:
             str: The suggested category name.
         """
-        cache_key = f"category_suggestion:{item_name.lower().strip()}"
+        cache_key = category_cache_key(item_name)
         cached_category = await cache_service.get(cache_key)
         if cached_category:
             logger.info(
@@ -188,56 +218,26 @@ class GeminiProvider(AIProvider):
             )
             return cached_category
 
-        prompt = f"""
-        Given the following list of existing shopping item categories:
-        {', '.join(category_names)}
-
-        What is the best category for the item "{item_name}"?
-        
-        IMPORTANT INSTRUCTIONS:
-        - The item name might be in Czech, German, Spanish, French, or other languages
-        - The category should be a single noun, in English, and singular
-        - If a suitable category from the list exists, return it exactly as written
-        - If not, suggest a new, appropriate category in English
-        - Return ONLY the category name and nothing else - no punctuation, no explanations
-        
-        Examples:
-        - For "mléko" (Czech for milk), return: Dairy
-        - For "Granny Smith Apples", return: Produce  
-        - For "Cheddar Cheese", return: Dairy
-        - For "pain" (French for bread), return: Pantry
-        
-        Item to categorize: "{item_name}"
-        """
-
         try:
-            response = await self.model.generate_content_async(prompt)
-            # First try to parse as JSON (legacy behavior)
-            try:
-                data = json.loads(response.text)
-                suggested_category = (
-                    data.get("category_name", "Uncategorized")
-                    .strip()
-                    .replace(".", "")
-                    .title()
-                )
-            except (json.JSONDecodeError, KeyError):
-                # Expected behavior: parse as plain text response
-                suggested_category = response.text.strip().replace(".", "").title()
-                logger.info(
-                    f"Parsed plain text category response: {suggested_category}"
-                )
-
-            await cache_service.set(
-                cache_key, suggested_category, expire=3600 * 24 * 180
-            )  # Cache for 6 months
-            return suggested_category
+            answer = await self._generate_answer(
+                "category_suggestion",
+                build_category_prompt(item_name, category_names),
+                CategoryAnswer,
+            )
         except Exception as e:
             logger.error(f"Error suggesting category with Gemini: {e}")
             # Re-raise rate limit and quota errors so fallback service can handle them
             if self._is_rate_limit_error(e):
                 raise e
-            return "Uncategorized"
+            return DEFAULT_CATEGORY
+
+        if answer is None:
+            # Not cached, so the item is categorized again next time
+            return DEFAULT_CATEGORY
+        await cache_service.set(
+            cache_key, answer.category_name, expire=ENRICHMENT_CACHE_EXPIRE
+        )
+        return answer.category_name
 
     async def suggest_icon(self, item_name: str, category_name: str) -> str:
         """
@@ -250,7 +250,7 @@ class GeminiProvider(AIProvider):
         Returns:
             str: The suggested icon name.
         """
-        cache_key = f"icon_suggestion:{item_name.lower().strip()}:{category_name.lower().strip()}"
+        cache_key = icon_cache_key(item_name, category_name)
         cached_icon = await cache_service.get(cache_key)
         if cached_icon:
             logger.info(
@@ -258,140 +258,25 @@ class GeminiProvider(AIProvider):
             )
             return cached_icon
 
-        # A curated list of common icons. A more comprehensive list could be loaded from a file.
-        icon_list = [
-            "shopping_cart",
-            "local_grocery_store",
-            "fastfood",
-            "local_bar",
-            "local_cafe",
-            "local_dining",
-            "icecream",
-            "local_pizza",
-            "ramen_dining",
-            "lunch_dining",
-            "bakery_dining",
-            "hardware",
-            "home",
-            "kitchen",
-            "tv",
-            "lightbulb",
-            "chair",
-            "bed",
-            "camera",
-            "movie",
-            "music_note",
-            "book",
-            "school",
-            "science",
-            "pets",
-            "park",
-            "fitness_center",
-            "checkroom",
-            "face",
-            "spa",
-            "content_cut",
-            "brush",
-            "medical_services",
-            "medication",
-            "local_pharmacy",
-            "local_hospital",
-            "construction",
-            "handyman",
-            "plumbing",
-            "electrical_services",
-            "cleaning_services",
-            "flight",
-            "train",
-            "directions_car",
-            "local_taxi",
-            "local_gas_station",
-            "ev_station",
-            "local_shipping",
-            "local_post_office",
-            "credit_card",
-            "account_balance_wallet",
-            "savings",
-            "paid",
-            "receipt_long",
-            "work",
-            "business_center",
-            "computer",
-            "phone_iphone",
-            "smartphone",
-            "tablet_mac",
-            "watch",
-            "devices",
-            "toys",
-            "sports_esports",
-            "sports_soccer",
-            "sports_basketball",
-            "sports_tennis",
-            "sports_volleyball",
-            "sports_baseball",
-            "sports_golf",
-            "celebration",
-            "cake",
-            "card_giftcard",
-            "redeem",
-            "theaters",
-            "attractions",
-            "forest",
-            "terrain",
-            "ac_unit",
-            "water_drop",
-            "grass",
-            "eco",
-            "recycling",
-            "compost",
-            "pets",
-            "leaf",
-        ]
-
-        prompt = f"""
-        Given the item \"{item_name}\" in the category \"{category_name}\", what is the most appropriate Google Material Icon name from the following list?
-        Icon List: {', '.join(icon_list)}
-
-        Return only the icon name and nothing else.
-        For example, for "Milk" in "Dairy", you should return "local_grocery_store".
-        For "Laptop" in "Electronics", you should return "computer".
-        For "Shampoo" in "Personal Care", you should return "spa".
-        """
-
         try:
-            response = await self.model.generate_content_async(prompt)
-            # First try to parse as JSON (legacy behavior)
-            try:
-                data = json.loads(response.text)
-                suggested_icon = (
-                    data.get("icon_name", "shopping_cart").strip().replace(".", "")
-                )
-                logger.info(f"Parsed JSON icon response: {suggested_icon}")
-            except (json.JSONDecodeError, KeyError):
-                # Expected behavior: parse as plain text response
-                suggested_icon = response.text.strip().replace(".", "")
-                logger.info(f"Parsed plain text icon response: {suggested_icon}")
-
-            if suggested_icon in icon_list:
-                await cache_service.set(
-                    cache_key, suggested_icon, expire=3600 * 24 * 180
-                )  # Cache for 6 months
-                return suggested_icon
-            else:
-                # Fallback to a generic icon if the suggested one is not in the list
-                logger.warning(
-                    f"Suggested icon '{suggested_icon}' not in the predefined list. Falling back to default."
-                )
-                await cache_service.set(
-                    cache_key, "shopping_cart", expire=3600 * 24 * 180
-                )  # Cache for 6 months
-                return "shopping_cart"
+            answer = await self._generate_answer(
+                "icon_suggestion",
+                build_icon_prompt(item_name, category_name),
+                IconAnswer,
+            )
         except Exception as e:
             logger.error(f"Error suggesting icon with Gemini: {e}")
             # Re-raise rate limit and quota errors so fallback service can handle them
             if self._is_rate_limit_error(e):
                 raise e
-            return "shopping_cart"
+            return DEFAULT_ICON
+
+        if answer is None:
+            return DEFAULT_ICON
+        await cache_service.set(
+            cache_key, answer.icon_name, expire=ENRICHMENT_CACHE_EXPIRE
+        )
+        return answer.icon_name
 
     async def standardize_and_translate_item_name(
         self, item_name: str
@@ -405,78 +290,18 @@ class GeminiProvider(AIProvider):
         Returns:
             Dict[str, Any]: A dictionary containing the standardized name and translations.
         """
-        cache_key = f"standardized_name:{item_name.lower().strip()}"
+        cache_key = standardization_cache_key(item_name)
         cached_data = await cache_service.get(cache_key)
         if cached_data:
             logger.info(f"Cache hit for item standardization: {item_name}")
             return json.loads(cached_data)
 
-        prompt = f"""
-        Standardize the following shopping item name and provide translations in Spanish, French, and German.
-        The original name might be a colloquialism, have typos, or be in a different language (including Czech, Slovak, Polish, or other languages).
-        The standardized name should be the most common, generic English term for the item.
-        
-        Return the output as a JSON object with the following keys: "standardized_name", "translations".
-        The "translations" value should be another JSON object with keys "es", "fr", "de".
-
-        Examples:
-        For "tommy toes":
-        {{
-            "standardized_name": "Tomatoes",
-            "translations": {{
-                "es": "Tomates",
-                "fr": "Tomates", 
-                "de": "Tomaten"
-            }}
-        }}
-
-        For "mléko" (Czech):
-        {{
-            "standardized_name": "Milk",
-            "translations": {{
-                "es": "Leche",
-                "fr": "Lait",
-                "de": "Milch"
-            }}
-        }}
-
-        For "dozen eggs":
-        {{
-            "standardized_name": "Eggs",
-            "translations": {{
-                "es": "Huevos",
-                "fr": "Oeufs",
-                "de": "Eier"
-            }}
-        }}
-
-        Item name: "{item_name}"
-        """
-
         try:
-            response = await self.model.generate_content_async(prompt)
-            # Clean the response text before parsing
-            cleaned_response_text = response.text.strip()
-            # Find the start and end of the JSON object
-            start_index = cleaned_response_text.find("{")
-            end_index = cleaned_response_text.rfind("}") + 1
-            if start_index != -1 and end_index != 0:
-                json_text = cleaned_response_text[start_index:end_index]
-                data = json.loads(json_text)
-                await cache_service.set(
-                    cache_key, json.dumps(data), expire=3600 * 24 * 180
-                )  # Cache for 6 months
-                return data
-            else:
-                logger.error(
-                    f"Could not find a valid JSON object in the response from Gemini."
-                )
-                return {"standardized_name": item_name, "translations": {}}
-        except json.JSONDecodeError as e:
-            logger.error(
-                f"Error decoding JSON from Gemini: {e}\nResponse text: {response.text}"
+            answer = await self._generate_answer(
+                "standardization_and_translation",
+                build_standardization_prompt(item_name),
+                StandardizationAnswer,
             )
-            return {"standardized_name": item_name, "translations": {}}
         except Exception as e:
             logger.error(
                 f"Error standardizing and translating item name with Gemini: {e}"
@@ -485,3 +310,99 @@ class GeminiProvider(AIProvider):
             if self._is_rate_limit_error(e):
                 raise e
             return {"standardized_name": item_name, "translations": {}}
+
+        if answer is None:
+            return {"standardized_name": item_name, "translations": {}}
+        data = answer.model_dump()
+        await cache_service.set(
+            cache_key, json.dumps(data), expire=ENRICHMENT_CACHE_EXPIRE
+        )
+        return data
+
+    async def enrich_item(
+        self,
+        item_name: str,
+        category_names: List[str],
+        known_fields: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Suggest category, icon, standardized name and translations in one Gemini request.
+
+        Args:
+            item_name (str): The name of the item.
+            category_names (List[str]): List of existing category names.
+            known_fields (Optional[Dict[str, Any]]): Fields already determined
+                without AI, which are not requested again.
+
+        Returns:
+            Dict[str, Any]: A dictionary with the keys "category_name", "icon_name",
+            "standardized_name" and "translations".
+        """
+        enrichment = await get_cached_enrichment(item_name, known_fields)
+        missing_fields = missing_enrichment_fields(enrichment)
+        if not missing_fields:
+            logger.info(f"Cache hit for item enrichment: {item_name}")
+            return with_enrichment_defaults(item_name, enrichment)
+
+        prompt = build_enrichment_prompt(
+            item_name,
+            category_names,
+            missing_fields,
+            category_name=enrichment.get("category_name"),
+        )
+
+        try:
+            answer = await self._generate_answer(
+                "item_enrichment", prompt, enrichment_answer(tuple(missing_fields))
+            )
+            generated = requested_enrichment(answer, missing_fields)
+            await cache_enrichment(
+                item_name, generated, category_name=enrichment.get("category_name")
+            )
+            enrichment.update(generated)
+            logger.info(
+                f"Gemini enrichment for {item_name}: requested {missing_fields}, "
+                f"received {list(generated)}"
+            )
+        except Exception as e:
+            logger.error(f"Error enriching item with Gemini: {e}")
+            # Re-raise rate limit and quota errors so fallback service can handle them
+            if self._is_rate_limit_error(e):
+                raise e
+
+        return with_enrichment_defaults(item_name, enrichment)
+
+    async def enrich_items(
+        self,
+        item_names: List[str],
+        category_names: List[str],
+        known_fields: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Enrich several items using batched Gemini requests.
+
+        Args:
+            item_names (List[str]): The names of the items.
+            category_names (List[str]): List of existing category names.
+            known_fields (Optional[List[Dict[str, Any]]]): Fields already
+                determined without AI, per item.
+
+        Returns:
+            List[Dict[str, Any]]: One enrichment dictionary per item, in input order.
+        """
+
+        async def generate_answer(
+            prompt: str, answer_type: Type[AnswerType]
+        ) -> Optional[AnswerType]:
+            return await self._generate_answer(
+                "batch_item_enrichment", prompt, answer_type
+            )
+
+        # Rate limit and quota errors are re-raised so fallback service can handle them
+        return await enrich_items_in_batches(
+            item_names,
+            category_names,
+            generate_answer,
+            should_raise=self._is_rate_limit_error,
+            known_fields=known_fields,
+        )
@@ -0,0 +1,96 @@
+"""
+Hedging policy for AI requests.
+
+A hedged request goes to the primary provider first and, if it has not
+answered after a delay, to the fallback provider as well; the first answer
+wins. The delay is a percentile (AI_HEDGE_PERCENTILE) of the recent primary
+latencies of the same operation, so only the slowest requests are hedged
+and the extra provider calls stay at roughly 100 - percentile per cent.
+"""
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict
+
+from app.core.config import settings
+
+
+class OperationStats:
+    """Recent primary latencies and hedging counters of one operation."""
+
+    def __init__(self):
+        self.latencies: Deque[float] = deque(maxlen=settings.AI_HEDGE_WINDOW)
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+
+class HedgingPolicy:
+    """Decides when to hedge and tracks how hedging works out per operation."""
+
+    def __init__(self):
+        self._operations: Dict[str, OperationStats] = {}
+
+    def _stats(self, operation: str) -> OperationStats:
+        if operation not in self._operations:
+            self._operations[operation] = OperationStats()
+        return self._operations[operation]
+
+    def delay(self, operation: str) -> float:
+        """
+        Seconds to wait for the primary provider before hedging.
+
+        Args:
+            operation (str): Name of the operation, e.g. "icon suggestion".
+
+        Returns:
+            float: The configured percentile of recent latencies, clamped to
+            AI_HEDGE_MIN_DELAY..AI_HEDGE_MAX_DELAY; the maximum until
+            AI_HEDGE_MIN_SAMPLES latencies were recorded.
+        """
+        latencies = self._stats(operation).latencies
+        if len(latencies) < settings.AI_HEDGE_MIN_SAMPLES:
+            return settings.AI_HEDGE_MAX_DELAY
+        ordered = sorted(latencies)
+        index = math.ceil(settings.AI_HEDGE_PERCENTILE / 100 * len(ordered)) - 1
+        percentile = ordered[min(max(index, 0), len(ordered) - 1)]
+        return min(
+            max(percentile, settings.AI_HEDGE_MIN_DELAY), settings.AI_HEDGE_MAX_DELAY
+        )
+
+    def record_latency(self, operation: str, seconds: float):
+        """Record how long the primary provider took (or had taken when cancelled)."""
+        self._stats(operation).latencies.append(seconds)
+
+    def record_request(self, operation: str, hedged: bool, hedge_won: bool = False):
+        """
+        Count a request that was decided.
+
+        Args:
+            operation (str): Name of the operation.
+            hedged (bool): Whether the fallback provider was asked as well.
+            hedge_won (bool): Whether the fallback provider answered first.
+        """
+        stats = self._stats(operation)
+        stats.requests += 1
+        if hedged:
+            stats.hedged += 1
+        if hedge_won:
+            stats.hedge_wins += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            operation: {
+                "requests": stats.requests,
+                "hedged": stats.hedged,
+                "hedge_wins": stats.hedge_wins,
+                "hedge_rate": (
+                    round(stats.hedged / stats.requests, 4) if stats.requests else 0.0
+                ),
+                "win_rate": (
+                    round(stats.hedge_wins / stats.hedged, 4) if stats.hedged else 0.0
+                ),
+                "delay": round(self.delay(operation), 3),
+            }
+            for operation, stats in self._operations.items()
+        }
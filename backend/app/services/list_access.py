@@ -0,0 +1,123 @@
+"""
+Shopping List Membership Cache for FamilyCart
+
+This module answers "may this user access this list?" from a short-lived
+cache of member ids per list. A miss costs a single query for the owner and
+all shared members, so a burst of reconnecting WebSocket clients after a
+deploy hits the database at most once per list. Entries are dropped whenever
+a list is shared, unshared or deleted.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Set
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache_service
+from app.core.config import settings
+from app.models.shopping_list import ShoppingList, user_shopping_list
+
+logger = logging.getLogger(__name__)
+
+LIST_MEMBERS_KEY_PREFIX = "list_members:"
+
+
+class ListMembershipCache:
+    """Cache of owner and shared member ids per shopping list."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(list_id: int) -> str:
+        return f"{LIST_MEMBERS_KEY_PREFIX}{list_id}"
+
+    async def get_member_ids(self, list_id: int, session: AsyncSession) -> Set[str]:
+        """
+        Get the ids of the owner and all members of a list.
+
+        Args:
+            list_id (int): The shopping list id.
+            session (AsyncSession): Database session used on a cache miss.
+
+        Returns:
+            Set[str]: Member user ids; empty if the list does not exist.
+        """
+        key = self.cache_key(list_id)
+        cached = await cache_service.get(key)
+        if cached is not None:
+            self.hits += 1
+            return set(json.loads(cached))
+
+        self.misses += 1
+        # Owner and shared members in one round-trip
+        result = await session.execute(
+            select(ShoppingList.owner_id, user_shopping_list.c.user_id)
+            .outerjoin(
+                user_shopping_list,
+                user_shopping_list.c.shopping_list_id == ShoppingList.id,
+            )
+            .where(ShoppingList.id == list_id)
+        )
+        member_ids: Set[str] = set()
+        for owner_id, member_id in result.all():
+            member_ids.add(str(owner_id))
+            if member_id is not None:
+                member_ids.add(str(member_id))
+
+        await cache_service.set(
+            key, json.dumps(sorted(member_ids)), expire=settings.LIST_MEMBERS_CACHE_TTL
+        )
+        return member_ids
+
+    async def can_access(
+        self, user_id: UUID | str, list_id: int, session: AsyncSession
+    ) -> bool:
+        """Check whether a user owns the list or it is shared with them."""
+        return str(user_id) in await self.get_member_ids(list_id, session)
+
+    async def authorize(
+        self,
+        list_id: int,
+        user_id: UUID | str,
+        session: AsyncSession,
+        detail: str = "Not authorized to access this list",
+    ):
+        """
+        Ensure a user may access a list, without loading the list itself.
+
+        Args:
+            list_id (int): The shopping list id.
+            user_id (UUID | str): The requesting user.
+            session (AsyncSession): Database session used on a cache miss.
+            detail (str): Message of the 403 error.
+
+        Raises:
+            HTTPException: 404 if the list does not exist, 403 if the user
+                is neither its owner nor a member.
+        """
+        member_ids = await self.get_member_ids(list_id, session)
+        if not member_ids:
+            raise HTTPException(status_code=404, detail="Shopping list not found")
+        if str(user_id) not in member_ids:
+            raise HTTPException(status_code=403, detail=detail)
+
+    async def invalidate(self, list_id: int):
+        """Drop the cached members after sharing changes or deletion."""
+        await cache_service.delete(self.cache_key(list_id))
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+list_membership_cache = ListMembershipCache()
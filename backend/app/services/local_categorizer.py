@@ -0,0 +1,377 @@
+"""
+Local Item Categorizer for FamilyCart
+
+This module provides a deterministic, in-memory categorizer that answers
+category suggestions before any AI provider is called. It is seeded from the
+category names and translations and from the categories of previously added
+items, and only escalates to the LLM when its confidence is too low.
+
+Items are loaded incrementally by updated_at, so items categorized after
+they were added (by background enrichment or by a user) are learned too. An
+item whose category changes replaces what was learned from it before, and a
+renamed category moves everything learned under its old name to the new one.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.item import Item
+from app.services.ai_enrichment import DEFAULT_CATEGORY
+
+logger = logging.getLogger(__name__)
+
+# Rows are re-read this far behind the cursor, as updated_at is set when an
+# update runs and the transaction may commit after a later one
+CURSOR_OVERLAP = timedelta(seconds=60)
+
+# Name, standardized name and category name learned from an item
+LearnedItem = Tuple[str, Optional[str], str]
+
+# Name and translations learned from a category
+LearnedCategory = Tuple[str, Tuple[str, ...]]
+
+
+def normalize_phrase(text: str) -> str:
+    """Lowercase, strip accents and collapse everything but letters and digits."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", without_accents))
+
+
+def phrase_tokens(phrase: str) -> List[str]:
+    """Split a normalized phrase into tokens worth indexing."""
+    return [token for token in phrase.split() if len(token) > 1]
+
+
+def phrase_trigrams(phrase: str) -> Set[str]:
+    """Character trigrams of a normalized phrase, padded at the word edges."""
+    padded = f"  {phrase} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class LocalCategorizer:
+    """
+    In-memory item categorizer based on exact phrases, tokens and trigrams.
+
+    Lookups are pure dictionary operations, so a confident answer costs
+    microseconds and no API calls.
+    """
+
+    def __init__(self):
+        self._phrases: Dict[str, Counter] = {}
+        self._tokens: Dict[str, Counter] = defaultdict(Counter)
+        self._trigram_index: Dict[str, Set[str]] = defaultdict(set)
+        self._categories: Dict[int, LearnedCategory] = {}
+        self._learned: Dict[int, LearnedItem] = {}
+        self._cursor: Optional[datetime] = None
+        self._last_refresh: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+
+    def add_example(self, text: str, category_name: str, weight: int = 1):
+        """Teach the categorizer that an item name belongs to a category."""
+        phrase = normalize_phrase(text)
+        if not phrase or category_name == DEFAULT_CATEGORY:
+            return
+
+        if phrase not in self._phrases:
+            self._phrases[phrase] = Counter()
+            for trigram in phrase_trigrams(phrase):
+                self._trigram_index[trigram].add(phrase)
+        self._phrases[phrase][category_name] += weight
+
+        for token in phrase_tokens(phrase):
+            self._tokens[token][category_name] += weight
+
+    def remove_example(self, text: str, category_name: str, weight: int = 1):
+        """Undo add_example, e.g. after the item was moved to another category."""
+        phrase = normalize_phrase(text)
+        votes = self._phrases.get(phrase)
+        if not votes or category_name not in votes:
+            return
+
+        votes[category_name] -= weight
+        if votes[category_name] <= 0:
+            del votes[category_name]
+        if not votes:
+            del self._phrases[phrase]
+            for trigram in phrase_trigrams(phrase):
+                self._trigram_index[trigram].discard(phrase)
+
+        for token in phrase_tokens(phrase):
+            token_votes = self._tokens.get(token)
+            if token_votes is None:
+                continue
+            token_votes[category_name] -= weight
+            if token_votes[category_name] <= 0:
+                del token_votes[category_name]
+            if not token_votes:
+                del self._tokens[token]
+
+    def _learn_item(self, item_id: int, learned: Optional[LearnedItem]) -> bool:
+        """Replace what was learned from an item; returns whether it changed."""
+        previous = self._learned.get(item_id)
+        if previous == learned:
+            return False
+        if previous:
+            name, standardized_name, category_name = previous
+            self.remove_example(name, category_name)
+            if standardized_name:
+                self.remove_example(standardized_name, category_name)
+        if learned:
+            name, standardized_name, category_name = learned
+            self.add_example(name, category_name)
+            if standardized_name:
+                self.add_example(standardized_name, category_name)
+            self._learned[item_id] = learned
+        else:
+            self._learned.pop(item_id, None)
+        return True
+
+    def _learn_category(
+        self, category_id: int, learned: Optional[LearnedCategory]
+    ) -> bool:
+        """Replace what was learned from a category; returns whether it changed."""
+        previous = self._categories.get(category_id)
+        if previous == learned:
+            return False
+        if previous:
+            name, translations = previous
+            for text in (name, *translations):
+                self.remove_example(text, name)
+        if learned:
+            name, translations = learned
+            for text in (name, *translations):
+                self.add_example(text, name)
+            self._categories[category_id] = learned
+        else:
+            self._categories.pop(category_id, None)
+
+        new_name = learned[0] if learned else None
+        if previous and previous[0] != new_name:
+            # Items learned under the old name now belong to the new one
+            for item_id, (name, standardized_name, category_name) in list(
+                self._learned.items()
+            ):
+                if category_name == previous[0]:
+                    self._learn_item(
+                        item_id,
+                        (name, standardized_name, new_name) if new_name else None,
+                    )
+        return True
+
+    def _match_phrase(self, phrase: str) -> Tuple[Optional[str], float]:
+        votes = self._phrases.get(phrase)
+        if not votes:
+            return None, 0.0
+        category_name, count = votes.most_common(1)[0]
+        return category_name, count / sum(votes.values())
+
+    def _match_tokens(self, phrase: str) -> Tuple[Optional[str], float]:
+        tokens = phrase_tokens(phrase)
+        if not tokens:
+            return None, 0.0
+
+        scores: Counter = Counter()
+        for token in tokens:
+            votes = self._tokens.get(token)
+            if not votes:
+                continue
+            total = sum(votes.values())
+            for category_name, count in votes.items():
+                scores[category_name] += count / total
+
+        if not scores:
+            return None, 0.0
+        # Unknown tokens count against the match, e.g. "milk chocolate"
+        category_name, score = scores.most_common(1)[0]
+        return category_name, score / len(tokens)
+
+    def _match_trigrams(self, phrase: str) -> Tuple[Optional[str], float]:
+        trigrams = phrase_trigrams(phrase)
+        overlaps: Counter = Counter()
+        for trigram in trigrams:
+            for candidate in self._trigram_index.get(trigram, ()):
+                overlaps[candidate] += 1
+
+        best: Tuple[Optional[str], float] = (None, 0.0)
+        for candidate, overlap in overlaps.most_common(20):
+            similarity = 2 * overlap / (len(trigrams) + len(phrase_trigrams(candidate)))
+            category_name, share = self._match_phrase(candidate)
+            if similarity * share > best[1]:
+                best = (category_name, similarity * share)
+        return best
+
+    def classify(self, item_name: str) -> Tuple[Optional[str], float]:
+        """
+        Find the most likely category for an item.
+
+        Args:
+            item_name (str): The name of the item.
+
+        Returns:
+            Tuple[Optional[str], float]: The category name (or None) and a
+            confidence between 0 and 1.
+        """
+        phrase = normalize_phrase(item_name)
+        if not phrase:
+            return None, 0.0
+
+        category_name, confidence = self._match_phrase(phrase)
+        if category_name:
+            return category_name, confidence
+
+        return max(
+            self._match_tokens(phrase),
+            self._match_trigrams(phrase),
+            key=lambda match: match[1],
+        )
+
+    def suggest_category(
+        self, item_name: str, category_names: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """
+        Suggest a category if the local match is confident enough.
+
+        Args:
+            item_name (str): The name of the item.
+            category_names (Optional[List[str]]): Existing category names; a
+                suggestion outside this list is treated as a miss.
+
+        Returns:
+            Optional[str]: The category name, or None if the LLM should decide.
+        """
+        if not settings.LOCAL_CATEGORIZER_ENABLED:
+            return None
+
+        category_name, confidence = self.classify(item_name)
+        if (
+            category_name
+            and confidence >= settings.LOCAL_CATEGORIZER_THRESHOLD
+            and (category_names is None or category_name in category_names)
+        ):
+            self.hits += 1
+            logger.debug(
+                f"Local categorizer: {item_name} -> {category_name} ({confidence:.2f})"
+            )
+            return category_name
+
+        self.misses += 1
+        return None
+
+    async def refresh(self, session: AsyncSession):
+        """
+        Load changed categories and items added or changed since the last refresh.
+
+        Args:
+            session (AsyncSession): The async database session.
+        """
+        result = await session.execute(
+            select(Category.id, Category.name, Category.translations)
+        )
+        category_ids = set()
+        for category_id, name, translations in result.all():
+            category_ids.add(category_id)
+            translated_names = tuple(
+                translation
+                for translation in (translations or {}).values()
+                if isinstance(translation, str)
+            )
+            self._learn_category(category_id, (name, translated_names))
+        for category_id in set(self._categories) - category_ids:
+            self._learn_category(category_id, None)
+
+        query = select(
+            Item.id,
+            Item.name,
+            Item.standardized_name,
+            Item.category_id,
+            Item.updated_at,
+        )
+        if self._cursor is None:
+            query = query.where(Item.category_id.is_not(None))
+        else:
+            query = query.where(Item.updated_at >= self._cursor - CURSOR_OVERLAP)
+        result = await session.execute(query)
+
+        changed_items = 0
+        for item_id, name, standardized_name, category_id, updated_at in result.all():
+            category = self._categories.get(category_id)
+            learned = (name, standardized_name, category[0]) if category else None
+            if self._learn_item(item_id, learned):
+                changed_items += 1
+            if updated_at and (self._cursor is None or updated_at > self._cursor):
+                self._cursor = updated_at
+        if self._cursor is None:
+            # Start the next refresh from now if there was nothing to load
+            self._cursor = datetime.now(timezone.utc)
+
+        self._last_refresh = time.time()
+        if changed_items:
+            logger.info(
+                f"Local categorizer learned {changed_items} items, "
+                f"{len(self._phrases)} phrases known"
+            )
+
+    async def _refresh_periodically(self):
+        from app.db.session import AsyncSessionLocal
+
+        while True:
+            await asyncio.sleep(settings.LOCAL_CATEGORIZER_REFRESH_INTERVAL)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self.refresh(session)
+            except Exception as e:
+                logger.warning(f"Local categorizer refresh failed: {e}")
+
+    async def start(self):
+        """Load the categorizer and keep refreshing it in the background."""
+        if not settings.LOCAL_CATEGORIZER_ENABLED:
+            return
+        from app.db.session import AsyncSessionLocal
+
+        try:
+            async with AsyncSessionLocal() as session:
+                await self.refresh(session)
+        except Exception as e:
+            logger.error(f"Failed to load local categorizer: {e}")
+        self._refresh_task = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.LOCAL_CATEGORIZER_ENABLED,
+            "phrases": len(self._phrases),
+            "tokens": len(self._tokens),
+            "categories": len(self._categories),
+            "items": len(self._learned),
+            "cursor": self._cursor.isoformat() if self._cursor else None,
+            "last_refresh": self._last_refresh,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+local_categorizer = LocalCategorizer()
@@ -0,0 +1,359 @@
+"""
+Concurrency limiting and circuit breaking for AI provider calls.
+
+Every provider gets a ProviderGuard made of two parts:
+
+* An AIMD concurrency limiter. The limit grows by one per window of
+  successful calls and halves when a call is rate limited, times out or is
+  slower than AI_CONCURRENCY_LATENCY_TARGET. Calls beyond the limit wait
+  briefly for a slot and are otherwise rejected, so a struggling provider
+  sees fewer requests instead of a growing queue.
+* A circuit breaker. It opens on a rate-limit error or after
+  AI_BREAKER_FAILURE_THRESHOLD consecutive failures, rejects calls while
+  open, and then lets a single probe call through (half-open). A successful
+  probe closes it; a failed one reopens it for twice as long.
+
+The breaker state is mirrored to Redis, so all workers stop calling a
+provider once any of them sees it fail, and only one of them probes it.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from contextlib import suppress
+from typing import Any, Awaitable, Callable, Deque, Dict
+
+from redis.exceptions import RedisError
+
+from app.core.cache import cache_service
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BREAKER_KEY_PREFIX = "ai_breaker:"
+PROBE_KEY_PREFIX = "ai_breaker_probe:"
+
+# Multiplicative decrease of the concurrency limit on overload
+DECREASE_FACTOR = 0.5
+
+
+class ProviderUnavailableError(Exception):
+    """Raised instead of calling a provider whose breaker is open or limit reached."""
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limits concurrent calls with additive increase, multiplicative decrease."""
+
+    def __init__(self):
+        self.limit = float(settings.AI_CONCURRENCY_INITIAL)
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Calls started before the last decrease do not decrease it again
+        self._decreased_at = 0.0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return max(1, int(self.limit))
+
+    async def acquire(self) -> bool:
+        """
+        Take a slot, waiting up to AI_CONCURRENCY_MAX_WAIT for one.
+
+        Returns:
+            bool: True if a slot was taken and must be released, False if
+            the limit stayed reached.
+        """
+        if self.in_flight < self.capacity and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot over by completing the waiter
+            await asyncio.wait_for(waiter, settings.AI_CONCURRENCY_MAX_WAIT)
+            return True
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            raise
+        finally:
+            with suppress(ValueError):
+                self._waiters.remove(waiter)
+
+    def release(self, started_at: float, overloaded: bool = False):
+        """
+        Return a slot and adapt the limit to how the call went.
+
+        Args:
+            started_at (float): time.monotonic() when the call started.
+            overloaded (bool): Whether the provider rejected or timed out the call.
+        """
+        now = time.monotonic()
+        if now - started_at > settings.AI_CONCURRENCY_LATENCY_TARGET:
+            overloaded = True
+
+        if overloaded:
+            if started_at >= self._decreased_at:
+                self.limit = max(
+                    float(settings.AI_CONCURRENCY_MIN), self.limit * DECREASE_FACTOR
+                )
+                self._decreased_at = now
+                logger.info(f"AI concurrency limit decreased to {self.capacity}")
+        elif self.in_flight >= self.capacity:
+            # Only grow while the limit is actually what constrains the calls
+            self.limit = min(
+                float(settings.AI_CONCURRENCY_MAX), self.limit + 1 / self.limit
+            )
+        self._release_slot()
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.capacity:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """Closed, open or half-open state of one provider, shared through Redis."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        # Wall-clock time until which the breaker is open; 0 while closed
+        self.open_until = 0.0
+        self.open_seconds = settings.AI_BREAKER_OPEN_SECONDS
+        self._probing = False
+        self._synced_at = 0.0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if time.time() < self.open_until else "half_open"
+
+    @property
+    def _key(self) -> str:
+        return f"{BREAKER_KEY_PREFIX}{self.name}"
+
+    async def allow(self) -> bool:
+        """
+        Whether a call may go to the provider now.
+
+        While half-open only one call, the probe, is allowed across all
+        workers; its outcome must be recorded with record_success or
+        record_failure, or given up with release_probe.
+        """
+        await self._sync()
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing and await self._claim_probe():
+            self._probing = True
+            logger.info(f"Probing AI provider {self.name}")
+            return True
+        self.rejected += 1
+        return False
+
+    async def record_success(self):
+        self.failures = 0
+        if not self.open_until:
+            return
+        logger.info(f"Circuit breaker for AI provider {self.name} closed")
+        self.open_until = 0.0
+        self.open_seconds = settings.AI_BREAKER_OPEN_SECONDS
+        self._probing = False
+        await self._delete_shared_state()
+
+    async def record_failure(self, trip: bool = False):
+        """
+        Count a failed call.
+
+        Args:
+            trip (bool): Open the breaker right away, e.g. on a rate-limit error.
+        """
+        self.failures += 1
+        if self._probing:
+            self.open_seconds = min(
+                self.open_seconds * 2, settings.AI_BREAKER_MAX_OPEN_SECONDS
+            )
+        elif self.state == "open":
+            # Another call already opened it
+            return
+        elif not trip and self.failures < settings.AI_BREAKER_FAILURE_THRESHOLD:
+            return
+
+        self.open_until = time.time() + self.open_seconds
+        self.failures = 0
+        logger.warning(
+            f"Circuit breaker for AI provider {self.name} opened "
+            f"for {self.open_seconds:.0f}s"
+        )
+        await self.release_probe()
+        await self._write_shared_state()
+
+    async def release_probe(self):
+        """Let another call probe, e.g. when the probe was never sent."""
+        if not self._probing:
+            return
+        self._probing = False
+        redis_client = cache_service.redis_client
+        if redis_client:
+            try:
+                await redis_client.delete(f"{PROBE_KEY_PREFIX}{self.name}")
+            except RedisError as e:
+                logger.warning(f"Failed to release probe of {self.name}: {e}")
+
+    async def _claim_probe(self) -> bool:
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return True
+        try:
+            # Expires in case the worker dies while probing
+            return bool(
+                await redis_client.set(
+                    f"{PROBE_KEY_PREFIX}{self.name}",
+                    uuid.uuid4().hex,
+                    nx=True,
+                    px=int(settings.AI_BREAKER_OPEN_SECONDS * 1000),
+                )
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to claim probe of {self.name}: {e}")
+            return True
+
+    async def _sync(self):
+        """Adopt the state written by other workers, at most once per interval."""
+        redis_client = cache_service.redis_client
+        now = time.monotonic()
+        if (
+            not redis_client
+            or self._probing
+            or now - self._synced_at < settings.AI_BREAKER_SYNC_INTERVAL
+        ):
+            return
+        self._synced_at = now
+        try:
+            shared = await redis_client.get(self._key)
+        except RedisError as e:
+            logger.warning(f"Failed to read breaker state of {self.name}: {e}")
+            return
+
+        if shared is None:
+            self.open_until = 0.0
+            self.open_seconds = settings.AI_BREAKER_OPEN_SECONDS
+        else:
+            state = json.loads(shared)
+            self.open_until = state["open_until"]
+            self.open_seconds = state["open_seconds"]
+
+    async def _write_shared_state(self):
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return
+        state = json.dumps(
+            {"open_until": self.open_until, "open_seconds": self.open_seconds}
+        )
+        try:
+            # Kept past open_until so that the doubled wait is remembered
+            await redis_client.set(
+                self._key,
+                state,
+                ex=int(self.open_seconds + settings.AI_BREAKER_MAX_OPEN_SECONDS),
+            )
+        except RedisError as e:
+            logger.warning(f"Failed to share breaker state of {self.name}: {e}")
+
+    async def _delete_shared_state(self):
+        redis_client = cache_service.redis_client
+        if not redis_client:
+            return
+        try:
+            await redis_client.delete(self._key)
+        except RedisError as e:
+            logger.warning(f"Failed to share breaker state of {self.name}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "open_seconds": self.open_seconds,
+            "rejected": self.rejected,
+        }
+
+
+class ProviderGuard:
+    """Concurrency limiter and circuit breaker of one AI provider."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.limiter = AdaptiveConcurrencyLimiter()
+        self.breaker = CircuitBreaker(name)
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        is_overload: Callable[[Exception], bool],
+    ) -> Any:
+        """
+        Call the provider unless its breaker is open or its limit is reached.
+
+        Args:
+            func (Callable): Makes the provider call.
+            is_overload (Callable): Tells whether an error means the provider
+                is overloaded (e.g. rate limited), which opens the breaker at once.
+
+        Returns:
+            Any: The result of func.
+
+        Raises:
+            ProviderUnavailableError: If the provider was not called.
+        """
+        if not await self.breaker.allow():
+            raise ProviderUnavailableError(f"Circuit breaker for {self.name} is open")
+        if not await self.limiter.acquire():
+            await self.breaker.release_probe()
+            raise ProviderUnavailableError(
+                f"{self.name} is at its concurrency limit of {self.limiter.capacity}"
+            )
+
+        started_at = time.monotonic()
+        overloaded = False
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            await self.breaker.release_probe()
+            raise
+        except Exception as e:
+            overloaded = is_overload(e) or isinstance(e, asyncio.TimeoutError)
+            await self.breaker.record_failure(trip=overloaded)
+            raise
+        finally:
+            self.limiter.release(started_at, overloaded)
+
+        await self.breaker.record_success()
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.limiter.get_stats(),
+            "circuit_breaker": self.breaker.get_stats(),
+        }
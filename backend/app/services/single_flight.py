@@ -0,0 +1,146 @@
+"""
+Single-flight coalescing of identical concurrent AI lookups.
+
+When several requests ask for the same uncached suggestion at once (the
+same item pasted on three devices, or a popular item right after its cache
+entry expired), only the first one calls the AI provider. The others wait
+for its result, so the provider is called and the cache written once.
+
+Within a process the callers share one task. Across workers an optional
+Redis lock (AI_SINGLE_FLIGHT_REDIS_LOCK) elects one leader per key; the
+other workers poll the cache entry the leader is about to write and only
+call the provider themselves if it does not appear.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from redis.exceptions import RedisError
+
+from app.core.cache import cache_service
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY_PREFIX = "single_flight:"
+
+# Deletes the lock only if this worker still holds it
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.remote_waits = 0
+        self.remote_hits = 0
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        read_cached: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Call func once for all concurrent callers using the same key.
+
+        The call runs in its own task, so a caller that is cancelled (e.g.
+        its client disconnected) does not cancel it for the others.
+
+        Args:
+            key (str): Identifies identical calls, e.g. the cache key of the result.
+            func (Callable): Produces the result, typically by calling a provider.
+            read_cached (Optional[Callable]): Reads the result from the cache,
+                returning None while it is missing. Enables the cross-worker
+                lock for this key.
+
+        Returns:
+            Any: The result of func, shared by all callers (exceptions too).
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(self._run(key, func, read_cached))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[Any]],
+        read_cached: Optional[Callable[[], Awaitable[Any]]],
+    ) -> Any:
+        redis_client = cache_service.redis_client
+        if (
+            read_cached is None
+            or not settings.AI_SINGLE_FLIGHT_REDIS_LOCK
+            or not redis_client
+        ):
+            return await func()
+
+        lock_key = f"{LOCK_KEY_PREFIX}{key}"
+        token = uuid.uuid4().hex
+        lock_ttl = settings.AI_SINGLE_FLIGHT_LOCK_TTL
+        try:
+            acquired = await redis_client.set(
+                lock_key, token, nx=True, px=int(lock_ttl * 1000)
+            )
+        except RedisError as e:
+            logger.warning(f"Single-flight lock failed for {key}: {e}")
+            return await func()
+
+        if acquired:
+            try:
+                return await func()
+            finally:
+                try:
+                    await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except RedisError as e:
+                    logger.warning(f"Single-flight unlock failed for {key}: {e}")
+
+        # Another worker is producing the result
+        self.remote_waits += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + lock_ttl
+        try:
+            while loop.time() < deadline:
+                await asyncio.sleep(settings.AI_SINGLE_FLIGHT_POLL_INTERVAL)
+                cached = await read_cached()
+                if cached is not None:
+                    self.remote_hits += 1
+                    return cached
+                if not await redis_client.exists(lock_key):
+                    break
+        except RedisError as e:
+            logger.warning(f"Single-flight wait failed for {key}: {e}")
+        # The leader failed or gave up without caching a result
+        return await func()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "remote_waits": self.remote_waits,
+            "remote_hits": self.remote_hits,
+        }
@@ -0,0 +1,221 @@
+"""
+Structured AI answers.
+
+Category, icon, standardization and enrichment answers are requested in the
+native structured-output mode of each provider (Gemini response_schema,
+Ollama format) using the JSON schema of the answer models below, and
+validated against the same models. Enrichment answers only contain the
+fields that are still missing, so their models are built per field set. An
+invalid answer is requested once more; if it is still invalid the caller
+uses its default value without caching it, so the next request for the item
+asks the model again.
+"""
+
+import logging
+from functools import lru_cache
+from typing import (
+    Annotated,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from pydantic import (
+    AfterValidator,
+    BaseModel,
+    BeforeValidator,
+    ValidationError,
+    create_model,
+)
+
+from app.services.ai_enrichment import (
+    ENRICHMENT_FIELDS,
+    ICON_NAMES,
+    STANDARDIZED_NAME_FIELD,
+    TRANSLATIONS_FIELD,
+)
+
+logger = logging.getLogger(__name__)
+
+# The first request plus one retry
+STRUCTURED_ATTEMPTS = 2
+
+AnswerType = TypeVar("AnswerType", bound=BaseModel)
+
+
+def _normalize_category(value: str) -> str:
+    value = value.strip().replace(".", "").title()
+    if not value:
+        raise ValueError("category_name is empty")
+    return value
+
+
+def _strip_icon(value: Any) -> Any:
+    return value.strip().replace(".", "") if isinstance(value, str) else value
+
+
+def _require_name(value: str) -> str:
+    value = value.strip()
+    if not value:
+        raise ValueError("standardized_name is empty")
+    return value
+
+
+CategoryName = Annotated[str, AfterValidator(_normalize_category)]
+IconName = Annotated[Literal[tuple(ICON_NAMES)], BeforeValidator(_strip_icon)]
+StandardizedName = Annotated[str, AfterValidator(_require_name)]
+
+
+class CategoryAnswer(BaseModel):
+    category_name: CategoryName
+
+
+class IconAnswer(BaseModel):
+    icon_name: IconName
+
+
+class Translations(BaseModel):
+    es: str
+    fr: str
+    de: str
+
+
+class StandardizationAnswer(BaseModel):
+    standardized_name: StandardizedName
+    translations: Translations
+
+
+class EnrichmentAnswer(BaseModel):
+    """Answer with every enrichment field, see enrichment_answer."""
+
+    category_name: CategoryName
+    icon_name: IconName
+    standardized_name: StandardizedName
+    translations: Translations
+
+
+def _answer_fields(fields: Tuple[str, ...]) -> List[str]:
+    """The answer keys of requested fields; translations travel with the name."""
+    requested = set(fields)
+    if STANDARDIZED_NAME_FIELD in requested:
+        requested.add(TRANSLATIONS_FIELD)
+    return [
+        field
+        for field in (*ENRICHMENT_FIELDS, TRANSLATIONS_FIELD)
+        if field in requested
+    ]
+
+
+@lru_cache(maxsize=None)
+def enrichment_answer(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    EnrichmentAnswer reduced to the requested fields, all of them required.
+
+    Args:
+        fields (Tuple[str, ...]): The missing enrichment fields.
+
+    Returns:
+        Type[BaseModel]: The answer model.
+    """
+    if set(fields) >= set(ENRICHMENT_FIELDS):
+        return EnrichmentAnswer
+    annotations = EnrichmentAnswer.__annotations__
+    return create_model(
+        "EnrichmentAnswer",
+        **{field: (annotations[field], ...) for field in _answer_fields(fields)},
+    )
+
+
+@lru_cache(maxsize=None)
+def batch_enrichment_answer(fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """
+    Answer to a batch enrichment prompt, one entry per item.
+
+    Each item is asked only for its own missing fields, so the fields of an
+    entry are optional; the entry model offers every field missing from any
+    item of the batch.
+
+    Args:
+        fields (Tuple[str, ...]): The fields missing from any item of the batch.
+
+    Returns:
+        Type[BaseModel]: The answer model, with the entries under "items".
+    """
+    annotations = EnrichmentAnswer.__annotations__
+    entry = create_model(
+        "BatchEnrichmentEntry",
+        index=(int, ...),
+        **{field: (annotations[field], None) for field in _answer_fields(fields)},
+    )
+    return create_model("BatchEnrichmentAnswer", items=(List[entry], ...))
+
+
+@lru_cache(maxsize=None)
+def json_schema(answer_type: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    JSON schema of an answer model in the subset both providers accept.
+
+    Nested models are inlined and titles and defaults dropped, as Gemini
+    supports none of them, and string enums are marked with format "enum".
+
+    Args:
+        answer_type (Type[BaseModel]): The answer model.
+
+    Returns:
+        Dict[str, Any]: The schema.
+    """
+    schema = answer_type.model_json_schema()
+    definitions = schema.pop("$defs", {})
+
+    def inline(node: Any) -> Any:
+        if isinstance(node, list):
+            return [inline(value) for value in node]
+        if not isinstance(node, dict):
+            return node
+        if "$ref" in node:
+            return inline(definitions[node["$ref"].rsplit("/", 1)[-1]])
+        inlined = {
+            key: inline(value)
+            for key, value in node.items()
+            if key not in ("title", "default") or isinstance(value, dict)
+        }
+        if "enum" in inlined:
+            inlined["format"] = "enum"
+        return inlined
+
+    return inline(schema)
+
+
+async def generate_structured(
+    generate: Callable[[], Awaitable[str]], answer_type: Type[AnswerType]
+) -> Optional[AnswerType]:
+    """
+    Request a structured answer, retrying once if it does not validate.
+
+    Provider errors are not retried here; they propagate to the caller.
+
+    Args:
+        generate (Callable): Sends the request and returns the response text.
+        answer_type (Type[AnswerType]): The answer model to validate against.
+
+    Returns:
+        Optional[AnswerType]: The validated answer, or None if every attempt
+        returned an invalid one.
+    """
+    for attempt in range(1, STRUCTURED_ATTEMPTS + 1):
+        response_text = await generate()
+        try:
+            return answer_type.model_validate_json(response_text)
+        except ValidationError as e:
+            logger.warning(
+                f"Invalid {answer_type.__name__} (attempt {attempt}/"
+                f"{STRUCTURED_ATTEMPTS}): {e.errors(include_url=False)}"
+            )
+    return None
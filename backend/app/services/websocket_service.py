@@ -6,7 +6,7 @@ This service integrates with API endpoints to send real-time notifications.
 import logging
 from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -59,6 +59,40 @@ class WebSocketService:
             f"Broadcast item creation to list {list_id} (excluding session {session_id})"
         )
 
+    async def notify_items_created(
+        self, list_id: int, items_data: List[Dict[str, Any]], user_id: str
+    ):
+        """Notify list members that several items were created at once"""
+        if not self._connection_manager:
+            return
+
+        session_id = self.get_current_session_id()
+        await self._connection_manager.broadcast_items_created(
+            list_id=list_id,
+            items_data=items_data,
+            user_id=user_id,
+            exclude_session_id=session_id,
+        )
+        logger.info(
+            f"Broadcast creation of {len(items_data)} items to list {list_id} "
+            f"(excluding session {session_id})"
+        )
+
+    async def notify_item_enriched(
+        self, list_id: int, item_data: Dict[str, Any], user_id: str
+    ):
+        """Notify list members that background AI enrichment of an item finished"""
+        if not self._connection_manager:
+            return
+
+        # Runs outside of any request, and the creator needs the update too
+        await self._connection_manager.broadcast_item_enriched(
+            list_id=list_id, item_data=item_data, user_id=user_id
+        )
+        logger.info(
+            f"Broadcast enrichment of item {item_data.get('id')} to list {list_id}"
+        )
+
     async def notify_item_updated(
         self, list_id: int, item_data: Dict[str, Any], user_id: str
     ):
@@ -0,0 +1,400 @@
+"""
+Unit tests for the combined AI item enrichment.
+
+Covers prompt building and the mapping of structured answers, per-field
+caching in the providers, batched enrichment of several items and the fallback behaviour
+of FallbackAIService.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.services.ai_enrichment import (
+    EnrichmentRequest,
+    batch_enrichments,
+    build_batch_enrichment_prompt,
+    build_enrichment_prompt,
+    enrich_items_in_batches,
+    missing_enrichment_fields,
+    requested_enrichment,
+    with_enrichment_defaults,
+)
+from app.services.fallback_ai_service import FallbackAIService
+from app.services.gemini_provider import GeminiProvider
+from app.services.structured_output import (
+    batch_enrichment_answer,
+    enrichment_answer,
+    json_schema,
+)
+
+TRANSLATIONS = {"es": "Leche", "fr": "Lait", "de": "Milch"}
+
+
+def make_cache(values: dict):
+    """Create a mocked cache service backed by a plain dict."""
+    cache = Mock()
+    cache.get = AsyncMock(side_effect=lambda key: values.get(key))
+    cache.mget = AsyncMock(side_effect=lambda keys: [values.get(key) for key in keys])
+    cache.set = AsyncMock()
+    return cache
+
+
+class TestEnrichmentHelpers:
+    """Tests for prompt building and response parsing."""
+
+    def test_prompt_only_requests_missing_fields(self):
+        prompt = build_enrichment_prompt(
+            "mléko", ["Dairy", "Produce"], ["icon_name"], category_name="Dairy"
+        )
+
+        assert '"icon_name"' in prompt
+        assert 'in the category "Dairy"' in prompt
+        assert '"category_name"' not in prompt
+        assert '"standardized_name"' not in prompt
+
+    def test_prompt_lists_existing_categories(self):
+        prompt = build_enrichment_prompt(
+            "apples", ["Dairy", "Produce"], ["category_name", "standardized_name"]
+        )
+
+        assert "Dairy, Produce" in prompt
+        assert '"translations"' in prompt
+
+    def test_answer_is_normalized(self):
+        fields = ["category_name", "icon_name", "standardized_name"]
+        answer = enrichment_answer(tuple(fields)).model_validate(
+            {
+                "category_name": "dairy.",
+                "icon_name": "local_grocery_store",
+                "standardized_name": "Milk ",
+                "translations": TRANSLATIONS,
+            }
+        )
+
+        assert requested_enrichment(answer, fields) == {
+            "category_name": "Dairy",
+            "icon_name": "local_grocery_store",
+            "standardized_name": "Milk",
+            "translations": TRANSLATIONS,
+        }
+
+    def test_answer_only_has_the_requested_fields(self):
+        answer_type = enrichment_answer(("icon_name",))
+
+        assert json_schema(answer_type)["required"] == ["icon_name"]
+        answer = answer_type.model_validate(
+            {"category_name": "Dairy", "icon_name": "spa"}
+        )
+        assert requested_enrichment(answer, ["icon_name"]) == {"icon_name": "spa"}
+        with pytest.raises(ValueError):
+            answer_type.model_validate({"icon_name": "not_an_icon"})
+
+    def test_no_valid_answer(self):
+        assert requested_enrichment(None, ["category_name"]) == {}
+
+    def test_missing_fields_and_defaults(self):
+        enrichment = {"category_name": "Dairy"}
+
+        assert missing_enrichment_fields(enrichment) == [
+            "icon_name",
+            "standardized_name",
+        ]
+        assert with_enrichment_defaults("mleko", enrichment) == {
+            "category_name": "Dairy",
+            "icon_name": "shopping_cart",
+            "standardized_name": "mleko",
+            "translations": {},
+        }
+
+
+class TestBatchEnrichment:
+    """Tests for batched enrichment of several items."""
+
+    def test_batch_prompt_lists_items_with_their_keys(self):
+        prompt = build_batch_enrichment_prompt(
+            [
+                EnrichmentRequest("mléko", ["icon_name"], "Dairy"),
+                EnrichmentRequest("chleba", ["category_name", "standardized_name"]),
+            ],
+            ["Dairy", "Bakery"],
+        )
+
+        assert '"name": "mléko", "keys": ["icon_name"], "category_name": "Dairy"' in (
+            prompt
+        )
+        assert '"keys": ["category_name", "standardized_name", "translations"]' in (
+            prompt
+        )
+        assert "Dairy, Bakery" in prompt
+
+    def test_batch_answer_is_mapped_by_index(self):
+        requests = [
+            EnrichmentRequest("milk", ["category_name"]),
+            EnrichmentRequest("bread", ["category_name", "icon_name"]),
+        ]
+        answer = batch_enrichment_answer(("category_name", "icon_name")).model_validate(
+            {
+                "items": [
+                    {
+                        "index": 1,
+                        "category_name": "bakery",
+                        "icon_name": "bakery_dining",
+                    },
+                    {"index": 0, "category_name": "dairy", "icon_name": "spa"},
+                    {"index": 7, "category_name": "Ignored"},
+                ]
+            }
+        )
+
+        assert batch_enrichments(answer, requests) == [
+            {"category_name": "Dairy"},
+            {"category_name": "Bakery", "icon_name": "bakery_dining"},
+        ]
+
+    def test_batch_entry_fields_are_optional(self):
+        schema = json_schema(batch_enrichment_answer(("category_name",)))
+        entry = schema["properties"]["items"]["items"]
+
+        assert entry["required"] == ["index"]
+        assert "default" not in entry["properties"]["category_name"]
+
+    def test_no_valid_batch_answer(self):
+        requests = [EnrichmentRequest("milk", ["category_name"])]
+
+        assert batch_enrichments(None, requests) == [{}]
+
+    async def test_cache_hits_and_duplicates_are_not_requested(self):
+        cache = make_cache(
+            {
+                "category_suggestion:milk": "Dairy",
+                "icon_suggestion:milk:dairy": "local_grocery_store",
+                "standardized_name:milk": json.dumps(
+                    {"standardized_name": "Milk", "translations": {}}
+                ),
+            }
+        )
+        bread = {"es": "Pan", "fr": "Pain", "de": "Brot"}
+        generate_answer = AsyncMock(
+            side_effect=lambda prompt, answer_type: answer_type.model_validate(
+                {
+                    "items": [
+                        {
+                            "index": 0,
+                            "category_name": "Bakery",
+                            "icon_name": "bakery_dining",
+                            "standardized_name": "Bread",
+                            "translations": bread,
+                        }
+                    ]
+                }
+            )
+        )
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            result = await enrich_items_in_batches(
+                ["Milk", "bread", "Bread "], ["Dairy"], generate_answer
+            )
+
+        generate_answer.assert_called_once()
+        prompt, answer_type = generate_answer.call_args.args
+        assert answer_type is batch_enrichment_answer(
+            ("category_name", "icon_name", "standardized_name")
+        )
+        assert '"name": "bread"' in prompt
+        assert '"name": "Milk"' not in prompt
+        assert [item["category_name"] for item in result] == [
+            "Dairy",
+            "Bakery",
+            "Bakery",
+        ]
+        assert result[2]["translations"] == bread
+        cache.get.assert_not_called()
+
+    async def test_misses_are_chunked_by_batch_size(self):
+        cache = make_cache({})
+        generate_answer = AsyncMock(return_value=None)
+
+        with (
+            patch("app.services.ai_enrichment.cache_service", cache),
+            patch("app.services.ai_enrichment.settings") as mock_settings,
+        ):
+            mock_settings.AI_BATCH_MAX_SIZE = 2
+            result = await enrich_items_in_batches(
+                ["a", "b", "c", "d", "e"], [], generate_answer
+            )
+
+        assert generate_answer.call_count == 3
+        assert [item["category_name"] for item in result] == ["Uncategorized"] * 5
+        cache.set.assert_not_called()
+
+    async def test_rate_limit_error_is_raised(self):
+        cache = make_cache({})
+        generate_answer = AsyncMock(side_effect=Exception("429 Too Many Requests"))
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            with pytest.raises(Exception):
+                await enrich_items_in_batches(
+                    ["milk"], [], generate_answer, should_raise=lambda error: True
+                )
+
+            result = await enrich_items_in_batches(["milk"], [], generate_answer)
+
+        assert result[0]["icon_name"] == "shopping_cart"
+
+
+class TestProviderEnrichment:
+    """Tests for per-field caching in the provider implementation."""
+
+    @pytest.fixture
+    def gemini_provider(self):
+        with (
+            patch("app.services.gemini_provider.settings") as mock_settings,
+            patch("app.services.gemini_provider.genai") as mock_genai,
+        ):
+            mock_settings.GEMINI_API_KEY = "test-key"
+            mock_settings.GEMINI_MODEL_NAME = "gemini-test"
+            mock_model = AsyncMock()
+            mock_genai.GenerativeModel.return_value = mock_model
+            provider = GeminiProvider()
+            yield provider, mock_model
+
+    async def test_full_cache_hit_skips_model(self, gemini_provider):
+        provider, mock_model = gemini_provider
+        cache = make_cache(
+            {
+                "category_suggestion:milk": "Dairy",
+                "icon_suggestion:milk:dairy": "local_grocery_store",
+                "standardized_name:milk": json.dumps(
+                    {"standardized_name": "Milk", "translations": {"de": "Milch"}}
+                ),
+            }
+        )
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            result = await provider.enrich_item("Milk", ["Dairy"])
+
+        mock_model.generate_content_async.assert_not_called()
+        assert result["category_name"] == "Dairy"
+        assert result["icon_name"] == "local_grocery_store"
+        assert result["translations"] == {"de": "Milch"}
+
+    async def test_partial_cache_hit_requests_missing_fields(self, gemini_provider):
+        provider, mock_model = gemini_provider
+        cache = make_cache({"category_suggestion:milk": "Dairy"})
+        mock_response = Mock()
+        mock_response.text = json.dumps(
+            {
+                "icon_name": "local_grocery_store",
+                "standardized_name": "Milk",
+                "translations": TRANSLATIONS,
+            }
+        )
+        mock_model.generate_content_async.return_value = mock_response
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            result = await provider.enrich_item("Milk", ["Dairy"])
+
+        call = mock_model.generate_content_async.call_args
+        assert '"category_name"' not in call.args[0]
+        assert '"icon_name"' in call.args[0]
+        assert call.kwargs["generation_config"]["response_schema"] == json_schema(
+            enrichment_answer(("icon_name", "standardized_name"))
+        )
+        assert result == {
+            "category_name": "Dairy",
+            "icon_name": "local_grocery_store",
+            "standardized_name": "Milk",
+            "translations": TRANSLATIONS,
+        }
+        cached_keys = {call.args[0] for call in cache.set.call_args_list}
+        assert cached_keys == {"icon_suggestion:milk:dairy", "standardized_name:milk"}
+
+    async def test_known_category_is_not_requested(self, gemini_provider):
+        provider, mock_model = gemini_provider
+        cache = make_cache({"icon_suggestion:milk:dairy": "local_grocery_store"})
+        mock_response = Mock()
+        mock_response.text = json.dumps(
+            {"standardized_name": "Milk", "translations": TRANSLATIONS}
+        )
+        mock_model.generate_content_async.return_value = mock_response
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            result = await provider.enrich_item(
+                "Milk", ["Dairy"], known_fields={"category_name": "Dairy"}
+            )
+
+        prompt = mock_model.generate_content_async.call_args.args[0]
+        assert '"category_name"' not in prompt
+        assert '"icon_name"' not in prompt
+        assert result["category_name"] == "Dairy"
+        assert result["icon_name"] == "local_grocery_store"
+
+    async def test_failed_request_is_not_cached(self, gemini_provider):
+        provider, mock_model = gemini_provider
+        cache = make_cache({})
+        mock_model.generate_content_async.side_effect = Exception("network error")
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            result = await provider.enrich_item("Milk", ["Dairy"])
+
+        assert result["category_name"] == "Uncategorized"
+        assert result["icon_name"] == "shopping_cart"
+        cache.set.assert_not_called()
+
+    async def test_rate_limit_error_is_raised(self, gemini_provider):
+        provider, mock_model = gemini_provider
+        cache = make_cache({})
+        mock_model.generate_content_async.side_effect = Exception(
+            "429 Resource exhausted"
+        )
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            with pytest.raises(Exception):
+                await provider.enrich_item("Milk", ["Dairy"])
+
+
+class TestFallbackEnrichment:
+    """Tests for FallbackAIService.enrich_item."""
+
+    async def test_falls_back_to_ollama_on_rate_limit(self):
+        service = FallbackAIService()
+        service._primary_provider = Mock()
+        service._primary_provider.enrich_item = AsyncMock(
+            side_effect=Exception("429 Too Many Requests")
+        )
+        service._fallback_provider = Mock()
+        service._fallback_provider.enrich_item = AsyncMock(
+            return_value={"category_name": "Dairy"}
+        )
+
+        with patch("app.services.fallback_ai_service.cache_service") as mock_cache:
+            mock_cache.set = AsyncMock()
+            result = await service.enrich_item("Milk", ["Dairy"])
+
+        assert result == {"category_name": "Dairy"}
+        service._fallback_provider.enrich_item.assert_called_once_with(
+            "Milk", ["Dairy"], known_fields={}
+        )
+        assert service._rate_limit_detected is True
+
+    async def test_batch_falls_back_to_ollama_on_rate_limit(self):
+        service = FallbackAIService()
+        service._primary_provider = Mock()
+        service._primary_provider.enrich_items = AsyncMock(
+            side_effect=Exception("Quota exceeded")
+        )
+        service._fallback_provider = Mock()
+        service._fallback_provider.enrich_items = AsyncMock(
+            return_value=[{"category_name": "Dairy"}]
+        )
+
+        with patch("app.services.fallback_ai_service.cache_service") as mock_cache:
+            mock_cache.set = AsyncMock()
+            result = await service.enrich_items(["Milk"], ["Dairy"])
+
+        assert result == [{"category_name": "Dairy"}]
+        service._fallback_provider.enrich_items.assert_called_once_with(
+            ["Milk"], ["Dairy"], known_fields=[{}]
+        )
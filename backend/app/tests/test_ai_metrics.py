@@ -0,0 +1,168 @@
+"""
+Tests for the Prometheus metrics of AI requests and cache lookups.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core.cache import CacheService
+from app.services.fallback_ai_service import FallbackAIService
+from app.services.gemini_provider import GeminiProvider
+from app.services.ollama_provider import OllamaProvider
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def gemini():
+    with (
+        patch("app.services.gemini_provider.settings") as mock_settings,
+        patch("app.services.gemini_provider.genai") as mock_genai,
+    ):
+        mock_settings.GEMINI_API_KEY = "test-key"
+        mock_model = AsyncMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        yield GeminiProvider(), mock_model
+
+
+class TestProviderMetrics:
+    """Model calls are counted, timed and sized per provider and operation."""
+
+    async def test_gemini_call_records_latency_and_tokens(self, gemini):
+        provider, model = gemini
+        model.generate_content_async.return_value = SimpleNamespace(
+            text="Generated",
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=120, candidates_token_count=30
+            ),
+        )
+        labels = {"provider": "gemini", "operation": "text_generation"}
+        requests = sample("familycart_ai_requests_total", outcome="success", **labels)
+        prompt_tokens = sample("familycart_ai_prompt_tokens_sum", **labels)
+
+        await provider.generate_text("Hello")
+
+        assert (
+            sample("familycart_ai_requests_total", outcome="success", **labels)
+            == requests + 1
+        )
+        assert (
+            sample("familycart_ai_prompt_tokens_sum", **labels) == prompt_tokens + 120
+        )
+        assert sample(
+            "familycart_ai_response_time_seconds_count", outcome="success", **labels
+        )
+
+    async def test_gemini_rate_limit_is_its_own_outcome(self, gemini):
+        provider, model = gemini
+        model.generate_content_async.side_effect = Exception("429 Too Many Requests")
+        labels = {
+            "provider": "gemini",
+            "operation": "item_enrichment",
+            "outcome": "rate_limited",
+        }
+        before = sample("familycart_ai_requests_total", **labels)
+
+        with patch(
+            "app.services.gemini_provider.get_cached_enrichment", return_value={}
+        ):
+            with pytest.raises(Exception):
+                await provider.enrich_item("Milk", ["Dairy"])
+
+        assert sample("familycart_ai_requests_total", **labels) == before + 1
+
+    async def test_ollama_call_records_eval_counts(self):
+        with patch("app.services.ollama_provider.ollama"):
+            provider = OllamaProvider()
+        provider.client.generate = AsyncMock(
+            return_value={"response": "ok", "prompt_eval_count": 40, "eval_count": 5}
+        )
+        labels = {"provider": "ollama", "operation": "text_generation"}
+        before = sample("familycart_ai_response_tokens_sum", **labels)
+
+        assert await provider.generate_text("Hello") == "ok"
+
+        assert sample("familycart_ai_response_tokens_sum", **labels) == before + 5
+
+
+class TestOperationMetrics:
+    """FallbackAIService records who served an operation and why it fell back."""
+
+    async def test_fallback_is_counted_and_attributed(self):
+        service = FallbackAIService()
+        service._primary_provider = Mock(provider_name="gemini")
+        service._primary_provider.generate_text = AsyncMock(
+            side_effect=Exception("Connection reset")
+        )
+        service._fallback_provider = Mock(provider_name="ollama")
+        service._fallback_provider.generate_text = AsyncMock(return_value="ok")
+        fallbacks = sample(
+            "familycart_ai_fallbacks_total", operation="text_generation", reason="error"
+        )
+        served = sample(
+            "familycart_ai_operation_seconds_count",
+            operation="text_generation",
+            served_by="fallback",
+        )
+
+        assert await service.generate_text("hi") == "ok"
+
+        assert (
+            sample(
+                "familycart_ai_fallbacks_total",
+                operation="text_generation",
+                reason="error",
+            )
+            == fallbacks + 1
+        )
+        assert (
+            sample(
+                "familycart_ai_operation_seconds_count",
+                operation="text_generation",
+                served_by="fallback",
+            )
+            == served + 1
+        )
+
+
+class TestCacheMetrics:
+    """Cache lookups are counted per key family."""
+
+    async def test_lookups_by_family_and_result(self):
+        cache = CacheService()
+        cache.redis_client = Mock()
+        cache.redis_client.get = AsyncMock(return_value=None)
+        cache.redis_client.mget = AsyncMock(return_value=["Dairy", None])
+        before = {
+            result: sample(
+                "familycart_cache_lookups_total",
+                family="category_suggestion",
+                result=result,
+            )
+            for result in ("redis_hit", "miss")
+        }
+
+        await cache.get("category_suggestion:milk")
+        await cache.mget(["category_suggestion:cheese", "category_suggestion:soap"])
+
+        assert (
+            sample(
+                "familycart_cache_lookups_total",
+                family="category_suggestion",
+                result="redis_hit",
+            )
+            == before["redis_hit"] + 1
+        )
+        assert (
+            sample(
+                "familycart_cache_lookups_total",
+                family="category_suggestion",
+                result="miss",
+            )
+            == before["miss"] + 2
+        )
@@ -0,0 +1,160 @@
+"""
+Unit tests for the two-tier cache service.
+
+Covers the in-process LRU (size, TTL and counters), read-through and
+write-through behaviour in front of Redis, pub/sub invalidation between
+workers and tolerance of Redis errors.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.cache import CacheService, LocalLRUCache
+
+
+class TestLocalLRUCache:
+    """Tests for the bounded in-process cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LocalLRUCache(max_size=2, ttl=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert cache.evictions == 1
+
+    def test_expired_entries_are_misses(self):
+        cache = LocalLRUCache(max_size=10, ttl=60)
+        with patch("app.core.cache.time.monotonic", return_value=1000.0):
+            cache.set("a", "1", expire=5)
+        with patch("app.core.cache.time.monotonic", return_value=1006.0):
+            assert cache.get("a") is None
+
+        stats = cache.get_stats()
+        assert stats["size"] == 0
+        assert stats["misses"] == 1
+
+    def test_stats_count_hits_and_misses(self):
+        cache = LocalLRUCache(max_size=10, ttl=60)
+        cache.set("a", "1")
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+
+@pytest.fixture
+def cache_service():
+    """A cache service with the L1 enabled and a mocked Redis client."""
+    with patch("app.core.cache.settings") as mock_settings:
+        mock_settings.CACHE_L1_ENABLED = True
+        mock_settings.CACHE_L1_MAX_SIZE = 100
+        mock_settings.CACHE_L1_TTL = 60
+        mock_settings.CACHE_L1_KEY_PREFIXES = ["category_suggestion:"]
+        mock_settings.CACHE_INVALIDATION_CHANNEL = "cache:invalidate"
+        service = CacheService()
+        service.redis_client = Mock()
+        service.redis_client.get = AsyncMock(return_value="Dairy")
+        service.redis_client.mget = AsyncMock()
+        service.redis_client.set = AsyncMock()
+        service.redis_client.delete = AsyncMock()
+        service.redis_client.publish = AsyncMock()
+        yield service
+
+
+class TestCacheService:
+    """Tests for CacheService with the L1 in front of Redis."""
+
+    async def test_repeated_get_is_served_locally(self, cache_service):
+        assert await cache_service.get("category_suggestion:milk") == "Dairy"
+        assert await cache_service.get("category_suggestion:milk") == "Dairy"
+
+        cache_service.redis_client.get.assert_called_once()
+        assert cache_service.local_cache.hits == 1
+
+    async def test_other_prefixes_always_go_to_redis(self, cache_service):
+        await cache_service.get("session:abc")
+        await cache_service.get("session:abc")
+
+        assert cache_service.redis_client.get.call_count == 2
+
+    async def test_mget_only_fetches_local_misses(self, cache_service):
+        cache_service.local_cache.set("category_suggestion:milk", "Dairy")
+        cache_service.redis_client.mget.return_value = ["Bakery", None]
+
+        values = await cache_service.mget(
+            [
+                "category_suggestion:milk",
+                "category_suggestion:bread",
+                "category_suggestion:xyz",
+            ]
+        )
+
+        assert values == ["Dairy", "Bakery", None]
+        cache_service.redis_client.mget.assert_called_once_with(
+            ["category_suggestion:bread", "category_suggestion:xyz"]
+        )
+
+    async def test_set_publishes_invalidation(self, cache_service):
+        await cache_service.set("category_suggestion:milk", "Dairy", expire=10)
+
+        cache_service.redis_client.set.assert_called_once_with(
+            "category_suggestion:milk", "Dairy", ex=10
+        )
+        channel, message = cache_service.redis_client.publish.call_args.args
+        assert channel == "cache:invalidate"
+        assert json.loads(message) == {
+            "origin": cache_service.instance_id,
+            "keys": ["category_suggestion:milk"],
+        }
+
+    async def test_invalidation_from_other_worker_drops_entry(self, cache_service):
+        cache_service.local_cache.set("category_suggestion:milk", "Dairy")
+        cache_service.local_cache.set("category_suggestion:bread", "Bakery")
+
+        cache_service._handle_invalidation(
+            json.dumps({"origin": cache_service.instance_id, "keys": ["x"]})
+        )
+        cache_service._handle_invalidation(
+            json.dumps({"origin": "other", "keys": ["category_suggestion:milk"]})
+        )
+
+        assert cache_service.local_cache.get("category_suggestion:milk") is None
+        assert cache_service.local_cache.get("category_suggestion:bread") == "Bakery"
+
+    async def test_delete_clears_both_tiers(self, cache_service):
+        cache_service.local_cache.set("category_suggestion:milk", "Dairy")
+
+        await cache_service.delete("category_suggestion:milk")
+
+        assert cache_service.local_cache.get("category_suggestion:milk") is None
+        cache_service.redis_client.delete.assert_called_once_with(
+            "category_suggestion:milk"
+        )
+        cache_service.redis_client.publish.assert_called_once()
+
+    async def test_redis_errors_are_tolerated(self, cache_service):
+        cache_service.local_cache.set("category_suggestion:milk", "Dairy")
+        cache_service.redis_client.get.side_effect = RedisConnectionError("down")
+        cache_service.redis_client.set.side_effect = RedisConnectionError("down")
+
+        assert await cache_service.get("category_suggestion:milk") == "Dairy"
+        assert await cache_service.get("category_suggestion:bread") is None
+        await cache_service.set("category_suggestion:bread", "Bakery")
+        assert await cache_service.get("category_suggestion:bread") == "Bakery"
+
+    async def test_ping_without_redis_raises(self, cache_service):
+        cache_service.redis_client = None
+
+        with pytest.raises(ConnectionError):
+            await cache_service.ping()
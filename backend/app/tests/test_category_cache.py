@@ -0,0 +1,236 @@
+"""
+Tests for the category name cache and get_or_create.
+"""
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.api.v1.endpoints.categories import CATEGORY_EXISTS, update_category
+from app.models import Category
+from app.schemas.category import CategoryUpdate
+from app.services.ai_enrichment import CATEGORY_FIELD, build_enrichment_prompt
+from app.services.category_cache import CategoryCache, CategoryNames, CategoryRef
+from app.tests.conftest import TestingSessionLocal
+
+
+def make_session(row=None, scalar=None):
+    session = Mock()
+    result = Mock()
+    result.first.return_value = row
+    session.execute = AsyncMock(return_value=result)
+    session.scalar = AsyncMock(return_value=scalar)
+    session.commit = AsyncMock()
+    return session
+
+
+class TestCategoryCache:
+    """Unit tests for CategoryCache.get_or_create."""
+
+    async def test_known_name_needs_no_query(self):
+        cache = CategoryCache()
+        cache._ids["Dairy"] = 4
+        session = make_session()
+
+        category = await cache.get_or_create("  Dairy ", session)
+
+        assert category == CategoryRef(4, "Dairy")
+        session.execute.assert_not_called()
+        assert cache.get_stats()["hits"] == 1
+
+    async def test_new_name_is_inserted_committed_and_cached(self):
+        cache = CategoryCache()
+        session = make_session(row=SimpleNamespace(id=9, created=True))
+
+        category = await cache.get_or_create("Spices", session)
+        again = await cache.get_or_create("Spices", session)
+
+        assert category == again == CategoryRef(9, "Spices")
+        session.execute.assert_called_once()
+        session.commit.assert_awaited_once()
+        assert cache.get_stats()["created"] == 1
+
+    async def test_existing_name_is_not_committed(self):
+        cache = CategoryCache()
+        session = make_session(row=SimpleNamespace(id=3, created=False))
+
+        assert await cache.get_or_create("Bakery", session) == CategoryRef(3, "Bakery")
+        session.commit.assert_not_called()
+
+    async def test_name_committed_concurrently_is_read_back(self):
+        cache = CategoryCache()
+        session = make_session(row=None, scalar=5)
+
+        assert await cache.get_or_create("Frozen", session) == CategoryRef(5, "Frozen")
+        session.scalar.assert_awaited_once()
+
+    async def test_empty_name_and_forget(self):
+        cache = CategoryCache()
+        cache._ids["Dairy"] = 4
+
+        assert await cache.get_or_create("  ", make_session()) is None
+        cache.forget("Dairy")
+        assert cache.get_stats()["categories"] == 0
+
+
+class TestCategoryChanges:
+    """Changes made by one worker reach the caches of the others."""
+
+    async def test_change_is_applied_and_published(self):
+        cache = CategoryCache()
+        cache._ids["Diary"] = 4
+        redis_client = Mock(publish=AsyncMock())
+
+        with patch("app.services.category_cache.cache_service") as cache_service:
+            cache_service.redis_client = redis_client
+            await cache.apply_change(forget=["Diary"], remember={"Dairy": 4})
+
+        assert cache._ids == {"Dairy": 4}
+        message = json.loads(redis_client.publish.call_args.args[1])
+        assert message["forget"] == ["Diary"]
+        assert message["remember"] == {"Dairy": 4}
+
+    def test_other_workers_apply_the_change(self):
+        cache = CategoryCache()
+        cache._ids.update({"Diary": 4, "Spices": 7})
+        message = {"forget": ["Diary", "Spices"], "remember": {"Dairy": 4}}
+
+        cache._handle_change(json.dumps({"origin": "other", **message}))
+
+        assert cache._ids == {"Dairy": 4}
+        assert list(cache.names()) == ["Dairy"]
+
+    def test_own_and_malformed_messages_are_ignored(self):
+        cache = CategoryCache()
+        cache._ids["Dairy"] = 4
+
+        cache._handle_change(
+            json.dumps({"origin": cache.instance_id, "forget": ["Dairy"]})
+        )
+        cache._handle_change("not json")
+
+        assert cache._ids == {"Dairy": 4}
+
+    async def test_rename_to_existing_name_is_rejected(self):
+        session = Mock(commit=AsyncMock(), rollback=AsyncMock())
+        category = Category(id=4, name="Diary")
+
+        with (
+            patch("app.api.v1.endpoints.categories.crud.category") as crud,
+            patch("app.api.v1.endpoints.categories.category_cache") as cache,
+        ):
+            crud.get = AsyncMock(return_value=category)
+            crud.update = AsyncMock(
+                side_effect=IntegrityError("UPDATE category", {}, Exception())
+            )
+            with pytest.raises(HTTPException) as error:
+                await update_category(
+                    session=session,
+                    id=4,
+                    category_in=CategoryUpdate(name="Dairy"),
+                    current_user=Mock(),
+                )
+
+        assert error.value.status_code == 400
+        assert error.value.detail == CATEGORY_EXISTS
+        session.rollback.assert_awaited_once()
+        session.commit.assert_not_called()
+        cache.apply_change.assert_not_called()
+
+
+class TestFlushItems:
+    """Item inserts recover from categories deleted by another worker."""
+
+    def foreign_key_error(self):
+        return IntegrityError(
+            "INSERT INTO item",
+            {},
+            Exception('violates foreign key constraint "item_category_id_fkey"'),
+        )
+
+    async def test_deleted_category_is_resolved_again(self):
+        cache = CategoryCache()
+        cache._ids.update({"Spices": 7, "Dairy": 4})
+        session = make_session(row=SimpleNamespace(id=12, created=True))
+        session.flush = AsyncMock(side_effect=[self.foreign_key_error(), None])
+        session.rollback = AsyncMock()
+        session.scalars = AsyncMock(return_value=[4])
+        items = [SimpleNamespace(category_id=7), SimpleNamespace(category_id=4)]
+
+        await cache.flush_items(session, items)
+
+        session.rollback.assert_awaited_once()
+        session.add_all.assert_called_once_with(items)
+        assert [item.category_id for item in items] == [12, 4]
+        assert cache._ids == {"Spices": 12, "Dairy": 4}
+        assert cache.get_stats()["stale_ids"] == 1
+
+    async def test_other_integrity_errors_propagate(self):
+        cache = CategoryCache()
+        session = make_session()
+        session.flush = AsyncMock(
+            side_effect=IntegrityError("INSERT", {}, Exception("unique violation"))
+        )
+        session.rollback = AsyncMock()
+
+        with pytest.raises(IntegrityError):
+            await cache.flush_items(session, [SimpleNamespace(category_id=7)])
+        session.rollback.assert_not_called()
+
+
+class TestCategoryNames:
+    """Tests for the versioned snapshot of category names."""
+
+    def test_snapshot_is_rebuilt_only_after_a_change(self):
+        cache = CategoryCache()
+        cache.remember("Produce", 2)
+        cache.remember("Dairy", 1)
+
+        snapshot = cache.names()
+        assert cache.names() is snapshot
+        assert list(snapshot) == ["Dairy", "Produce"]
+        assert snapshot.prompt_text == "Dairy, Produce"
+
+        cache.remember("Dairy", 1)
+        assert cache.names() is snapshot
+
+        cache.forget("Produce")
+        assert cache.names() is not snapshot
+        assert cache.names().prompt_text == "Dairy"
+
+    def test_prompts_use_the_precomputed_text(self):
+        snapshot = CategoryNames(["Dairy", "Bakery"])
+        snapshot.prompt_text = "<categories>"
+
+        prompt = build_enrichment_prompt("milk", snapshot, [CATEGORY_FIELD])
+
+        assert "as written: <categories>." in prompt
+        assert "as written: Bakery, Dairy." in build_enrichment_prompt(
+            "milk", ["Bakery", "Dairy"], [CATEGORY_FIELD]
+        )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creates_resolve_to_one_category():
+    name = f"Concurrent {uuid.uuid4().hex[:8]}"
+    cache = CategoryCache()
+
+    async def create():
+        async with TestingSessionLocal() as session:
+            # A separate cache per caller, as in separate worker processes
+            return await CategoryCache().get_or_create(name, session)
+
+    results = await asyncio.gather(*(create() for _ in range(5)))
+
+    assert len({category.id for category in results}) == 1
+    async with TestingSessionLocal() as session:
+        assert (await cache.get_or_create(name, session)).id == results[0].id
+        await session.execute(delete(Category).where(Category.name == name))
+        await session.commit()
@@ -0,0 +1,274 @@
+"""
+Unit tests for the shopping list change log.
+
+Covers revision assignment and trimming when recording changes,
+collapsing the logged changes into a delta or a full-resync marker, and
+serving the delta over HTTP and the WebSocket catch-up.
+"""
+
+import uuid
+from datetime import UTC, datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+import app.schemas  # noqa: F401  (resolves ShoppingListChanges forward references)
+from app.api.v1.ws.notifications import ListConnectionManager
+from app.models import Item, ShoppingList, User
+from app.schemas.shopping_list import ShoppingListChanges
+from app.services import change_log
+from app.services.change_log import (
+    ChangeSet,
+    get_changes_since,
+    record_category_renamed,
+    record_changes,
+    record_user_updated,
+)
+
+NOW = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+
+def make_user(nickname):
+    return User(
+        id=uuid.uuid4(),
+        email=f"{nickname}@example.com",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        is_verified=True,
+        nickname=nickname,
+    )
+
+
+def make_result(scalar=None, rows=None):
+    result = Mock()
+    result.scalar_one.return_value = scalar
+    result.scalar_one_or_none.return_value = scalar
+    result.all.return_value = rows or []
+    return result
+
+
+def make_session(*results):
+    session = Mock()
+    session.execute = AsyncMock(side_effect=list(results))
+    return session
+
+
+def change(revision, entity_type, entity_id, action):
+    return SimpleNamespace(
+        revision=revision, entity_type=entity_type, entity_id=entity_id, action=action
+    )
+
+
+class TestRecordChanges:
+    """Tests for record_changes."""
+
+    async def test_assigns_consecutive_revisions(self):
+        session = make_session(make_result(scalar=12), make_result())
+
+        revision = await record_changes(
+            session,
+            3,
+            [
+                ("item", 7, "created"),
+                ("item", 8, "created"),
+            ],
+        )
+
+        assert revision == 12
+        rows = session.execute.call_args_list[1].args[1]
+        assert [row["revision"] for row in rows] == [11, 12]
+        assert [row["entity_id"] for row in rows] == [7, 8]
+        # Nothing to trim yet
+        assert session.execute.call_count == 2
+
+    async def test_trims_entries_beyond_the_limit(self):
+        session = make_session(make_result(scalar=505), make_result(), make_result())
+
+        with patch("app.services.change_log.settings") as mock_settings:
+            mock_settings.CHANGE_LOG_MAX_ENTRIES_PER_LIST = 500
+            await record_changes(session, 3, [("item", 7, "updated")])
+
+        assert session.execute.call_count == 3
+
+    async def test_no_changes_is_noop(self):
+        session = make_session()
+
+        assert await record_changes(session, 3, []) == 0
+        session.execute.assert_not_called()
+
+
+class TestDisplayChanges:
+    """Renames and profile updates bump the revision of the affected lists."""
+
+    async def test_category_rename_updates_its_items(self):
+        session = make_session(make_result(rows=[(4, 10), (3, 11), (4, 12)]))
+
+        with patch("app.services.change_log.record_changes", new=AsyncMock()) as record:
+            assert await record_category_renamed(session, 2) == 2
+
+        assert [call.args[1:] for call in record.await_args_list] == [
+            (3, [("item", 11, "updated")]),
+            (4, [("item", 10, "updated"), ("item", 12, "updated")]),
+        ]
+
+    async def test_user_update_changes_lists_and_items(self):
+        session = make_session(
+            make_result(rows=[(3,), (5,)]), make_result(rows=[(5, 20), (6, 21)])
+        )
+
+        with patch("app.services.change_log.record_changes", new=AsyncMock()) as record:
+            assert await record_user_updated(session, "user-id") == 3
+
+        assert [call.args[1:] for call in record.await_args_list] == [
+            (3, [("list", 3, "updated")]),
+            (5, [("list", 5, "updated"), ("item", 20, "updated")]),
+            (6, [("item", 21, "updated")]),
+        ]
+
+
+class TestGetChangesSince:
+    """Tests for get_changes_since."""
+
+    async def test_missing_list_returns_none(self):
+        session = make_session(make_result(scalar=None))
+
+        assert await get_changes_since(session, 3, 0) is None
+
+    async def test_up_to_date_client_gets_empty_delta(self):
+        session = make_session(make_result(scalar=9))
+
+        assert await get_changes_since(session, 3, 9) == ChangeSet(revision=9)
+        session.execute.assert_called_once()
+
+    async def test_future_revision_requires_resync(self):
+        session = make_session(make_result(scalar=9))
+
+        change_set = await get_changes_since(session, 3, 12)
+
+        assert change_set.full_resync is True
+
+    async def test_trimmed_log_requires_resync(self):
+        rows = [change(6, "item", 1, "updated"), change(7, "item", 2, "created")]
+        session = make_session(make_result(scalar=7), make_result(rows=rows))
+
+        change_set = await get_changes_since(session, 3, 2)
+
+        assert change_set == ChangeSet(revision=7, full_resync=True)
+
+    async def test_changes_collapse_to_last_action_per_item(self):
+        rows = [
+            change(5, "item", 1, "created"),
+            change(6, "item", 1, "updated"),
+            change(7, "item", 2, "updated"),
+            change(8, "item", 2, "deleted"),
+            change(9, "list", 3, "updated"),
+        ]
+        session = make_session(make_result(scalar=9), make_result(rows=rows))
+
+        change_set = await get_changes_since(session, 3, 4)
+
+        assert change_set.revision == 9
+        assert change_set.full_resync is False
+        assert change_set.upserted_item_ids == (1,)
+        assert change_set.deleted_item_ids == (2,)
+        assert change_set.list_changed is True
+
+
+class TestChangesEndpoints:
+    """The delta is served by GET /changes and the WebSocket catch-up."""
+
+    @pytest.fixture
+    def delta(self):
+        owner, member = make_user("owner"), make_user("member")
+        shopping_list = ShoppingList(
+            id=3,
+            name="Groceries",
+            owner_id=owner.id,
+            owner=owner,
+            shared_with=[member],
+            created_at=NOW,
+            updated_at=NOW,
+            revision=4,
+        )
+        item = Item(
+            id=1,
+            name="Milk",
+            shopping_list_id=3,
+            owner_id=owner.id,
+            owner=owner,
+            last_modified_by_id=member.id,
+            last_modified_by=member,
+            is_completed=False,
+            created_at=NOW,
+            updated_at=NOW,
+            category=None,
+        )
+        items_result = Mock()
+        items_result.scalars.return_value.all.return_value = [item]
+        list_result = Mock()
+        list_result.scalars.return_value.first.return_value = shopping_list
+        session = Mock()
+        session.execute = AsyncMock(side_effect=[items_result, list_result])
+        change_set = ChangeSet(
+            revision=9,
+            upserted_item_ids=(1, 2),
+            deleted_item_ids=(5,),
+            list_changed=True,
+        )
+        with patch.object(
+            change_log, "get_changes_since", AsyncMock(return_value=change_set)
+        ):
+            yield session, member
+
+    async def test_changes_endpoint(self, delta):
+        from app.api.deps import get_session
+        from app.core.dependencies import get_current_user
+        from app.main import app
+
+        session, member = delta
+        app.dependency_overrides[get_session] = lambda: session
+        app.dependency_overrides[get_current_user] = lambda: member
+        try:
+            with patch(
+                "app.api.v1.endpoints.shopping_lists.list_membership_cache"
+            ) as membership:
+                membership.authorize = AsyncMock()
+                async with AsyncClient(
+                    transport=ASGITransport(app=app), base_url="http://test"
+                ) as client:
+                    response = await client.get(
+                        "/api/v1/shopping-lists/3/changes?since=4"
+                    )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        data = response.json()
+        assert ShoppingListChanges.model_validate(data).model_dump(mode="json") == data
+        assert data["revision"] == 9
+        assert [item["id"] for item in data["items"]] == [1]
+        # Item 2 no longer exists, so it is reported as deleted
+        assert data["deleted_item_ids"] == [2, 5]
+        assert data["shopping_list"]["revision"] == 9
+        assert [user["nickname"] for user in data["shopping_list"]["members"]] == [
+            "member",
+            "owner",
+        ]
+
+    async def test_websocket_catch_up_sends_changes(self, delta):
+        session, member = delta
+        manager = ListConnectionManager()
+        websocket = Mock()
+
+        with patch.object(manager, "send_to_websocket", AsyncMock()) as send:
+            await manager.send_changes_since(websocket, member, 3, 4, session)
+
+        message = send.await_args.args[1]
+        assert message["type"] == "changes"
+        assert message["list_id"] == 3
+        assert message["revision"] == 9
+        assert [item["name"] for item in message["items"]] == ["Milk"]
+        assert message["deleted_item_ids"] == [2, 5]
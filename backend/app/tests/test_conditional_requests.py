@@ -0,0 +1,113 @@
+"""
+Unit tests for ETag-based conditional GETs of shopping lists.
+
+Covers computing the ETag from the list revision without loading items and
+matching it against If-None-Match headers.
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.helpers.shopping_list_helpers import (
+    etag_matches,
+    get_shopping_list_etag,
+)
+from app.services.list_access import list_membership_cache
+
+
+def make_request(if_none_match=None):
+    headers = {"if-none-match": if_none_match} if if_none_match else {}
+    return SimpleNamespace(headers=headers)
+
+
+def make_session(revision, owner_id):
+    result = Mock()
+    result.first.return_value = SimpleNamespace(revision=revision, owner_id=owner_id)
+    session = Mock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+@pytest.fixture
+def membership():
+    with patch.object(
+        list_membership_cache, "get_member_ids", new_callable=AsyncMock
+    ) as get_member_ids:
+        yield SimpleNamespace(get_member_ids=get_member_ids)
+
+
+class TestGetShoppingListEtag:
+    """Tests for get_shopping_list_etag."""
+
+    async def test_etag_changes_with_revision(self, membership):
+        user = SimpleNamespace(id=uuid.uuid4())
+        membership.get_member_ids.return_value = {str(user.id)}
+
+        first = await get_shopping_list_etag(4, make_session(1, user.id), user, "items")
+        second = await get_shopping_list_etag(
+            4, make_session(2, user.id), user, "items"
+        )
+
+        assert first == '"list-4-r1-items-owner"'
+        assert first != second
+
+    async def test_owner_and_member_views_differ(self, membership):
+        owner, member = SimpleNamespace(id=uuid.uuid4()), SimpleNamespace(
+            id=uuid.uuid4()
+        )
+        membership.get_member_ids.return_value = {str(owner.id), str(member.id)}
+
+        owner_etag = await get_shopping_list_etag(
+            4, make_session(1, owner.id), owner, "full"
+        )
+        member_etag = await get_shopping_list_etag(
+            4, make_session(1, owner.id), member, "full"
+        )
+
+        assert owner_etag != member_etag
+
+    async def test_non_member_is_rejected(self, membership):
+        membership.get_member_ids.return_value = {str(uuid.uuid4())}
+        session = make_session(1, uuid.uuid4())
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_shopping_list_etag(
+                4, session, SimpleNamespace(id=uuid.uuid4()), "full"
+            )
+
+        assert exc_info.value.status_code == 403
+        session.execute.assert_not_called()
+
+    async def test_missing_list_is_not_found(self, membership):
+        membership.get_member_ids.return_value = set()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_shopping_list_etag(
+                4, make_session(1, None), SimpleNamespace(id=uuid.uuid4()), "full"
+            )
+
+        assert exc_info.value.status_code == 404
+
+
+class TestEtagMatches:
+    """Tests for etag_matches."""
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            '"list-1-r2-full-owner"',
+            'W/"list-1-r2-full-owner"',
+            '"x", "list-1-r2-full-owner"',
+            "*",
+        ],
+    )
+    def test_matching_headers(self, header):
+        assert etag_matches(make_request(header), '"list-1-r2-full-owner"')
+
+    @pytest.mark.parametrize("header", [None, '"list-1-r1-full-owner"'])
+    def test_non_matching_headers(self, header):
+        assert not etag_matches(make_request(header), '"list-1-r2-full-owner"')
@@ -0,0 +1,116 @@
+"""
+Tests for the async CRUD layer.
+
+The unit tests check the statements issued through a mocked session; the
+database tests run the bulk operations and keyset pagination for real.
+"""
+
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.crud.base import MAX_PAGE_SIZE
+from app.models import Category
+from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.schemas.item import ItemCreate
+
+
+def make_session(rows=()):
+    session = Mock()
+    result = Mock()
+    result.scalars.return_value.all.return_value = list(rows)
+    result.all.return_value = list(rows)
+    result.first.return_value = rows[0] if rows else None
+    session.execute = AsyncMock(return_value=result)
+    session.scalars = AsyncMock(return_value=result)
+    session.flush = AsyncMock()
+    return session
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestCRUDBase:
+    """Unit tests for CRUDBase."""
+
+    def test_column_data_drops_fields_that_are_not_columns(self):
+        data = crud.item._column_data(
+            ItemCreate(name="Milk", category_name="Dairy"), exclude_unset=True
+        )
+
+        assert data == {"name": "Milk"}
+
+    async def test_get_page_uses_keyset_condition(self):
+        session = make_session()
+
+        await crud.category.get_page(session, after=40, limit=10_000)
+
+        sql = compiled(session.execute.call_args.args[0])
+        assert "category.id > " in sql
+        assert "OFFSET" not in sql
+        assert session.execute.call_args.args[0]._limit == MAX_PAGE_SIZE
+
+    async def test_create_multi_is_one_insert_returning(self):
+        session = make_session()
+
+        await crud.category.create_multi(
+            session,
+            objs_in=[CategoryCreate(name="Dairy"), {"name": "Bakery", "extra": 1}],
+        )
+
+        session.scalars.assert_called_once()
+        statement, rows = session.scalars.call_args.args
+        assert "RETURNING" in compiled(statement)
+        assert rows == [{"name": "Dairy", "icon_name": None}, {"name": "Bakery"}]
+        session.flush.assert_not_called()
+
+    async def test_bulk_methods_skip_empty_input(self):
+        session = make_session()
+
+        assert await crud.category.create_multi(session, objs_in=[]) == []
+        assert await crud.category.update_multi(session, objs_in=[]) == 0
+        assert await crud.category.remove_multi(session, ids=[]) == []
+        session.execute.assert_not_called()
+        session.scalars.assert_not_called()
+
+    async def test_update_only_sets_provided_fields(self):
+        session = make_session()
+        category = Category(id=1, name="Dairy", icon_name="milk")
+
+        await crud.category.update(
+            session, db_obj=category, obj_in=CategoryUpdate(icon_name="cheese")
+        )
+
+        assert (category.name, category.icon_name) == ("Dairy", "cheese")
+        session.flush.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_update_delete_and_keyset_pages(test_db: AsyncSession):
+    prefix = f"CRUD {uuid.uuid4().hex[:8]}"
+
+    created = await crud.category.create_multi(
+        test_db, objs_in=[{"name": f"{prefix} {index}"} for index in range(5)]
+    )
+    assert [category.name for category in created] == [
+        f"{prefix} {index}" for index in range(5)
+    ]
+    ids = [category.id for category in created]
+
+    await crud.category.update_multi(
+        test_db, objs_in=[{"id": ids[0], "icon_name": "milk"}]
+    )
+    first_page = await crud.category.get_page(test_db, after=ids[0] - 1, limit=2)
+    second_page = await crud.category.get_page(
+        test_db, after=first_page[-1].id, limit=2
+    )
+    assert [category.id for category in first_page + second_page] == ids[:4]
+
+    assert sorted(await crud.category.remove_multi(test_db, ids=ids)) == ids
+    assert await crud.category.get(test_db, id=ids[0]) is None
+    await test_db.rollback()
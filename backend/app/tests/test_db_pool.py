@@ -0,0 +1,83 @@
+"""
+Unit tests for the async engine pool configuration and checkout metrics.
+"""
+
+from unittest.mock import Mock
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.core.config import Settings
+from app.db.pool import InstrumentedAsyncPool, engine_options, get_pool_stats
+
+
+def sample(name):
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+class TestEngineOptions:
+    """Tests for engine_options."""
+
+    def test_uses_pool_settings(self):
+        settings = Settings(
+            DB_POOL_SIZE=3,
+            DB_MAX_OVERFLOW=2,
+            DB_POOL_TIMEOUT=5,
+            DB_POOL_RECYCLE=600,
+            DB_STATEMENT_CACHE_SIZE=250,
+        )
+
+        options = engine_options(settings)
+
+        assert options["poolclass"] is InstrumentedAsyncPool
+        assert options["pool_size"] == 3
+        assert options["max_overflow"] == 2
+        assert options["pool_timeout"] == 5
+        assert options["pool_recycle"] == 600
+        assert options["pool_pre_ping"] is False
+        assert options["connect_args"] == {"prepared_statement_cache_size": 250}
+
+    def test_pgbouncer_mode_disables_statement_caching(self):
+        options = engine_options(Settings(DB_PGBOUNCER_MODE=True))
+        connect_args = options["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        name_func = connect_args["prepared_statement_name_func"]
+        assert name_func() != name_func()
+
+
+class TestInstrumentedAsyncPool:
+    """Tests for checkout timing and pool stats."""
+
+    async def test_checkout_is_timed_and_counted(self):
+        pool = InstrumentedAsyncPool(Mock, pool_size=2, max_overflow=0)
+        checkouts = sample("familycart_db_pool_checkout_seconds_count")
+
+        first = await greenlet_spawn(pool.connect)
+        second = await greenlet_spawn(pool.connect)
+
+        assert sample("familycart_db_pool_checkout_seconds_count") == checkouts + 2
+        assert get_pool_stats(pool) == {
+            "size": 2,
+            "in_use": 2,
+            "idle": 0,
+            "overflow": 0,
+        }
+
+        await greenlet_spawn(first.close)
+        assert get_pool_stats(pool)["idle"] == 1
+        await greenlet_spawn(second.close)
+
+    async def test_checkout_timeout_is_counted(self):
+        pool = InstrumentedAsyncPool(Mock, pool_size=1, max_overflow=0, timeout=0.01)
+        timeouts = sample("familycart_db_pool_checkout_timeouts_total")
+
+        connection = await greenlet_spawn(pool.connect)
+        with pytest.raises(exc.TimeoutError):
+            await greenlet_spawn(pool.connect)
+        await greenlet_spawn(connection.close)
+
+        assert sample("familycart_db_pool_checkout_timeouts_total") == timeouts + 1
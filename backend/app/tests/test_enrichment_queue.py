@@ -0,0 +1,317 @@
+"""
+Unit tests for the background AI enrichment queue.
+
+Covers enqueueing to Redis, the local fallback without Redis, retries with
+backoff, dead-lettering of jobs that keep failing, and keeping jobs in
+Redis while they are processed or waiting to be retried.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.services.enrichment_queue import EnrichmentQueue
+
+
+@pytest.fixture
+def mock_settings():
+    with patch("app.services.enrichment_queue.settings") as mock_settings:
+        mock_settings.AI_ENRICHMENT_MODE = "background"
+        mock_settings.AI_ENRICHMENT_WORKERS = 2
+        mock_settings.AI_ENRICHMENT_MAX_RETRIES = 1
+        mock_settings.AI_ENRICHMENT_QUEUE_KEY = "ai_enrichment:queue"
+        mock_settings.AI_ENRICHMENT_DEAD_LETTER_KEY = "ai_enrichment:dead_letter"
+        mock_settings.AI_ENRICHMENT_RETRY_KEY = "ai_enrichment:retry"
+        mock_settings.AI_ENRICHMENT_PROCESSING_KEY = "ai_enrichment:processing"
+        mock_settings.AI_ENRICHMENT_HEARTBEAT_TTL = 30
+        yield mock_settings
+
+
+@pytest.fixture
+def mock_cache():
+    with patch("app.services.enrichment_queue.cache_service") as mock_cache:
+        mock_cache.redis_client = Mock()
+        mock_cache.redis_client.lpush = AsyncMock()
+        mock_cache.redis_client.ltrim = AsyncMock()
+        mock_cache.redis_client.zadd = AsyncMock()
+        mock_cache.redis_client.lrem = AsyncMock()
+        mock_cache.redis_client.srem = AsyncMock()
+        mock_cache.redis_client.delete = AsyncMock()
+        yield mock_cache
+
+
+def make_job(attempts: int = 0) -> dict:
+    return {
+        "item_id": 1,
+        "list_id": 2,
+        "user_id": "user",
+        "item_name": "milk",
+        "attempts": attempts,
+    }
+
+
+class TestEnrichmentQueue:
+    """Tests for EnrichmentQueue."""
+
+    async def test_enqueue_pushes_job_to_redis(self, mock_settings, mock_cache):
+        queue = EnrichmentQueue()
+
+        await queue.enqueue(item_id=1, list_id=2, user_id="user", item_name="milk")
+
+        key, payload = mock_cache.redis_client.lpush.call_args.args
+        assert key == "ai_enrichment:queue"
+        assert json.loads(payload) == make_job()
+
+    async def test_enqueue_runs_locally_when_redis_fails(
+        self, mock_settings, mock_cache
+    ):
+        mock_cache.redis_client.lpush.side_effect = RedisConnectionError("down")
+        queue = EnrichmentQueue()
+        queue.process_job = AsyncMock()
+
+        await queue.enqueue(item_id=1, list_id=2, user_id="user", item_name="milk")
+        await asyncio.gather(*queue._pending_tasks)
+
+        queue.process_job.assert_called_once_with(make_job())
+        assert queue.processed == 1
+
+    async def test_failed_job_is_retried(self, mock_settings, mock_cache):
+        queue = EnrichmentQueue()
+        queue.process_job = AsyncMock(side_effect=Exception("AI unavailable"))
+        queue._retry_later = AsyncMock()
+
+        await queue._handle(make_job())
+        await asyncio.gather(*queue._pending_tasks)
+
+        queue._retry_later.assert_called_once_with(make_job(attempts=1), 2)
+        assert queue.retried == 1
+
+    async def test_job_is_dead_lettered_after_max_retries(
+        self, mock_settings, mock_cache
+    ):
+        queue = EnrichmentQueue()
+        queue.process_job = AsyncMock(side_effect=Exception("AI unavailable"))
+
+        await queue._handle(make_job(attempts=1))
+
+        key, payload = mock_cache.redis_client.lpush.call_args.args
+        assert key == "ai_enrichment:dead_letter"
+        assert json.loads(payload)["error"] == "AI unavailable"
+        mock_cache.redis_client.ltrim.assert_called_once()
+        assert queue.dead_lettered == 1
+
+    async def test_start_is_noop_in_sync_mode(self, mock_settings, mock_cache):
+        mock_settings.AI_ENRICHMENT_MODE = "sync"
+        queue = EnrichmentQueue()
+
+        await queue.start()
+
+        assert queue.get_stats()["workers"] == 0
+
+
+class TestReliableDelivery:
+    """Jobs stay in Redis until they are done."""
+
+    async def test_retry_is_scheduled_in_redis(self, mock_settings, mock_cache):
+        queue = EnrichmentQueue()
+        queue.process_job = AsyncMock(side_effect=Exception("AI unavailable"))
+
+        with patch("app.services.enrichment_queue.time.time", return_value=1000.0):
+            await queue._handle(make_job())
+
+        key, scheduled = mock_cache.redis_client.zadd.call_args.args
+        assert key == "ai_enrichment:retry"
+        assert {json.loads(job)["attempts"]: due for job, due in scheduled.items()} == {
+            1: 1002.0
+        }
+        assert not queue._pending_tasks
+
+    async def test_worker_acknowledges_job_after_processing(
+        self, mock_settings, mock_cache
+    ):
+        queue = EnrichmentQueue()
+        payload = json.dumps(make_job())
+        processed = asyncio.Event()
+
+        async def process_job(job):
+            processed.set()
+
+        queue.process_job = process_job
+        mock_cache.redis_client.blmove = AsyncMock(side_effect=[payload, None, None])
+
+        worker = asyncio.create_task(queue._worker(0))
+        await processed.wait()
+        await asyncio.sleep(0)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+        processing_key = queue._processing_key(0)
+        assert mock_cache.redis_client.blmove.call_args.args[:2] == (
+            "ai_enrichment:queue",
+            processing_key,
+        )
+        mock_cache.redis_client.lrem.assert_awaited_once_with(
+            processing_key, 1, payload
+        )
+
+    async def test_jobs_of_dead_workers_are_requeued(self, mock_settings, mock_cache):
+        queue = EnrichmentQueue()
+        redis_client = mock_cache.redis_client
+        redis_client.smembers = AsyncMock(
+            return_value={
+                "ai_enrichment:processing:a:0",
+                "ai_enrichment:processing:b:0",
+            }
+        )
+        redis_client.exists = AsyncMock(
+            side_effect=lambda key: key == "ai_enrichment:processing:b:0:alive"
+        )
+        redis_client.lmove = AsyncMock(side_effect=["job-1", "job-2", None])
+
+        assert await queue.recover_abandoned_jobs() == 2
+
+        assert {call.args[0] for call in redis_client.lmove.await_args_list} == {
+            "ai_enrichment:processing:a:0"
+        }
+        redis_client.srem.assert_awaited_once_with(
+            "ai_enrichment:processing:lists", "ai_enrichment:processing:a:0"
+        )
+
+    async def test_stop_requeues_interrupted_jobs(self, mock_settings, mock_cache):
+        queue = EnrichmentQueue()
+        queue._workers = [asyncio.create_task(asyncio.sleep(60))]
+        mock_cache.redis_client.lmove = AsyncMock(side_effect=["job", None])
+
+        await queue.stop()
+
+        processing_key = queue._processing_key(0)
+        assert mock_cache.redis_client.lmove.call_args.args == (
+            processing_key,
+            "ai_enrichment:queue",
+        )
+        mock_cache.redis_client.delete.assert_awaited_once_with(
+            f"{processing_key}:alive"
+        )
+        assert queue.get_stats()["workers"] == 0
+
+
+class TestProcessJob:
+    """Enriching a stored item only fills fields that are still empty."""
+
+    @pytest.fixture
+    def job_context(self):
+        from app.services.category_cache import CategoryRef
+
+        session = Mock(commit=AsyncMock())
+        session_factory = Mock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        resolved = (CategoryRef(1, "Dairy"), "Milk", {"de": "Milch"}, "egg")
+
+        with (
+            patch("app.db.session.AsyncSessionLocal", session_factory),
+            patch("app.services.enrichment_queue.ai_service") as ai_service,
+            patch(
+                "app.api.v1.endpoints.item_ai_service.ItemAIProcessor."
+                "resolve_enrichment",
+                new=AsyncMock(return_value=resolved),
+            ),
+            patch("app.services.enrichment_queue.change_log") as change_log,
+            patch(
+                "app.services.enrichment_queue.websocket_service"
+            ) as websocket_service,
+            patch("app.services.enrichment_queue.settings") as mock_settings,
+        ):
+            mock_settings.AI_ENRICHMENT_JOB_TIMEOUT = 5
+            ai_service.enrich_item = AsyncMock(return_value={})
+            change_log.record_change = AsyncMock()
+            websocket_service.notify_item_enriched = AsyncMock()
+            yield session, change_log, websocket_service
+
+    async def test_fully_enriched_item_records_no_change(self, job_context):
+        session, change_log, websocket_service = job_context
+        item = Mock(
+            id=1,
+            shopping_list_id=2,
+            category_id=3,
+            icon_name="spa",
+            standardized_name="Whole Milk",
+            translations={"de": "Vollmilch"},
+        )
+        session.get = AsyncMock(return_value=item)
+
+        await EnrichmentQueue().process_job(make_job())
+
+        assert item.category_id == 3
+        assert item.standardized_name == "Whole Milk"
+        change_log.record_change.assert_not_called()
+        session.commit.assert_not_called()
+        websocket_service.notify_item_enriched.assert_not_called()
+
+    async def test_filled_fields_are_recorded_and_sent(self, job_context):
+        session, change_log, websocket_service = job_context
+        item = Mock(
+            id=1,
+            shopping_list_id=2,
+            category_id=None,
+            icon_name="spa",
+            standardized_name=None,
+            translations={},
+        )
+        session.get = AsyncMock(return_value=item)
+        session.execute = AsyncMock(return_value=Mock(scalar_one=lambda: item))
+
+        with patch("app.schemas.serializers.item_to_dict", return_value={"id": 1}):
+            await EnrichmentQueue().process_job(make_job())
+
+        assert (item.category_id, item.icon_name, item.standardized_name) == (
+            1,
+            "spa",
+            "Milk",
+        )
+        change_log.record_change.assert_awaited_once()
+        session.commit.assert_awaited_once()
+        websocket_service.notify_item_enriched.assert_awaited_once_with(
+            list_id=2, item_data={"id": 1}, user_id="user"
+        )
+
+
+class TestProcessItemsWithoutAI:
+    """Bulk creation in background mode uses only known enrichment."""
+
+    async def test_known_fields_are_used_and_gaps_flagged(self):
+        from app.api.v1.endpoints.item_ai_service import ItemAIProcessor
+        from app.services.category_cache import CategoryRef
+
+        enrichments = [
+            {
+                "category_name": "Dairy",
+                "icon_name": "egg",
+                "standardized_name": "Milk",
+                "translations": {"de": "Milch"},
+            },
+            {},
+        ]
+        dairy, bakery = CategoryRef(1, "Dairy"), CategoryRef(2, "Bakery")
+
+        with (
+            patch("app.api.v1.endpoints.item_ai_service.ai_service") as ai_service,
+            patch(
+                "app.api.v1.endpoints.item_ai_service.helpers.get_or_create_category",
+                new=AsyncMock(side_effect=[dairy, bakery]),
+            ),
+        ):
+            ai_service.get_known_enrichments = AsyncMock(return_value=enrichments)
+            ai_service.enrich_items = AsyncMock()
+            results = await ItemAIProcessor.process_items_without_ai(
+                ["milk", "rohlik"], [None, "Bakery"], Mock()
+            )
+
+        ai_service.enrich_items.assert_not_called()
+        assert results == [
+            (dairy, "Milk", {"de": "Milch"}, "egg", False),
+            (bakery, None, {}, None, True),
+        ]
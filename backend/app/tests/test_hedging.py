@@ -0,0 +1,130 @@
+"""
+Tests for hedged requests across the primary and fallback AI providers.
+"""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.fallback_ai_service import FallbackAIService
+from app.services.hedging import HedgingPolicy
+
+
+@pytest.fixture
+def hedge_settings():
+    with (
+        patch("app.services.hedging.settings") as settings,
+        patch("app.services.fallback_ai_service.settings") as service_settings,
+    ):
+        service_settings.AI_HEDGING_ENABLED = True
+        settings.AI_HEDGE_PERCENTILE = 90.0
+        settings.AI_HEDGE_MIN_DELAY = 0.01
+        settings.AI_HEDGE_MAX_DELAY = 0.05
+        settings.AI_HEDGE_WINDOW = 10
+        settings.AI_HEDGE_MIN_SAMPLES = 5
+        yield settings
+
+
+def make_service(primary_delay, fallback_delay=0.0, primary_error=None):
+    calls = {"primary": 0, "fallback": 0, "cancelled": 0}
+
+    async def respond(name, delay, error=None):
+        calls[name] += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            calls["cancelled"] += 1
+            raise
+        if error:
+            raise error
+        return name
+
+    service = FallbackAIService()
+    service._primary_provider = Mock(provider_name="gemini")
+    service._primary_provider.generate_text = lambda prompt: respond(
+        "primary", primary_delay, primary_error
+    )
+    service._fallback_provider = Mock(provider_name="ollama")
+    service._fallback_provider.generate_text = lambda prompt: respond(
+        "fallback", fallback_delay
+    )
+    return service, calls
+
+
+class TestHedgingPolicy:
+    """Tests for the hedging delay."""
+
+    def test_delay_is_percentile_of_recent_latencies(self, hedge_settings):
+        policy = HedgingPolicy()
+        assert policy.delay("icon") == 0.05
+
+        for latency in [0.01, 0.02, 0.03, 0.04, 0.045]:
+            policy.record_latency("icon", latency)
+
+        assert policy.delay("icon") == 0.045
+        assert policy.delay("category") == 0.05
+
+    def test_delay_is_clamped(self, hedge_settings):
+        policy = HedgingPolicy()
+        for _ in range(5):
+            policy.record_latency("icon", 0.001)
+            policy.record_latency("category", 3.0)
+
+        assert policy.delay("icon") == 0.01
+        assert policy.delay("category") == 0.05
+
+    def test_rates(self, hedge_settings):
+        policy = HedgingPolicy()
+        policy.record_request("icon", hedged=False)
+        policy.record_request("icon", hedged=True, hedge_won=True)
+        policy.record_request("icon", hedged=True)
+        policy.record_request("icon", hedged=True, hedge_won=True)
+
+        stats = policy.get_stats()["icon"]
+        assert stats["hedge_rate"] == 0.75
+        assert stats["win_rate"] == 0.6667
+
+
+class TestHedgedRequests:
+    """Tests for FallbackAIService with hedging enabled."""
+
+    async def test_fast_primary_is_not_hedged(self, hedge_settings):
+        service, calls = make_service(primary_delay=0)
+
+        assert await service.generate_text("hi") == "primary"
+        assert calls["fallback"] == 0
+        assert service.hedging.get_stats()["text generation"]["hedged"] == 0
+
+    async def test_slow_primary_loses_to_the_fallback(self, hedge_settings):
+        service, calls = make_service(primary_delay=1.0)
+
+        assert await service.generate_text("hi") == "fallback"
+        await asyncio.sleep(0)
+        assert calls["cancelled"] == 1
+        stats = service.hedging.get_stats()["text generation"]
+        assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+
+    async def test_primary_answering_during_the_hedge_wins(self, hedge_settings):
+        service, calls = make_service(primary_delay=0.07, fallback_delay=1.0)
+
+        assert await service.generate_text("hi") == "primary"
+        assert calls["fallback"] == 1
+        assert service.hedging.get_stats()["text generation"]["hedge_wins"] == 0
+
+    async def test_failing_primary_falls_back_before_the_delay(self, hedge_settings):
+        service, calls = make_service(
+            primary_delay=0, primary_error=Exception("Primary unavailable")
+        )
+
+        assert await service.generate_text("hi") == "fallback"
+        assert calls["fallback"] == 1
+
+    async def test_hedging_is_opt_in(self, hedge_settings):
+        service, calls = make_service(primary_delay=0.1)
+
+        with patch("app.services.fallback_ai_service.settings") as service_settings:
+            service_settings.AI_HEDGING_ENABLED = False
+            assert await service.generate_text("hi") == "primary"
+
+        assert calls["fallback"] == 0
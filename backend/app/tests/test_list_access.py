@@ -0,0 +1,152 @@
+"""
+Unit tests for the shopping list membership cache and WebSocket handshake.
+
+Covers the single combined membership query, serving repeated checks from
+the cache, invalidation and the single-decode JWT authentication.
+"""
+
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.ws.notifications import ListConnectionManager
+from app.core.config import settings
+from app.services.list_access import ListMembershipCache
+
+
+@pytest.fixture
+def mock_cache():
+    store = {}
+
+    async def get(key):
+        return store.get(key)
+
+    async def set_(key, value, expire=3600):
+        store[key] = value
+
+    async def delete(*keys):
+        for key in keys:
+            store.pop(key, None)
+
+    with patch("app.services.list_access.cache_service") as cache:
+        cache.get = AsyncMock(side_effect=get)
+        cache.set = AsyncMock(side_effect=set_)
+        cache.delete = AsyncMock(side_effect=delete)
+        cache.store = store
+        yield cache
+
+
+def make_session(rows):
+    session = Mock()
+    result = Mock()
+    result.all.return_value = rows
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+class TestListMembershipCache:
+    """Tests for ListMembershipCache."""
+
+    async def test_owner_and_members_come_from_one_query(self, mock_cache):
+        owner, member = uuid.uuid4(), uuid.uuid4()
+        session = make_session([(owner, member), (owner, None)])
+        membership = ListMembershipCache()
+
+        member_ids = await membership.get_member_ids(3, session)
+
+        assert member_ids == {str(owner), str(member)}
+        session.execute.assert_called_once()
+        assert json.loads(mock_cache.store["list_members:3"]) == sorted(member_ids)
+
+    async def test_repeated_checks_are_served_from_cache(self, mock_cache):
+        owner = uuid.uuid4()
+        session = make_session([(owner, None)])
+        membership = ListMembershipCache()
+
+        for _ in range(5):
+            assert await membership.can_access(owner, 3, session) is True
+        assert await membership.can_access(uuid.uuid4(), 3, session) is False
+
+        session.execute.assert_called_once()
+        assert membership.get_stats()["hits"] == 5
+
+    async def test_missing_list_denies_access(self, mock_cache):
+        membership = ListMembershipCache()
+
+        assert not await membership.can_access(uuid.uuid4(), 9, make_session([]))
+
+    async def test_invalidate_forces_reload(self, mock_cache):
+        owner, member = uuid.uuid4(), uuid.uuid4()
+        membership = ListMembershipCache()
+        await membership.get_member_ids(3, make_session([(owner, None)]))
+
+        await membership.invalidate(3)
+        session = make_session([(owner, member)])
+
+        assert await membership.can_access(member, 3, session) is True
+        session.execute.assert_called_once()
+
+    async def test_authorize_distinguishes_missing_and_forbidden(self, mock_cache):
+        owner = uuid.uuid4()
+        membership = ListMembershipCache()
+
+        await membership.authorize(3, owner, make_session([(owner, None)]))
+        with pytest.raises(HTTPException) as forbidden:
+            await membership.authorize(3, uuid.uuid4(), make_session([]))
+        with pytest.raises(HTTPException) as missing:
+            await membership.authorize(9, owner, make_session([]))
+
+        assert forbidden.value.status_code == 403
+        assert missing.value.status_code == 404
+
+
+def make_token(audience):
+    return jwt.encode(
+        {
+            "sub": str(uuid.uuid4()),
+            "aud": audience,
+            "exp": datetime.now(UTC) + timedelta(minutes=5),
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+
+
+class TestAuthenticateUser:
+    """Tests for WebSocket JWT authentication."""
+
+    @pytest.mark.parametrize(
+        "audience", ["fastapi-users:auth", ["fastapi-users:auth", "other"]]
+    )
+    async def test_accepts_string_and_list_audience(self, audience):
+        user = Mock()
+        session = Mock()
+        result = Mock()
+        result.scalars.return_value.first.return_value = user
+        session.execute = AsyncMock(return_value=result)
+
+        with patch(
+            "app.api.v1.ws.notifications.jwt.decode", wraps=jwt.decode
+        ) as decode:
+            authenticated = await ListConnectionManager().authenticate_user(
+                make_token(audience), session
+            )
+
+        assert authenticated is user
+        decode.assert_called_once()
+
+    async def test_rejects_wrong_audience(self):
+        session = Mock()
+        session.execute = AsyncMock()
+
+        authenticated = await ListConnectionManager().authenticate_user(
+            make_token("someone-else"), session
+        )
+
+        assert authenticated is None
+        session.execute.assert_not_called()
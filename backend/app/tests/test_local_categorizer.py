@@ -0,0 +1,206 @@
+"""
+Unit tests for the local categorizer.
+
+Covers exact, token and trigram matching, the confidence threshold,
+incremental loading from the database and the short-circuit in
+FallbackAIService.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from app.services.fallback_ai_service import FallbackAIService
+from app.services.local_categorizer import LocalCategorizer, normalize_phrase
+
+
+def make_result(rows):
+    """Create a mocked SQLAlchemy result returning the given rows."""
+    result = Mock()
+    result.all.return_value = rows
+    return result
+
+
+@pytest.fixture
+def categorizer():
+    categorizer = LocalCategorizer()
+    categorizer.add_example("Milk", "Dairy", 5)
+    categorizer.add_example("mléko", "Dairy", 2)
+    categorizer.add_example("Bread", "Bakery", 4)
+    categorizer.add_example("Apple", "Produce", 3)
+    return categorizer
+
+
+class TestLocalCategorizer:
+    """Tests for LocalCategorizer matching."""
+
+    def test_normalize_phrase_strips_accents_and_punctuation(self):
+        assert normalize_phrase("  Mléko, 1.5%! ") == "mleko 1 5"
+
+    def test_exact_match(self, categorizer):
+        assert categorizer.classify("MLEKO") == ("Dairy", 1.0)
+
+    def test_ambiguous_exact_match_has_low_confidence(self, categorizer):
+        categorizer.add_example("Milk", "Beverages", 5)
+
+        category_name, confidence = categorizer.classify("milk")
+
+        assert confidence == 0.5
+
+    def test_trigram_match_handles_plurals(self, categorizer):
+        category_name, confidence = categorizer.classify("apples")
+
+        assert category_name == "Produce"
+        assert confidence >= 0.75
+
+    def test_unknown_tokens_lower_confidence(self, categorizer):
+        category_name, confidence = categorizer.classify("milk chocolate")
+
+        assert category_name == "Dairy"
+        assert confidence == 0.5
+
+    def test_suggest_category_respects_threshold_and_existing_categories(
+        self, categorizer
+    ):
+        with patch("app.services.local_categorizer.settings") as mock_settings:
+            mock_settings.LOCAL_CATEGORIZER_ENABLED = True
+            mock_settings.LOCAL_CATEGORIZER_THRESHOLD = 0.75
+
+            assert categorizer.suggest_category("milk", ["Dairy"]) == "Dairy"
+            assert categorizer.suggest_category("milk chocolate") is None
+            assert categorizer.suggest_category("bread", ["Dairy"]) is None
+
+            stats = categorizer.get_stats()
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+
+    def test_default_category_is_not_learned(self):
+        categorizer = LocalCategorizer()
+        categorizer.add_example("Widget", "Uncategorized")
+
+        assert categorizer.classify("widget") == (None, 0.0)
+
+    async def test_refresh_loads_categories_and_new_items(self):
+        categorizer = LocalCategorizer()
+        updated_at = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+        categories = make_result([(1, "Dairy", {"de": "Milchprodukte"})])
+        session = Mock()
+        session.execute = AsyncMock(
+            side_effect=[
+                categories,
+                make_result(
+                    [
+                        (item_id, "mleko", "Milk", 1, updated_at)
+                        for item_id in (40, 41, 42)
+                    ]
+                ),
+                categories,
+                make_result([(42, "mleko", "Milk", 1, updated_at)]),
+            ]
+        )
+
+        await categorizer.refresh(session)
+        await categorizer.refresh(session)
+
+        assert categorizer.classify("milchprodukte")[0] == "Dairy"
+        assert categorizer.classify("milk") == ("Dairy", 1.0)
+        # Rows re-read behind the cursor are not counted twice
+        assert categorizer._phrases["milk"]["Dairy"] == 3
+        assert categorizer.get_stats()["cursor"] == updated_at.isoformat()
+        # Categories seen before are not counted twice
+        assert categorizer._phrases["dairy"]["Dairy"] == 1
+
+    async def test_refresh_learns_late_and_changed_categories(self):
+        categorizer = LocalCategorizer()
+        first = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+        later = first + timedelta(minutes=10)
+        categories = make_result([(1, "Dairy", {}), (2, "Bakery", {})])
+        session = Mock()
+        session.execute = AsyncMock(
+            side_effect=[
+                categories,
+                make_result([(7, "Bread", None, 1, first)]),
+                categories,
+                make_result(
+                    [
+                        # Enriched in the background after item 7 was learned
+                        (5, "Cheese", None, 1, later),
+                        # Moved to the right category by a user
+                        (7, "Bread", None, 2, later),
+                    ]
+                ),
+            ]
+        )
+
+        await categorizer.refresh(session)
+        assert categorizer.classify("bread") == ("Dairy", 1.0)
+
+        await categorizer.refresh(session)
+
+        query = session.execute.await_args_list[3].args[0]
+        assert "item.updated_at >=" in str(query)
+        assert categorizer.classify("cheese") == ("Dairy", 1.0)
+        assert categorizer.classify("bread") == ("Bakery", 1.0)
+        assert categorizer.get_stats()["cursor"] == later.isoformat()
+
+    async def test_refresh_follows_renamed_categories(self):
+        categorizer = LocalCategorizer()
+        updated_at = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+        session = Mock()
+        session.execute = AsyncMock(
+            side_effect=[
+                make_result([(1, "Dairy", {"de": "Milchprodukte"}), (2, "Snack", {})]),
+                make_result([(7, "Milk", None, 1, updated_at)]),
+                make_result([(1, "Dairy Products", {"de": "Milchprodukte"})]),
+                make_result([]),
+            ]
+        )
+
+        await categorizer.refresh(session)
+        await categorizer.refresh(session)
+
+        assert categorizer.suggest_category("milk", ["Dairy Products"]) == (
+            "Dairy Products"
+        )
+        assert categorizer.classify("milchprodukte") == ("Dairy Products", 1.0)
+        assert categorizer.classify("dairy products") == ("Dairy Products", 1.0)
+        assert categorizer.classify("snack") == (None, 0.0)
+        assert "Dairy" not in categorizer._phrases["milk"]
+        assert categorizer.get_stats()["categories"] == 1
+
+
+class TestFallbackLocalCategorization:
+    """Tests for the local fast path in FallbackAIService."""
+
+    async def test_confident_local_match_skips_providers(self):
+        service = FallbackAIService()
+        service._primary_provider = Mock()
+        service._primary_provider.suggest_category_async = AsyncMock()
+
+        with patch(
+            "app.services.fallback_ai_service.local_categorizer"
+        ) as mock_categorizer:
+            mock_categorizer.suggest_category.return_value = "Dairy"
+            result = await service.suggest_category_async("milk", ["Dairy"])
+
+        assert result == "Dairy"
+        service._primary_provider.suggest_category_async.assert_not_called()
+
+    async def test_local_category_is_passed_to_enrichment(self):
+        service = FallbackAIService()
+        service._primary_provider = Mock()
+        service._primary_provider.enrich_item = AsyncMock(
+            return_value={"category_name": "Dairy"}
+        )
+
+        with patch(
+            "app.services.fallback_ai_service.local_categorizer"
+        ) as mock_categorizer:
+            mock_categorizer.suggest_category.return_value = "Dairy"
+            await service.enrich_item("milk", ["Dairy"])
+
+        service._primary_provider.enrich_item.assert_called_once_with(
+            "milk", ["Dairy"], known_fields={"category_name": "Dairy"}
+        )
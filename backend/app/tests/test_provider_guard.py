@@ -0,0 +1,204 @@
+"""
+Tests for the AI provider concurrency limiter and circuit breaker.
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from app.services.fallback_ai_service import FallbackAIService
+from app.services.provider_guard import (
+    AdaptiveConcurrencyLimiter,
+    CircuitBreaker,
+    ProviderGuard,
+    ProviderUnavailableError,
+)
+
+
+@pytest.fixture
+def guard_settings():
+    with patch("app.services.provider_guard.settings") as settings:
+        settings.AI_CONCURRENCY_INITIAL = 2
+        settings.AI_CONCURRENCY_MIN = 1
+        settings.AI_CONCURRENCY_MAX = 4
+        settings.AI_CONCURRENCY_LATENCY_TARGET = 10.0
+        settings.AI_CONCURRENCY_MAX_WAIT = 0.05
+        settings.AI_BREAKER_FAILURE_THRESHOLD = 3
+        settings.AI_BREAKER_OPEN_SECONDS = 30.0
+        settings.AI_BREAKER_MAX_OPEN_SECONDS = 100.0
+        settings.AI_BREAKER_SYNC_INTERVAL = 0.0
+        yield settings
+
+
+@pytest.fixture
+def no_redis():
+    with patch("app.services.provider_guard.cache_service") as cache:
+        cache.redis_client = None
+        yield cache
+
+
+def rate_limited(error: Exception) -> bool:
+    return "429" in str(error)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Tests for the AIMD limit."""
+
+    async def test_rejects_calls_beyond_the_limit(self, guard_settings):
+        limiter = AdaptiveConcurrencyLimiter()
+
+        assert await limiter.acquire()
+        assert await limiter.acquire()
+        assert not await limiter.acquire()
+        assert limiter.get_stats()["rejected"] == 1
+
+    async def test_released_slot_is_handed_to_a_waiter(self, guard_settings):
+        guard_settings.AI_CONCURRENCY_MAX_WAIT = 1.0
+        limiter = AdaptiveConcurrencyLimiter()
+        await limiter.acquire()
+        await limiter.acquire()
+
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release(time.monotonic())
+
+        assert await waiter
+        assert limiter.in_flight == 2
+
+    async def test_overload_halves_the_limit_once_per_burst(self, guard_settings):
+        guard_settings.AI_CONCURRENCY_INITIAL = 4
+        limiter = AdaptiveConcurrencyLimiter()
+        started_at = time.monotonic()
+        for _ in range(3):
+            await limiter.acquire()
+
+        limiter.release(started_at, overloaded=True)
+        limiter.release(started_at, overloaded=True)
+
+        assert limiter.capacity == 2
+        limiter.release(time.monotonic(), overloaded=True)
+        assert limiter.capacity == 1
+
+    async def test_limit_grows_while_saturated(self, guard_settings):
+        limiter = AdaptiveConcurrencyLimiter()
+        await limiter.acquire()
+        limiter.release(time.monotonic())
+        assert limiter.capacity == 2
+
+        for _ in range(10):
+            slots = limiter.capacity
+            for _ in range(slots):
+                await limiter.acquire()
+            for _ in range(slots):
+                limiter.release(time.monotonic())
+
+        assert limiter.capacity == 4
+
+    async def test_slow_calls_count_as_overload(self, guard_settings):
+        limiter = AdaptiveConcurrencyLimiter()
+        await limiter.acquire()
+
+        limiter.release(time.monotonic() - 60)
+
+        assert limiter.capacity == 1
+
+
+class TestCircuitBreaker:
+    """Tests for the breaker states."""
+
+    async def test_opens_after_consecutive_failures(self, guard_settings, no_redis):
+        breaker = CircuitBreaker("gemini")
+
+        await breaker.record_failure()
+        await breaker.record_success()
+        for _ in range(3):
+            await breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert not await breaker.allow()
+
+    async def test_half_open_allows_one_probe(self, guard_settings, no_redis):
+        breaker = CircuitBreaker("gemini")
+        await breaker.record_failure(trip=True)
+        breaker.open_until = time.time() - 1
+
+        assert breaker.state == "half_open"
+        assert await breaker.allow()
+        assert not await breaker.allow()
+
+        await breaker.record_success()
+        assert breaker.state == "closed"
+        assert await breaker.allow()
+
+    async def test_failed_probe_doubles_the_wait(self, guard_settings, no_redis):
+        breaker = CircuitBreaker("gemini")
+        await breaker.record_failure(trip=True)
+        breaker.open_until = time.time() - 1
+
+        await breaker.allow()
+        await breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.open_seconds == 60.0
+
+    async def test_state_is_shared_through_redis(self, guard_settings):
+        redis_client = MagicMock()
+        redis_client.set = AsyncMock(return_value=True)
+        redis_client.get = AsyncMock(return_value=None)
+        with patch("app.services.provider_guard.cache_service") as cache:
+            cache.redis_client = redis_client
+            await CircuitBreaker("gemini").record_failure(trip=True)
+
+            key, state = redis_client.set.call_args.args
+            assert key == "ai_breaker:gemini"
+
+            other_worker = CircuitBreaker("gemini")
+            redis_client.get.return_value = state
+            assert not await other_worker.allow()
+            assert other_worker.state == "open"
+
+            # Another worker holds the probe
+            other_worker.open_until = time.time() - 1
+            redis_client.get.return_value = json.dumps(
+                {"open_until": time.time() - 1, "open_seconds": 30.0}
+            )
+            redis_client.set.return_value = None
+            assert not await other_worker.allow()
+
+
+class TestProviderGuard:
+    """Tests for guarded provider calls."""
+
+    async def test_rate_limit_error_opens_the_breaker(self, guard_settings, no_redis):
+        guard = ProviderGuard("gemini")
+        func = AsyncMock(side_effect=Exception("429 Too Many Requests"))
+
+        with pytest.raises(Exception, match="429"):
+            await guard.call(func, rate_limited)
+        with pytest.raises(ProviderUnavailableError):
+            await guard.call(func, rate_limited)
+
+        func.assert_awaited_once()
+        assert guard.limiter.in_flight == 0
+        assert guard.limiter.capacity == 1
+
+
+async def test_open_primary_is_skipped_without_a_call(guard_settings, no_redis):
+    service = FallbackAIService()
+    service._primary_provider = Mock(provider_name="gemini")
+    service._primary_provider.generate_text = AsyncMock(
+        side_effect=Exception("Quota exceeded: 429")
+    )
+    service._fallback_provider = Mock(provider_name="ollama")
+    service._fallback_provider.generate_text = AsyncMock(return_value="ok")
+
+    assert await service.generate_text("hi") == "ok"
+    assert await service.generate_text("hi") == "ok"
+
+    service._primary_provider.generate_text.assert_awaited_once()
+    info = service.get_provider_info()
+    assert info["status"] == "fallback_active"
+    assert info["providers"]["gemini"]["circuit_breaker"]["state"] == "open"
@@ -0,0 +1,153 @@
+"""
+Query plan regression tests.
+
+Runs the queries behind the main list and item endpoints against a seeded
+database, then EXPLAINs each of them with sequential scans disabled. The
+planner only falls back to a sequential scan in that mode when no index can
+serve the query, so a Seq Scan node means a missing index or a query that
+cannot use one.
+"""
+
+import json
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.helpers import shopping_list_helpers as helpers
+from app.models import Category, Item, ShoppingList, User
+from app.models.shopping_list import user_shopping_list
+from app.services.change_log import get_changes_since
+from app.services.list_access import ListMembershipCache
+from app.tests.conftest import test_engine
+
+
+def make_user(label: str) -> User:
+    return User(
+        id=uuid.uuid4(),
+        email=f"plan-{label}-{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        is_verified=True,
+        nickname=label,
+    )
+
+
+@pytest.fixture
+async def seeded_lists(test_db: AsyncSession) -> Dict[str, Any]:
+    """Two users, a few lists shared between them and items on every list."""
+    owner, member = make_user("owner"), make_user("member")
+    category = Category(name=f"Plan Category {uuid.uuid4().hex[:8]}")
+    test_db.add_all([owner, member, category])
+    await test_db.flush()
+
+    shopping_lists = [
+        ShoppingList(name=f"Plan list {index}", owner_id=owner.id) for index in range(3)
+    ]
+    test_db.add_all(shopping_lists)
+    await test_db.flush()
+    await test_db.execute(
+        user_shopping_list.insert(),
+        [
+            {"user_id": member.id, "shopping_list_id": shopping_list.id}
+            for shopping_list in shopping_lists[:2]
+        ],
+    )
+    test_db.add_all(
+        Item(
+            name=f"Plan item {index}",
+            shopping_list_id=shopping_list.id,
+            owner_id=owner.id,
+            last_modified_by_id=member.id,
+            category_id=category.id,
+            is_completed=index % 2 == 0,
+        )
+        for shopping_list in shopping_lists
+        for index in range(4)
+    )
+    await test_db.commit()
+    return {"owner": owner, "member": member, "lists": shopping_lists}
+
+
+@contextmanager
+def capture_queries() -> Iterator[List[Tuple[str, Any]]]:
+    """Record the SELECT statements sent to the test database."""
+    queries: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if not many and statement.lstrip().upper().startswith("SELECT"):
+            queries.append((statement, parameters))
+
+    event.listen(
+        test_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    try:
+        yield queries
+    finally:
+        event.remove(
+            test_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+        )
+
+
+def sequential_scans(plan: Dict[str, Any]) -> List[str]:
+    """Names of the relations read with a sequential scan anywhere in a plan."""
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        scans.extend(sequential_scans(child))
+    return scans
+
+
+async def assert_no_sequential_scans(
+    session: AsyncSession, queries: List[Tuple[str, Any]]
+):
+    assert queries, "No queries were captured"
+    connection = await session.connection()
+    await connection.execute(text("SET LOCAL enable_seqscan = off"))
+    for statement, parameters in queries:
+        result = await connection.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        explained = result.scalar()
+        if isinstance(explained, str):
+            explained = json.loads(explained)
+        scans = sequential_scans(explained[0]["Plan"])
+        assert not scans, f"Sequential scan on {scans} for query:\n{statement}"
+    await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_list_overview_queries_use_indexes(test_db: AsyncSession, seeded_lists):
+    # assert_no_sequential_scans rolls back, which expires the seeded users
+    user_ids = [seeded_lists["owner"].id, seeded_lists["member"].id]
+    for user_id in user_ids:
+        user = await test_db.get(User, user_id)
+        with capture_queries() as queries:
+            await helpers.load_shopping_lists_for_user(test_db, user)
+            await helpers.load_shopping_lists_for_user(test_db, user, summary=True)
+            await helpers.load_shopping_list_summaries(test_db, user)
+
+        await assert_no_sequential_scans(test_db, queries)
+
+
+@pytest.mark.asyncio
+async def test_list_detail_queries_use_indexes(test_db: AsyncSession, seeded_lists):
+    list_id = seeded_lists["lists"][0].id
+
+    with (
+        capture_queries() as queries,
+        patch("app.services.list_access.cache_service") as cache,
+    ):
+        cache.get = AsyncMock(return_value=None)
+        cache.set = AsyncMock()
+        await ListMembershipCache().get_member_ids(list_id, test_db)
+        await helpers._load_shopping_list_for_response(list_id, test_db)
+        await get_changes_since(test_db, list_id, 0)
+
+    await assert_no_sequential_scans(test_db, queries)
@@ -0,0 +1,139 @@
+"""
+Unit tests for the fast serialization layer.
+
+The projections must produce exactly what the Pydantic read schemas produce
+with model_dump(mode="json"), so responses do not change shape.
+"""
+
+import json
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import app.schemas  # noqa: F401  (resolves ShoppingListRead forward references)
+from app.models import Category, Item, ShoppingList, User
+from app.schemas.item import ItemRead
+from app.schemas.serializers import (
+    FastJSONResponse,
+    item_to_dict,
+    items_to_dicts,
+    shopping_list_to_dict,
+    to_json,
+)
+from app.schemas.shopping_list import ShoppingListRead
+from app.schemas.user import UserRead
+
+
+def make_user(nickname="tester"):
+    return User(
+        id=uuid.uuid4(),
+        email=f"{nickname}@example.com",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+        is_verified=True,
+        nickname=nickname,
+    )
+
+
+def make_item(item_id, owner, editor, category=None, **fields):
+    now = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+    return Item(
+        id=item_id,
+        name=f"Item {item_id}",
+        shopping_list_id=1,
+        owner_id=owner.id,
+        owner=owner,
+        last_modified_by_id=editor.id,
+        last_modified_by=editor,
+        is_completed=False,
+        created_at=now,
+        updated_at=now,
+        category=category,
+        **fields,
+    )
+
+
+class TestItemProjection:
+    """Tests for item_to_dict."""
+
+    def test_matches_item_read(self):
+        owner, editor = make_user("owner"), make_user("editor")
+        item = make_item(
+            1,
+            owner,
+            editor,
+            Category(id=3, name="Dairy"),
+            quantity="2",
+            quantity_value=Decimal("1.500"),
+            translations={"cs": "Mléko"},
+            icon_name="milk",
+        )
+
+        expected = ItemRead.model_validate(item, from_attributes=True).model_dump(
+            mode="json"
+        )
+
+        assert item_to_dict(item) == expected
+
+    def test_matches_item_read_without_optional_fields(self):
+        owner = make_user()
+        item = make_item(2, owner, owner)
+
+        expected = ItemRead.model_validate(item, from_attributes=True).model_dump(
+            mode="json"
+        )
+
+        assert item_to_dict(item) == expected
+
+    def test_users_are_projected_once(self):
+        owner = make_user()
+        items = [make_item(i, owner, owner) for i in range(3)]
+
+        projected = items_to_dicts(items)
+
+        assert projected[0]["owner"] is projected[2]["last_modified_by"]
+
+
+class TestShoppingListProjection:
+    """Tests for shopping_list_to_dict."""
+
+    def test_matches_shopping_list_read(self):
+        owner, member = make_user("owner"), make_user("member")
+        now = datetime(2025, 1, 2, tzinfo=UTC)
+        shopping_list = ShoppingList(
+            id=1,
+            name="Weekly",
+            description=None,
+            owner_id=owner.id,
+            created_at=now,
+            updated_at=now,
+            revision=7,
+        )
+        items = [make_item(1, owner, member)]
+
+        expected = ShoppingListRead(
+            id=1,
+            name="Weekly",
+            owner_id=owner.id,
+            created_at=now,
+            updated_at=now,
+            revision=7,
+            items=[ItemRead.model_validate(i, from_attributes=True) for i in items],
+            members=[UserRead.model_validate(member, from_attributes=True)],
+        ).model_dump(mode="json")
+
+        assert shopping_list_to_dict(shopping_list, items, [member]) == expected
+
+
+def test_fast_json_response_renders_json():
+    payload = {"id": uuid.UUID(int=1), "items": [{"name": "Milk"}]}
+
+    response = FastJSONResponse(payload)
+
+    assert json.loads(response.body) == {
+        "id": str(uuid.UUID(int=1)),
+        "items": [{"name": "Milk"}],
+    }
+    assert response.media_type == "application/json"
+    assert json.loads(to_json([1, None])) == [1, None]
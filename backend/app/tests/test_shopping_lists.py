@@ -99,6 +99,63 @@ async def test_get_shopping_lists(
     assert "members" in shopping_list
 
 
+@pytest.mark.asyncio
+async def test_get_shopping_lists_summary(
+    client: AsyncClient, token_header, test_shopping_list
+):
+    """Test the summary mode returns item counts instead of items."""
+    response = await client.get(
+        "/api/v1/shopping-lists/?summary=true", headers=token_header
+    )
+
+    assert response.status_code == 200
+    shopping_list = next(
+        sl for sl in response.json() if sl["id"] == test_shopping_list.id
+    )
+    assert shopping_list["items"] == []
+    assert shopping_list["item_count"] == 2
+    assert shopping_list["completed_item_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_shopping_lists_pagination(
+    client: AsyncClient, token_header, test_shopping_list
+):
+    """Test paging through shopping lists with skip and limit."""
+    for name in ("Second List", "Third List"):
+        await client.post(
+            "/api/v1/shopping-lists/", headers=token_header, json={"name": name}
+        )
+
+    first_page = await client.get(
+        "/api/v1/shopping-lists/?limit=2", headers=token_header
+    )
+    second_page = await client.get(
+        "/api/v1/shopping-lists/?skip=2&limit=2", headers=token_header
+    )
+
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 2
+    ids = [sl["id"] for sl in first_page.json() + second_page.json()]
+    assert len(ids) == len(set(ids)) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_shopping_list_summaries(
+    client: AsyncClient, token_header, test_shopping_list
+):
+    """Test the compact summary endpoint."""
+    response = await client.get("/api/v1/shopping-lists/summary", headers=token_header)
+
+    assert response.status_code == 200
+    summary = next(sl for sl in response.json() if sl["id"] == test_shopping_list.id)
+    assert summary["name"] == "Test Shopping List"
+    assert summary["item_count"] == 2
+    assert summary["completed_item_count"] == 0
+    assert "updated_at" in summary
+    assert "items" not in summary
+
+
 @pytest.mark.asyncio
 async def test_get_shopping_list(client: AsyncClient, token_header, test_shopping_list):
     """Test getting a specific shopping list."""
@@ -114,6 +171,25 @@ async def test_get_shopping_list(client: AsyncClient, token_header, test_shoppin
     assert "members" in data
 
 
+@pytest.mark.asyncio
+async def test_get_shopping_list_not_modified(
+    client: AsyncClient, token_header, test_shopping_list
+):
+    """Test conditional GET with the ETag of a previous response."""
+    url = f"/api/v1/shopping-lists/{test_shopping_list.id}"
+    response = await client.get(url, headers=token_header)
+    etag = response.headers["etag"]
+
+    cached = await client.get(url, headers={**token_header, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    await client.put(url, headers=token_header, json={"name": "Renamed"})
+    changed = await client.get(url, headers={**token_header, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
 @pytest.mark.asyncio
 async def test_update_shopping_list(
     client: AsyncClient, token_header, test_shopping_list
@@ -175,6 +251,29 @@ async def test_add_item_to_shopping_list(
     assert data["category"]["name"] in ["Test Category", "Uncategorized"]
 
 
+@pytest.mark.asyncio
+async def test_get_shopping_list_changes(
+    client: AsyncClient, token_header, test_shopping_list
+):
+    """Test the delta sync returns only items changed after a revision."""
+    list_url = f"/api/v1/shopping-lists/{test_shopping_list.id}"
+    revision = (await client.get(list_url, headers=token_header)).json()["revision"]
+    await client.post(
+        f"{list_url}/items", headers=token_header, json={"name": "Delta Item"}
+    )
+
+    response = await client.get(
+        f"{list_url}/changes?since={revision}", headers=token_header
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["revision"] > revision
+    assert data["full_resync"] is False
+    assert [item["name"] for item in data["items"]] == ["Delta Item"]
+    assert data["deleted_item_ids"] == []
+
+
 @pytest.mark.asyncio
 async def test_get_items_from_shopping_list(
     client: AsyncClient, token_header, test_shopping_list
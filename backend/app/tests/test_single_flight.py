@@ -0,0 +1,143 @@
+"""
+Tests for single-flight coalescing of identical AI lookups.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.fallback_ai_service import FallbackAIService
+from app.services.single_flight import SingleFlight
+
+
+def slow_call(result="Dairy", delay=0.01):
+    calls = []
+
+    async def func():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    return func, calls
+
+
+class TestSingleFlight:
+    """Unit tests for the per-process coalescing."""
+
+    async def test_concurrent_identical_calls_share_one_call(self):
+        flight = SingleFlight()
+        func, calls = slow_call()
+
+        results = await asyncio.gather(*(flight.do("milk", func) for _ in range(5)))
+
+        assert results == ["Dairy"] * 5
+        assert len(calls) == 1
+        assert flight.get_stats()["coalesced"] == 4
+        assert flight.get_stats()["in_flight"] == 0
+
+    async def test_different_keys_and_later_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        func, calls = slow_call()
+
+        await asyncio.gather(flight.do("milk", func), flight.do("bread", func))
+        await flight.do("milk", func)
+
+        assert len(calls) == 3
+
+    async def test_exception_is_shared(self):
+        flight = SingleFlight()
+        func, calls = slow_call(ValueError("quota"))
+
+        results = await asyncio.gather(
+            flight.do("milk", func), flight.do("milk", func), return_exceptions=True
+        )
+
+        assert [str(result) for result in results] == ["quota", "quota"]
+        assert len(calls) == 1
+
+    async def test_cancelled_caller_does_not_cancel_the_call(self):
+        flight = SingleFlight()
+        func, calls = slow_call(delay=0.05)
+
+        first = asyncio.ensure_future(flight.do("milk", func))
+        second = asyncio.ensure_future(flight.do("milk", func))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "Dairy"
+        assert first.cancelled()
+        assert len(calls) == 1
+
+
+class TestRedisLock:
+    """Cross-worker coalescing through the Redis lock."""
+
+    @pytest.fixture
+    def redis_client(self):
+        client = MagicMock()
+        client.set = AsyncMock(return_value=True)
+        client.eval = AsyncMock()
+        client.exists = AsyncMock(return_value=1)
+        with (
+            patch("app.services.single_flight.cache_service") as cache,
+            patch("app.services.single_flight.settings") as settings,
+        ):
+            cache.redis_client = client
+            settings.AI_SINGLE_FLIGHT_REDIS_LOCK = True
+            settings.AI_SINGLE_FLIGHT_LOCK_TTL = 1.0
+            settings.AI_SINGLE_FLIGHT_POLL_INTERVAL = 0.001
+            yield client
+
+    async def test_leader_calls_and_releases_the_lock(self, redis_client):
+        func, calls = slow_call()
+
+        result = await SingleFlight().do("milk", func, read_cached=AsyncMock())
+
+        assert result == "Dairy"
+        assert len(calls) == 1
+        assert redis_client.set.call_args.kwargs["nx"] is True
+        redis_client.eval.assert_awaited_once()
+
+    async def test_follower_reads_the_result_of_the_leader(self, redis_client):
+        redis_client.set.return_value = None
+        read_cached = AsyncMock(side_effect=[None, "Dairy"])
+        func, calls = slow_call()
+        flight = SingleFlight()
+
+        assert await flight.do("milk", func, read_cached=read_cached) == "Dairy"
+        assert not calls
+        assert flight.get_stats()["remote_hits"] == 1
+
+    async def test_follower_calls_itself_when_the_leader_gives_up(self, redis_client):
+        redis_client.set.return_value = None
+        redis_client.exists.return_value = 0
+        func, calls = slow_call()
+
+        result = await SingleFlight().do(
+            "milk", func, read_cached=AsyncMock(return_value=None)
+        )
+
+        assert result == "Dairy"
+        assert len(calls) == 1
+
+
+async def test_fallback_service_coalesces_identical_suggestions():
+    service = FallbackAIService()
+    provider = MagicMock()
+
+    async def suggest_icon(item_name, category_name):
+        await asyncio.sleep(0.01)
+        return "milk"
+
+    provider.suggest_icon = AsyncMock(side_effect=suggest_icon)
+    service._primary_provider = provider
+
+    results = await asyncio.gather(
+        service.suggest_icon("Milk", "Dairy"), service.suggest_icon(" milk ", "dairy")
+    )
+
+    assert results == ["milk", "milk"]
+    provider.suggest_icon.assert_awaited_once()
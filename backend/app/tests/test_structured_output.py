@@ -0,0 +1,159 @@
+"""
+Tests for structured AI answers: schemas, validation and the retry policy.
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services.ai_enrichment import ENRICHMENT_FIELDS
+from app.services.gemini_provider import GeminiProvider
+from app.services.ollama_provider import OllamaProvider
+from app.services.structured_output import (
+    CategoryAnswer,
+    IconAnswer,
+    StandardizationAnswer,
+    batch_enrichment_answer,
+    generate_structured,
+    json_schema,
+)
+
+
+def make_cache():
+    cache = AsyncMock()
+    cache.get.return_value = None
+    return cache
+
+
+@pytest.fixture
+def gemini():
+    with (
+        patch("app.services.gemini_provider.settings") as mock_settings,
+        patch("app.services.gemini_provider.genai") as mock_genai,
+    ):
+        mock_settings.GEMINI_API_KEY = "test-key"
+        mock_model = AsyncMock()
+        mock_genai.GenerativeModel.return_value = mock_model
+        yield GeminiProvider(), mock_model
+
+
+class TestSchemas:
+    """The answer schemas use the subset both providers accept."""
+
+    def test_nested_models_are_inlined_without_titles(self):
+        schema = json_schema(StandardizationAnswer)
+
+        assert "$defs" not in schema
+        assert "title" not in schema
+        assert schema["properties"]["translations"]["required"] == ["es", "fr", "de"]
+
+    def test_icons_are_an_enum(self):
+        icon = json_schema(IconAnswer)["properties"]["icon_name"]
+
+        assert icon["format"] == "enum"
+        assert "local_grocery_store" in icon["enum"]
+
+    def test_answers_are_normalized_and_validated(self):
+        assert (
+            CategoryAnswer.model_validate_json('{"category_name": " dairy."}')
+        ).category_name == "Dairy"
+        assert (
+            IconAnswer.model_validate_json('{"icon_name": "spa "}').icon_name == "spa"
+        )
+        with pytest.raises(ValueError):
+            IconAnswer.model_validate_json('{"icon_name": "unicorn"}')
+
+
+class TestGenerateStructured:
+    """An invalid answer is requested once more."""
+
+    async def test_second_attempt_is_used(self):
+        generate = AsyncMock(side_effect=["Dairy", '{"category_name": "Dairy"}'])
+
+        answer = await generate_structured(generate, CategoryAnswer)
+
+        assert answer == CategoryAnswer(category_name="Dairy")
+        assert generate.await_count == 2
+
+    async def test_gives_up_after_two_invalid_answers(self):
+        generate = AsyncMock(return_value='{"category_name": ""}')
+
+        assert await generate_structured(generate, CategoryAnswer) is None
+        assert generate.await_count == 2
+
+
+class TestProviders:
+    """Providers request structured output and never cache defaults."""
+
+    async def test_gemini_invalid_icon_is_not_cached(self, gemini):
+        provider, model = gemini
+        model.generate_content_async.return_value = SimpleNamespace(
+            text='{"icon_name": "unicorn"}', usage_metadata=None
+        )
+        cache = make_cache()
+
+        with patch("app.services.gemini_provider.cache_service", cache):
+            icon = await provider.suggest_icon("Milk", "Dairy")
+
+        assert icon == "shopping_cart"
+        cache.set.assert_not_called()
+        assert model.generate_content_async.await_count == 2
+        config = model.generate_content_async.call_args.kwargs["generation_config"]
+        assert config["response_mime_type"] == "application/json"
+        assert config["response_schema"] == json_schema(IconAnswer)
+
+    async def test_gemini_valid_category_is_cached(self, gemini):
+        provider, model = gemini
+        model.generate_content_async.return_value = SimpleNamespace(
+            text='{"category_name": "dairy"}', usage_metadata=None
+        )
+        cache = make_cache()
+
+        with patch("app.services.gemini_provider.cache_service", cache):
+            category = await provider.suggest_category_async("mléko", ["Dairy"])
+
+        assert category == "Dairy"
+        cache.set.assert_awaited_once()
+        assert cache.set.call_args.args[:2] == ("category_suggestion:mléko", "Dairy")
+
+    async def test_ollama_standardization_uses_schema_format(self):
+        with patch("app.services.ollama_provider.ollama"):
+            provider = OllamaProvider()
+        answer = {
+            "standardized_name": "Tomatoes",
+            "translations": {"es": "Tomates", "fr": "Tomates", "de": "Tomaten"},
+        }
+        provider.client.generate = AsyncMock(
+            return_value={"response": json.dumps(answer)}
+        )
+        cache = make_cache()
+
+        with patch("app.services.ollama_provider.cache_service", cache):
+            result = await provider.standardize_and_translate_item_name("tommy toes")
+
+        assert result == answer
+        assert provider.client.generate.call_args.kwargs["format"] == json_schema(
+            StandardizationAnswer
+        )
+        assert json.loads(cache.set.call_args.args[1]) == answer
+
+    async def test_ollama_batch_enrichment_uses_schema_format(self):
+        with patch("app.services.ollama_provider.ollama"):
+            provider = OllamaProvider()
+        provider.client.generate = AsyncMock(
+            return_value={
+                "response": '{"items": [{"index": 0, "category_name": "dairy"}]}'
+            }
+        )
+        cache = AsyncMock()
+        cache.mget.return_value = [None, None]
+
+        with patch("app.services.ai_enrichment.cache_service", cache):
+            result = await provider.enrich_items(["mléko"], ["Dairy"])
+
+        assert result[0]["category_name"] == "Dairy"
+        assert provider.client.generate.call_args.kwargs["format"] == json_schema(
+            batch_enrichment_answer(ENRICHMENT_FIELDS)
+        )
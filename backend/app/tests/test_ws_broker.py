@@ -0,0 +1,156 @@
+"""
+Unit tests for WebSocket broadcast fan-out through message brokers.
+
+Covers local delivery and exclusion rules in ListConnectionManager, per-list
+subscriptions and publishing with the Redis broker, and delivery of
+messages received from other workers.
+"""
+
+import json
+import uuid
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.api.v1.ws.broker import InMemoryBroker, RedisBroker, get_broker
+from app.api.v1.ws.notifications import ListConnectionManager
+
+
+def make_websocket():
+    websocket = Mock()
+    websocket.accept = AsyncMock()
+    websocket.send_text = AsyncMock()
+    return websocket
+
+
+async def drain(manager):
+    """Wait until every queued message has been sent."""
+    for connection in list(manager.websocket_registry.values()):
+        await connection.sender.drain()
+
+
+async def disconnect_all(manager):
+    for websocket in list(manager.websocket_registry):
+        await manager.disconnect(websocket)
+
+
+def make_user():
+    user = Mock()
+    user.id = uuid.uuid4()
+    user.nickname = "tester"
+    return user
+
+
+@pytest.fixture
+def mock_redis():
+    with patch("app.api.v1.ws.broker.cache_service") as mock_cache:
+        pubsub = Mock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.unsubscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        mock_cache.redis_client = Mock()
+        mock_cache.redis_client.pubsub.return_value = pubsub
+        mock_cache.redis_client.publish = AsyncMock()
+        yield mock_cache.redis_client
+
+
+class TestListConnectionManager:
+    """Tests for broadcasting through the in-memory broker."""
+
+    async def test_broadcast_skips_excluded_session(self):
+        manager = ListConnectionManager()
+        first, second = make_websocket(), make_websocket()
+        await manager.connect(first, make_user(), 1)
+        await manager.connect(second, make_user(), 1)
+        await drain(manager)
+        first.send_text.reset_mock()
+        second.send_text.reset_mock()
+
+        await manager.broadcast_item_change(
+            1, "created", {"id": 5}, "user", exclude_websocket=first
+        )
+        await drain(manager)
+        await disconnect_all(manager)
+
+        first.send_text.assert_not_called()
+        message = json.loads(second.send_text.call_args.args[0])
+        assert message["type"] == "item_change"
+        assert message["item"] == {"id": 5}
+
+    async def test_broadcast_to_list_without_local_sockets_is_noop(self):
+        manager = ListConnectionManager()
+
+        await manager.broadcast_list_change(3, "updated", {"id": 3}, "user")
+
+        assert manager.list_connections == {}
+
+    def test_unknown_backend_falls_back_to_memory(self):
+        with patch("app.api.v1.ws.broker.settings") as mock_settings:
+            mock_settings.WS_BROKER_BACKEND = "kafka"
+
+            assert isinstance(get_broker(AsyncMock()), InMemoryBroker)
+
+
+class TestRedisBroker:
+    """Tests for the Redis pub/sub broker."""
+
+    async def test_connect_and_disconnect_manage_subscriptions(self, mock_redis):
+        manager = ListConnectionManager()
+        manager.broker = RedisBroker(manager.deliver_to_list)
+        await manager.broker.start()
+        websocket = make_websocket()
+
+        await manager.connect(websocket, make_user(), 7)
+        await manager.disconnect(websocket)
+        await manager.stop_broker()
+
+        pubsub = mock_redis.pubsub.return_value
+        pubsub.subscribe.assert_called_once_with("ws:list:7")
+        pubsub.unsubscribe.assert_called_once_with("ws:list:7")
+
+    async def test_publish_sends_envelope_to_list_channel(self, mock_redis):
+        handler = AsyncMock()
+        broker = RedisBroker(handler)
+        await broker.start()
+
+        await broker.publish(7, {"data": {"id": uuid.UUID(int=1)}})
+        await broker.stop()
+
+        channel, payload = mock_redis.publish.call_args.args
+        assert channel == "ws:list:7"
+        assert json.loads(payload) == {"data": {"id": str(uuid.UUID(int=1))}}
+        handler.assert_not_called()
+
+    async def test_publish_delivers_locally_when_redis_fails(self, mock_redis):
+        mock_redis.publish.side_effect = RedisConnectionError("down")
+        handler = AsyncMock()
+        broker = RedisBroker(handler)
+        await broker.start()
+
+        await broker.publish(7, {"data": {}})
+        await broker.stop()
+
+        handler.assert_called_once_with(7, {"data": {}})
+
+    async def test_received_message_is_delivered_to_local_sockets(self):
+        manager = ListConnectionManager()
+        websocket = make_websocket()
+        await manager.connect(websocket, make_user(), 7)
+        await drain(manager)
+        websocket.send_text.reset_mock()
+
+        await manager.deliver_to_list(
+            7,
+            {
+                "data": {"type": "list_change", "list_id": 7},
+                "exclude_user_id": None,
+                "exclude_session_id": "session-on-another-worker",
+                "has_exclude_websocket": False,
+            },
+        )
+        await drain(manager)
+        await disconnect_all(manager)
+
+        message = json.loads(websocket.send_text.call_args.args[0])
+        assert message == {"type": "list_change", "list_id": 7}
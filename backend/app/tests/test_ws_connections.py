@@ -0,0 +1,101 @@
+"""
+Unit tests for the WebSocket connection registries.
+
+Covers keyed per-list and per-user indexes, cleanup on disconnect and the
+connection statistics exposed for monitoring.
+"""
+
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+from app.api.v1.ws.notifications import ListConnection, ListConnectionManager
+
+
+def make_websocket():
+    websocket = Mock()
+    websocket.accept = AsyncMock()
+    websocket.send_text = AsyncMock()
+    return websocket
+
+
+def make_user(user_id=None):
+    user = Mock()
+    user.id = user_id or uuid.uuid4()
+    user.nickname = "tester"
+    return user
+
+
+async def disconnect_all(manager):
+    for websocket in list(manager.websocket_registry):
+        await manager.disconnect(websocket)
+
+
+class TestConnectionRegistry:
+    """Tests for ListConnectionManager registries."""
+
+    async def test_connect_registers_connection_in_every_index(self):
+        manager = ListConnectionManager()
+        websocket, user = make_websocket(), make_user()
+
+        await manager.connect(websocket, user, 4)
+
+        connection = manager.websocket_registry[websocket]
+        assert isinstance(connection, ListConnection)
+        assert manager.session_registry[connection.session_id] is connection
+        assert manager.list_connections[4] == {connection.session_id: connection}
+        assert manager.user_connections[str(user.id)] == {
+            connection.session_id: connection
+        }
+        await disconnect_all(manager)
+
+    async def test_disconnect_removes_only_that_session(self):
+        manager = ListConnectionManager()
+        user = make_user()
+        phone, laptop = make_websocket(), make_websocket()
+        await manager.connect(phone, user, 4)
+        await manager.connect(laptop, user, 4)
+        phone_session = manager.websocket_registry[phone].session_id
+
+        await manager.disconnect(phone)
+
+        assert phone not in manager.websocket_registry
+        assert phone_session not in manager.session_registry
+        assert list(manager.list_connections[4].values()) == [
+            manager.websocket_registry[laptop]
+        ]
+        assert len(manager.user_connections[str(user.id)]) == 1
+        await disconnect_all(manager)
+
+    async def test_last_disconnect_drops_empty_indexes(self):
+        manager = ListConnectionManager()
+        websocket = make_websocket()
+        await manager.connect(websocket, make_user(), 4)
+
+        await manager.disconnect(websocket)
+        await manager.disconnect(websocket)
+
+        assert manager.list_connections == {}
+        assert manager.user_connections == {}
+        assert manager.session_registry == {}
+
+    async def test_get_stats_counts_connections(self):
+        manager = ListConnectionManager()
+        user = make_user()
+        await manager.connect(make_websocket(), user, 1)
+        await manager.connect(make_websocket(), user, 2)
+        await manager.connect(make_websocket(), make_user(), 2)
+
+        stats = manager.get_stats()
+        await disconnect_all(manager)
+
+        assert stats["connections"] == 3
+        assert stats["lists"] == 2
+        assert stats["users"] == 2
+        assert stats["max_connections_per_list"] == 2
+        assert stats["max_connections_per_user"] == 2
+        assert manager.get_stats()["connections"] == 0
+
+    def test_connection_record_has_no_instance_dict(self):
+        connection = ListConnection(Mock(), "user", 1, "session", Mock())
+
+        assert not hasattr(connection, "__dict__")
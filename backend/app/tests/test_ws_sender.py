@@ -0,0 +1,174 @@
+"""
+Unit tests for per-socket WebSocket send queues.
+
+Covers the slow-consumer policies, failure handling of the writer task and
+encode-once, non-blocking fan-out in ListConnectionManager.
+"""
+
+import asyncio
+import json
+import uuid
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.api.v1.ws.notifications import ListConnectionManager
+from app.api.v1.ws.sender import WebSocketSender
+
+
+def make_websocket(send_text=None):
+    websocket = Mock()
+    websocket.accept = AsyncMock()
+    websocket.close = AsyncMock()
+    websocket.send_text = send_text or AsyncMock()
+    return websocket
+
+
+def sent_texts(websocket):
+    return [call.args[0] for call in websocket.send_text.call_args_list]
+
+
+class TestWebSocketSender:
+    """Tests for WebSocketSender queueing and policies."""
+
+    async def test_messages_are_sent_in_order(self):
+        websocket = make_websocket()
+        sender = WebSocketSender(websocket, on_failure=AsyncMock())
+        sender.start()
+
+        for text in ("a", "b", "c"):
+            sender.enqueue(text)
+        await sender.drain()
+        await sender.close()
+
+        assert sent_texts(websocket) == ["a", "b", "c"]
+
+    async def test_coalesce_replaces_queued_message_for_same_key(self):
+        websocket = make_websocket()
+        sender = WebSocketSender(websocket, on_failure=AsyncMock(), policy="coalesce")
+
+        sender.enqueue("item 1 v1", ("item", 1))
+        sender.enqueue("item 2 v1", ("item", 2))
+        sender.enqueue("item 1 v2", ("item", 1))
+        sender.start()
+        await sender.drain()
+        await sender.close()
+
+        assert sent_texts(websocket) == ["item 1 v2", "item 2 v1"]
+        assert sender.coalesced == 1
+
+    async def test_drop_policy_discards_oldest_message(self):
+        websocket = make_websocket()
+        sender = WebSocketSender(
+            websocket, on_failure=AsyncMock(), max_queue_size=2, policy="drop"
+        )
+
+        for text in ("a", "b", "c"):
+            sender.enqueue(text)
+        sender.start()
+        await sender.drain()
+        await sender.close()
+
+        assert sent_texts(websocket) == ["b", "c"]
+        assert sender.dropped == 1
+
+    async def test_disconnect_policy_reports_full_queue(self):
+        on_failure = AsyncMock()
+        websocket = make_websocket()
+        sender = WebSocketSender(
+            websocket, on_failure=on_failure, max_queue_size=1, policy="disconnect"
+        )
+
+        assert sender.enqueue("a") is True
+        assert sender.enqueue("b") is False
+        await asyncio.sleep(0)
+
+        on_failure.assert_called_once_with(websocket, "send queue full")
+        assert sender.enqueue("c") is False
+
+    async def test_send_error_reports_failure(self):
+        on_failure = AsyncMock()
+        websocket = make_websocket(AsyncMock(side_effect=RuntimeError("closed")))
+        sender = WebSocketSender(websocket, on_failure=on_failure)
+        sender.start()
+
+        sender.enqueue("a")
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        assert sender.closed is True
+        on_failure.assert_called_once()
+
+    async def test_close_is_bounded_when_the_socket_ignores_cancellation(self):
+        sending, finished = asyncio.Event(), asyncio.Event()
+
+        async def stuck_send(text):
+            sending.set()
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                # Like a send that swallows the cancellation and keeps going
+                await asyncio.sleep(0.2)
+            finished.set()
+
+        websocket = make_websocket(AsyncMock(side_effect=stuck_send))
+        sender = WebSocketSender(websocket, on_failure=AsyncMock())
+        sender.start()
+        sender.enqueue("a")
+        await sending.wait()
+        writer = sender._task
+
+        with patch("app.api.v1.ws.sender.CLOSE_TIMEOUT", 0.01):
+            await asyncio.wait_for(sender.close(), timeout=0.1)
+
+        assert sender.closed is True
+        assert not finished.is_set()
+        await finished.wait()
+        # The writer stops on its own once its send returns
+        await asyncio.sleep(0)
+        assert writer.done()
+
+
+class TestBroadcastFanOut:
+    """Tests for broadcasting through per-socket queues."""
+
+    async def test_slow_socket_does_not_block_others(self):
+        release = asyncio.Event()
+
+        async def slow_send(text):
+            await release.wait()
+
+        manager = ListConnectionManager()
+        slow = make_websocket(AsyncMock(side_effect=slow_send))
+        fast = make_websocket()
+        for websocket in (slow, fast):
+            user = Mock(id=uuid.uuid4(), nickname="tester")
+            await manager.connect(websocket, user, 1)
+
+        await asyncio.wait_for(
+            manager.broadcast_item_change(1, "created", {"id": 1}, "user"),
+            timeout=1,
+        )
+        await manager.websocket_registry[fast].sender.drain()
+
+        assert json.loads(sent_texts(fast)[-1])["item"] == {"id": 1}
+        assert manager.websocket_registry[slow].sender.queue_size == 1
+
+        release.set()
+        for websocket in (slow, fast):
+            await manager.disconnect(websocket)
+
+    async def test_message_is_encoded_once_per_broadcast(self):
+        manager = ListConnectionManager()
+        for _ in range(5):
+            user = Mock(id=uuid.uuid4(), nickname="tester")
+            await manager.connect(make_websocket(), user, 1)
+
+        with patch.object(
+            ListConnectionManager,
+            "encode_message",
+            wraps=ListConnectionManager.encode_message,
+        ) as encode:
+            await manager.broadcast_item_change(1, "created", {"id": 1}, "user")
+
+        encode.assert_called_once()
+        for websocket in list(manager.websocket_registry):
+            await manager.disconnect(websocket)
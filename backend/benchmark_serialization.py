@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark for FamilyCart
+
+This script measures how long it takes to turn a loaded shopping list into
+JSON, comparing the previous path (ItemRead/UserRead model_validate with
+from_attributes, model_dump(mode="json") and json.dumps) with the direct
+projection of app.schemas.serializers encoded by pydantic-core.
+
+Usage:
+    python benchmark_serialization.py [--items=500] [--members=4] [--runs=50]
+
+Requirements:
+    - Backend dependencies installed (no database or Redis needed)
+"""
+
+import argparse
+import json
+import statistics
+import time
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import List
+
+import app.schemas  # noqa: F401  (resolves ShoppingListRead forward references)
+from app.models import Category, Item, ShoppingList, User
+from app.schemas.item import ItemRead
+from app.schemas.serializers import shopping_list_to_dict, to_json
+from app.schemas.shopping_list import ShoppingListRead
+from app.schemas.user import UserRead
+
+
+def make_users(count: int) -> List[User]:
+    return [
+        User(
+            id=uuid.uuid4(),
+            email=f"member{index}@example.com",
+            hashed_password="x",
+            is_active=True,
+            is_superuser=False,
+            is_verified=True,
+            nickname=f"Member {index}",
+        )
+        for index in range(count)
+    ]
+
+
+def make_shopping_list(item_count: int, users: List[User]) -> ShoppingList:
+    """A loaded shopping list with realistic items, as the ORM returns it."""
+    now = datetime.now(UTC)
+    categories = [Category(id=index, name=f"Category {index}") for index in range(12)]
+    shopping_list = ShoppingList(
+        id=1,
+        name="Weekly shopping",
+        description="Everything for the week",
+        owner_id=users[0].id,
+        created_at=now,
+        updated_at=now,
+        revision=item_count,
+    )
+    shopping_list.owner = users[0]
+    shopping_list.shared_with = users[1:]
+    shopping_list.items = [
+        Item(
+            id=index,
+            name=f"Item {index}",
+            quantity="2",
+            comment="The one in the blue bottle" if index % 3 == 0 else None,
+            standardized_name=f"Item {index}",
+            translations={"en": f"Item {index}", "cs": f"Položka {index}"},
+            shopping_list_id=1,
+            owner_id=users[index % len(users)].id,
+            owner=users[index % len(users)],
+            last_modified_by_id=users[(index + 1) % len(users)].id,
+            last_modified_by=users[(index + 1) % len(users)],
+            is_completed=index % 4 == 0,
+            created_at=now,
+            updated_at=now,
+            category=categories[index % len(categories)],
+            icon_name="shopping-basket",
+            quantity_value=Decimal("2.000"),
+            quantity_unit_id="pcs",
+            quantity_display_text="2 pcs",
+        )
+        for index in range(item_count)
+    ]
+    return shopping_list
+
+
+def serialize_with_pydantic(shopping_list: ShoppingList) -> bytes:
+    """The previous implementation."""
+    list_read = ShoppingListRead(
+        id=shopping_list.id,
+        name=shopping_list.name,
+        description=shopping_list.description,
+        owner_id=shopping_list.owner_id,
+        created_at=shopping_list.created_at,
+        updated_at=shopping_list.updated_at,
+        revision=shopping_list.revision,
+        items=[
+            ItemRead.model_validate(item, from_attributes=True)
+            for item in shopping_list.items
+        ],
+        members=[
+            UserRead.model_validate(user, from_attributes=True)
+            for user in shopping_list.shared_with
+        ],
+    )
+    return json.dumps(list_read.model_dump(mode="json")).encode()
+
+
+def serialize_with_projection(shopping_list: ShoppingList) -> bytes:
+    """The fast path used by the read endpoints."""
+    return to_json(
+        shopping_list_to_dict(
+            shopping_list, shopping_list.items, shopping_list.shared_with
+        )
+    )
+
+
+def measure(function, shopping_list: ShoppingList, runs: int) -> List[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(shopping_list)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark list serialization")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--members", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    shopping_list = make_shopping_list(args.items, make_users(args.members))
+
+    old_output = json.loads(serialize_with_pydantic(shopping_list))
+    new_output = json.loads(serialize_with_projection(shopping_list))
+    assert old_output == new_output, "Serializers disagree on the response"
+
+    old_times = measure(serialize_with_pydantic, shopping_list, args.runs)
+    new_times = measure(serialize_with_projection, shopping_list, args.runs)
+    old_median = statistics.median(old_times)
+    new_median = statistics.median(new_times)
+
+    print(
+        f"\nSerializing a list with {args.items} items and {args.members} members, "
+        f"median of {args.runs} runs:"
+    )
+    print(f"  Pydantic validate + dump + json.dumps: {old_median * 1000:8.2f} ms")
+    print(f"  Direct projection + pydantic-core:     {new_median * 1000:8.2f} ms")
+    print(f"  Speed-up:                              {old_median / new_median:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
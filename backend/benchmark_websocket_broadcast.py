@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+WebSocket Broadcast Benchmark for FamilyCart
+
+This script measures fan-out time of a single broadcast to a few thousand
+fake sockets, comparing the previous approach (encode per recipient and await
+every send in turn) with the per-socket send queues of ListConnectionManager.
+A small share of the sockets can be made slow to show that they no longer
+stall delivery to everyone else.
+
+Usage:
+    python benchmark_websocket_broadcast.py [--sockets=2000] [--slow=0.01] [--slow-delay=0.2]
+
+Requirements:
+    - Backend dependencies installed (no database or Redis needed)
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+from typing import List
+
+from app.api.v1.ws.notifications import ListConnectionManager, UUIDJSONEncoder
+
+LIST_ID = 1
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+        self.last_received_at = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        else:
+            await asyncio.sleep(0)
+        self.received += 1
+        self.last_received_at = time.perf_counter()
+
+
+def make_item_payload() -> dict:
+    """A realistic item_change payload."""
+    return {
+        "id": 12345,
+        "name": "Semi-skimmed milk",
+        "quantity": "2",
+        "comment": "The one in the blue bottle",
+        "shopping_list_id": LIST_ID,
+        "owner_id": uuid.uuid4(),
+        "last_modified_by_id": uuid.uuid4(),
+        "is_completed": False,
+        "category": {"id": 3, "name": "Dairy"},
+        "icon_name": "local_grocery_store",
+        "standardized_name": "Milk",
+        "translations": {"es": "Leche", "fr": "Lait", "de": "Milch"},
+    }
+
+
+def make_sockets(count: int, slow_share: float, slow_delay: float) -> List:
+    slow_count = int(count * slow_share)
+    return [
+        FakeWebSocket(slow_delay if index < slow_count else 0.0)
+        for index in range(count)
+    ]
+
+
+async def sequential_broadcast(sockets: List[FakeWebSocket], message: dict) -> float:
+    """The previous implementation: encode and await each recipient in turn."""
+    start = time.perf_counter()
+    for websocket in sockets:
+        await websocket.send_text(json.dumps(message, cls=UUIDJSONEncoder))
+    return time.perf_counter() - start
+
+
+async def queued_broadcast(
+    sockets: List[FakeWebSocket], message: dict
+) -> tuple[float, float, float]:
+    """
+    Broadcast through ListConnectionManager.
+
+    Returns:
+        Tuple of (time to return from the broadcast call, time until every fast
+        socket has the message, time until every socket has it)
+    """
+    manager = ListConnectionManager()
+    for websocket in sockets:
+        user = SimpleNamespace(id=uuid.uuid4(), nickname="bench")
+        await manager.connect(websocket, user, LIST_ID)
+    for connection in manager.websocket_registry.values():
+        await connection.sender.drain()
+    for websocket in sockets:
+        websocket.received = 0
+
+    start = time.perf_counter()
+    await manager.broadcast_item_change(
+        LIST_ID, "created", message["item"], message["user_id"]
+    )
+    returned = time.perf_counter() - start
+
+    fast_sockets = [websocket for websocket in sockets if not websocket.delay]
+    for websocket in fast_sockets:
+        await manager.websocket_registry[websocket].sender.drain()
+    fast_done = time.perf_counter() - start
+
+    for connection in manager.websocket_registry.values():
+        await connection.sender.drain()
+    all_done = time.perf_counter() - start
+
+    for websocket in sockets:
+        await manager.disconnect(websocket)
+    return returned, fast_done, all_done
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark WebSocket fan-out")
+    parser.add_argument("--sockets", type=int, default=2000)
+    parser.add_argument(
+        "--slow", type=float, default=0.01, help="Share of slow sockets"
+    )
+    parser.add_argument("--slow-delay", type=float, default=0.2)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    message = {
+        "type": "item_change",
+        "event_type": "created",
+        "list_id": LIST_ID,
+        "item": make_item_payload(),
+        "timestamp": "2025-01-01T00:00:00+00:00",
+        "user_id": str(uuid.uuid4()),
+    }
+
+    sequential_times, returned_times, fast_times, all_times = [], [], [], []
+    for _ in range(args.runs):
+        sockets = make_sockets(args.sockets, args.slow, args.slow_delay)
+        sequential_times.append(await sequential_broadcast(sockets, message))
+
+        sockets = make_sockets(args.sockets, args.slow, args.slow_delay)
+        returned, fast_done, all_done = await queued_broadcast(sockets, message)
+        returned_times.append(returned)
+        fast_times.append(fast_done)
+        all_times.append(all_done)
+
+    def ms(values: List[float]) -> str:
+        return f"{statistics.median(values) * 1000:9.1f} ms"
+
+    print(
+        f"\nFan-out to {args.sockets} sockets "
+        f"({int(args.sockets * args.slow)} slow, {args.slow_delay * 1000:.0f} ms each), "
+        f"median of {args.runs} runs:"
+    )
+    print(f"  Sequential, encode per socket:      {ms(sequential_times)}")
+    print(f"  Queued, broadcast call returns:     {ms(returned_times)}")
+    print(f"  Queued, all fast sockets delivered: {ms(fast_times)}")
+    print(f"  Queued, all sockets delivered:      {ms(all_times)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())